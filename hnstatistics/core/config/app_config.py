@@ -7,4 +7,5 @@ class AppConfig:
     font_size: int = 12
     font_weight: str = "normal"  # "normal" or "bold"
     default_save_dir: str | None = None
+    write_behind: bool = False  # batch merge commits in memory and write them to the database later
     
\ No newline at end of file
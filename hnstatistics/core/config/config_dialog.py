@@ -16,6 +16,7 @@ class ConfigDialog(tk.Toplevel):
         self.var_font_size = tk.IntVar(value=self.config.font_size)
         self.var_font_weight = tk.StringVar(value=self.config.font_weight)
         self.var_default_save_dir = tk.StringVar(value=self.config.default_save_dir or ".")
+        self.var_write_behind = tk.BooleanVar(value=self.config.write_behind)
         
         self._build()
     
@@ -36,8 +37,14 @@ class ConfigDialog(tk.Toplevel):
         ttk.Entry(frame, textvariable=self.var_default_save_dir).grid(row=3, column=1, sticky="ew")
         ttk.Button(frame, text="Browse...", command=self._browse_directory).grid(row=3, column=2, sticky="ew")
         
+        ttk.Checkbutton(
+            frame,
+            text="Write-behind merge commits",
+            variable=self.var_write_behind
+        ).grid(row=4, column=0, columnspan=2, sticky="w")
+        
         btns = ttk.Frame(frame)
-        btns.grid(row=4, column=0, columnspan=3, pady=(10, 0))
+        btns.grid(row=5, column=0, columnspan=3, pady=(10, 0))
         ttk.Button(btns, text="Save", command=self._save).pack(side="right", padx=(0, 5))
         ttk.Button(btns, text="Cancel", command=self.destroy).pack(side="right")
         
@@ -55,6 +62,7 @@ class ConfigDialog(tk.Toplevel):
         self.config.font_family = self.var_font_family.get()
         self.config.font_size = self.var_font_size.get()
         self.config.font_weight = self.var_font_weight.get()
+        self.config.write_behind = self.var_write_behind.get()
         
         dir_value = self.var_default_save_dir.get().strip()
         self.config.default_save_dir = dir_value if dir_value else None
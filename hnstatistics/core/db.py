@@ -1,34 +1,230 @@
 import sqlite3
+import threading
+from dataclasses import dataclass, replace
+
+from hnstatistics.core.errors import DatabaseConnectionError
 
 DB_PATH = "hnstatistics.db"
 
-def get_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+@dataclass(frozen=True)
+class DatabaseSettings:
+    path: str = DB_PATH
+    cache_size_kib: int = 64 * 1024        # PRAGMA cache_size, per connection
+    mmap_size: int = 256 * 1024 * 1024     # PRAGMA mmap_size in bytes, 0 disables
+    cached_statements: int = 512
+    busy_timeout_ms: int = 5000
+
+class ConnectionManager:
+    """
+    为每个线程保持一个长期打开的连接，复用 SQLite 的页缓存和语句缓存；
+    连接启用 WAL 日志和 synchronous=NORMAL
+    """
+    def __init__(self, settings: DatabaseSettings):
+        self.settings = settings
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_all(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        settings = self.settings
+        try:
+            # 每个连接只在创建它的线程中使用；关闭 check_same_thread 只是为了退出时能统一关闭
+            conn = sqlite3.connect(
+                settings.path,
+                cached_statements=settings.cached_statements,
+                check_same_thread=False,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys = ON;")
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+            conn.execute("PRAGMA temp_store = MEMORY;")
+            conn.execute(f"PRAGMA cache_size = {-int(settings.cache_size_kib)};")
+            conn.execute(f"PRAGMA mmap_size = {int(settings.mmap_size)};")
+            conn.execute(f"PRAGMA busy_timeout = {int(settings.busy_timeout_ms)};")
+        except sqlite3.Error as e:
+            raise DatabaseConnectionError(str(e))
+        return conn
+
+_manager = ConnectionManager(DatabaseSettings())
+
+def configure_database(path: str | None = None, **overrides) -> ConnectionManager:
+    """
+    更换数据库路径或连接参数（例如测试时使用临时数据库），已打开的连接会被关闭
+    """
+    global _manager
+    settings = _manager.settings
+    if path is not None:
+        overrides["path"] = str(path)
+    _manager.close_all()
+    _manager = ConnectionManager(replace(settings, **overrides))
+    return _manager
+
+def get_connection_manager() -> ConnectionManager:
+    return _manager
+
+def get_connection() -> sqlite3.Connection:
+    return _manager.connection()
+
+def close_connections():
+    _manager.close_all()
+
+STATISTICS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        project_id INTEGER NOT NULL,
+        key_id INTEGER NOT NULL REFERENCES vocabulary(id),
+        frequency INTEGER NOT NULL,
+        PRIMARY KEY (project_id, key_id),
+        FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+"""
+
+LOG_DATA_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        project_id INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        key_id INTEGER NOT NULL REFERENCES vocabulary(id),
+        frequency INTEGER NOT NULL,
+        PRIMARY KEY (project_id, seq, key_id),
+        FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+"""
+
+# 后续版本给 projects 增加的列：提交时与 statistics 在同一事务中维护的汇总信息，以及统计数据的存储方式
+PROJECT_EXTRA_COLUMNS = {
+    "total_count": "INTEGER NOT NULL DEFAULT 0",
+    "distinct_count": "INTEGER NOT NULL DEFAULT 0",
+    "updated_at": "TEXT",
+    "version": "INTEGER NOT NULL DEFAULT 0",
+    "storage": "TEXT NOT NULL DEFAULT 'sqlite'",
+}
+
+# 每次修改表结构或增加迁移时加一；数据库的 user_version 已是该值时 init_db 不再检查表结构
+SCHEMA_VERSION = 2
 
 def init_db():
     conn = get_connection()
     cursor = conn.cursor()
     
+    (user_version,) = cursor.execute("PRAGMA user_version;").fetchone()
+    if user_version >= SCHEMA_VERSION:
+        return
+    
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS projects (
         id INTEGER PRIMARY KEY,
-        name TEXT NOT NULL
+        name TEXT NOT NULL,
+        total_count INTEGER NOT NULL DEFAULT 0,
+        distinct_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT,
+        version INTEGER NOT NULL DEFAULT 0,
+        storage TEXT NOT NULL DEFAULT 'sqlite'
     );
     """)
     
+    # 所有项目共享的词表，statistics 只保存整数 key_id
     cursor.execute("""
-    CREATE TABLE IF NOT EXISTS statistics (
-        project_id INTEGER,
-        key TEXT NOT NULL,
-        frequency INTEGER NOT NULL,
-        probability REAL NOT NULL,
-        PRIMARY KEY (project_id, key),
+    CREATE TABLE IF NOT EXISTS vocabulary (
+        id INTEGER PRIMARY KEY,
+        key TEXT NOT NULL UNIQUE
+    );
+    """)
+    
+    columns = {row["name"] for row in cursor.execute("PRAGMA table_info(statistics);")}
+    if "key" in columns:
+        _migrate_statistics_keys(conn)
+    
+    cursor.execute(STATISTICS_SCHEMA.format(table="statistics"))
+    # 按频率排序的分页查询使用；WITHOUT ROWID 表的索引自带主键列 key_id，因此是覆盖索引
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_statistics_frequency
+    ON statistics (project_id, frequency DESC);
+    """)
+    
+    # 提交日志：commit_log 记录每次提交（seq 与提交后的 projects.version 相同），
+    # commit_deltas 保存合并提交的增量，checkpoints 保存较早的检查点的完整数据（最新的检查点由 statistics 推算）
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS commit_log (
+        project_id INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        mode TEXT NOT NULL,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        delta_size INTEGER NOT NULL DEFAULT 0,
+        checkpoint INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (project_id, seq),
+        FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+    """)
+    cursor.execute(LOG_DATA_SCHEMA.format(table="commit_deltas"))
+    cursor.execute(LOG_DATA_SCHEMA.format(table="checkpoints"))
+    # 列式存储的项目当前使用的文件版本，与 projects 的汇总和版本在同一事务中更新
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS columnar_generations (
+        project_id INTEGER PRIMARY KEY,
+        generation INTEGER NOT NULL,
         FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
     );
     """)
+    # 写回队列的日志文件中已写入数据库的位置，与数据在同一事务中更新
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS commit_journal (
+        name TEXT PRIMARY KEY,
+        applied_seq INTEGER NOT NULL
+    );
+    """)
+    
+    columns = {row["name"] for row in cursor.execute("PRAGMA table_info(projects);")}
+    missing = [name for name in PROJECT_EXTRA_COLUMNS if name not in columns]
+    if missing:
+        _migrate_project_columns(conn, missing)
     
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION};")
     conn.commit()
-    conn.close()
\ No newline at end of file
+
+def _migrate_statistics_keys(conn: sqlite3.Connection):
+    """
+    旧版本的 statistics 按 (project_id, key TEXT) 存储（可能还带 probability 列），
+    一次性把键迁移到 vocabulary 并改为按 key_id 存储
+    """
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO vocabulary (key) SELECT DISTINCT key FROM statistics;")
+        conn.execute(STATISTICS_SCHEMA.format(table="statistics_migrated"))
+        conn.execute("""
+        INSERT INTO statistics_migrated (project_id, key_id, frequency)
+        SELECT s.project_id, v.id, s.frequency
+        FROM statistics s JOIN vocabulary v ON v.key = s.key;
+        """)
+        conn.execute("DROP TABLE statistics;")
+        conn.execute("ALTER TABLE statistics_migrated RENAME TO statistics;")
+
+def _migrate_project_columns(conn: sqlite3.Connection, missing: list[str]):
+    """
+    旧数据库的 projects 表缺少新增的列：补上这些列，并根据现有的 statistics 回填一次汇总信息
+    """
+    with conn:
+        for name in missing:
+            conn.execute(f"ALTER TABLE projects ADD COLUMN {name} {PROJECT_EXTRA_COLUMNS[name]};")
+        conn.execute("""
+        UPDATE projects SET
+            total_count = (SELECT COALESCE(SUM(frequency), 0) FROM statistics WHERE project_id = projects.id),
+            distinct_count = (SELECT COUNT(*) FROM statistics WHERE project_id = projects.id);
+        """)
\ No newline at end of file
@@ -44,6 +44,12 @@ class ProjectEmptyError(ProjectError):
         self.message = message
         super().__init__(self.message)
 
+class OperationCancelledError(HNStatisticsError):
+    """Exception raised when a running operation is cancelled by the user."""
+    def __init__(self, message="Operation cancelled."):
+        self.message = message
+        super().__init__(self.message)
+
 class ExportError(HNStatisticsError):
     pass
 
@@ -68,6 +74,30 @@ class ExportFormatError(ExportError):
         self.message = f"{message} Format: {self.format}"
         super().__init__(self.message)
 
+class ImportDataError(HNStatisticsError):
+    pass
+
+class ImportIOError(ImportDataError):
+    """Exception raised for I/O errors during import."""
+    def __init__(self, path, message="I/O error occurred during import."):
+        self.path = path
+        self.message = f"{message} Path: {self.path}"
+        super().__init__(self.message)
+
+class ImportFormatError(ImportDataError):
+    """Exception raised for unsupported import formats."""
+    def __init__(self, format, message="Unsupported import format."):
+        self.format = format
+        self.message = f"{message} Format: {self.format}"
+        super().__init__(self.message)
+
+class ImportParseError(ImportDataError):
+    """Exception raised when an imported file contains malformed data."""
+    def __init__(self, path, message="Malformed import data."):
+        self.path = path
+        self.message = f"{message} Path: {self.path}"
+        super().__init__(self.message)
+
 class DatabaseError(HNStatisticsError):
     """Base class for database-related exceptions."""
     pass
@@ -0,0 +1,49 @@
+import io
+from pathlib import Path
+from typing import TextIO
+
+WRITE_BUFFER_SIZE = 1 << 20
+
+# 文件扩展名 -> 压缩方式
+COMPRESSIONS = {
+    "gz": "gzip",
+    "xz": "xz",
+}
+
+def split_compression(file_path: str) -> tuple[str, str | None]:
+    """
+    返回 (数据格式, 压缩方式)，例如 "a.csv.gz" -> ("csv", "gzip")，"a.json" -> ("json", None)
+    """
+    suffixes = [s.lstrip(".").lower() for s in Path(file_path).suffixes]
+    if suffixes and suffixes[-1] in COMPRESSIONS:
+        fmt = suffixes[-2] if len(suffixes) > 1 else ""
+        return fmt, COMPRESSIONS[suffixes[-1]]
+    return (suffixes[-1] if suffixes else ""), None
+
+def open_text(file_path: str, mode: str, encoding: str = "utf-8", newline: str | None = None,
+              compression: str | None = None) -> TextIO:
+    """
+    打开文本文件，按 compression（或文件扩展名）透明地进行 gzip / xz 压缩和解压；
+    写入时使用较大的缓冲区
+    """
+    if compression is None:
+        compression = split_compression(file_path)[1]
+    writing = mode == "w"
+    # gzip / lzma 只在读写压缩文件时导入
+    if compression == "gzip":
+        import gzip
+
+        raw = gzip.open(file_path, mode + "b", compresslevel=6) if writing else gzip.open(file_path, "rb")
+    elif compression == "xz":
+        import lzma
+
+        raw = lzma.open(file_path, mode + "b", preset=3) if writing else lzma.open(file_path, "rb")
+    elif compression is None:
+        if writing:
+            return open(file_path, mode, encoding=encoding, newline=newline, buffering=WRITE_BUFFER_SIZE)
+        return open(file_path, mode, encoding=encoding, newline=newline)
+    else:
+        raise ValueError(f"Unsupported compression: {compression}")
+    if writing:
+        raw = io.BufferedWriter(raw, WRITE_BUFFER_SIZE)
+    return io.TextIOWrapper(raw, encoding=encoding, newline=newline)
\ No newline at end of file
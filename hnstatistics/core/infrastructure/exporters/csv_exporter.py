@@ -1,9 +1,13 @@
 import csv
 
 from hnstatistics.core.errors import ExportIOError, ExportPathError, ProjectEmptyError
+from hnstatistics.core.infrastructure.compression import open_text
 from hnstatistics.core.statistics.model import StatisticsModel
 
-def export_csv(stats: StatisticsModel, file_path: str):
+def export_csv(stats: StatisticsModel, file_path: str, compression: str | None = None):
+    """
+    逐行写出，compression 为 "gzip" / "xz" 时压缩输出（默认按文件扩展名判断）
+    """
     if not stats or not stats.frequency:
         raise ProjectEmptyError()
     
@@ -11,15 +15,9 @@ def export_csv(stats: StatisticsModel, file_path: str):
         raise ExportPathError(file_path, "Export file path is invalid.")
     
     try:
-        with open(file_path, "w", newline="", encoding="utf-8-sig") as f:
+        with open_text(file_path, "w", encoding="utf-8-sig", newline="", compression=compression) as f:
             writer = csv.writer(f)
             writer.writerow(["Item", "Frequency", "Probability"])
-
-            for k in stats.frequency:
-                writer.writerow([
-                    k,
-                    stats.frequency[k],
-                    round(stats.probability.get(k, 0), 4)
-                ])
+            writer.writerows((k, freq, round(prob, 4)) for k, freq, prob in stats.rows())
     except OSError as e:
         raise ExportIOError(file_path, str(e))
\ No newline at end of file
@@ -1,47 +1,50 @@
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment
 from openpyxl.utils import get_column_letter
 from hnstatistics.core.errors import ExportIOError, ExportPathError, ProjectEmptyError
 from hnstatistics.core.statistics.model import StatisticsModel
 
+HEADERS = ["Item", "Frequency", "Probability"]
+PROBABILITY_WIDTH = len("0.1234")
+
 
 def export_excel(stats: StatisticsModel, file_path: str):
+    """
+    使用 openpyxl 的 write_only 模式逐行写出，内存占用与行数无关。
+    只写模式在第一行之前就要写出列宽，因此先遍历一次键和频率得到各列的最大宽度
+    """
     if not stats.frequency:
         raise ProjectEmptyError()
     
     if not file_path or not isinstance(file_path, str):
         raise ExportPathError(file_path, "Export file path is invalid.")
     
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Statistics"
-
-    headers = ["Item", "Frequency", "Probability"]
-    ws.append(headers)
+    widths = [len(h) for h in HEADERS]
+    for key, freq, _ in stats.rows():
+        if len(key) > widths[0]:
+            widths[0] = len(key)
+        if freq >= 10 ** widths[1]:
+            widths[1] = len(str(freq))
+    widths[2] = max(widths[2], PROBABILITY_WIDTH)
+    
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Statistics")
+    for col, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(col)].width = width + 2
     
     header_font = Font(bold=True)
-    for col in range(1, len(headers) + 1):
-        cell = ws.cell(row=1, column=col)
+    header_alignment = Alignment(horizontal="center")
+    header = []
+    for title in HEADERS:
+        cell = WriteOnlyCell(ws, value=title)
         cell.font = header_font
-        cell.alignment = Alignment(horizontal="center")
-    
-    for key in stats.frequency:
-        freq = stats.frequency[key]
-        prob = round(stats.probability[key], 4)
-        ws.append([key, freq, prob])
+        cell.alignment = header_alignment
+        header.append(cell)
+    ws.append(header)
     
-    for col in ws.columns:
-        max_length = 0
-        col_letter = get_column_letter(col[0].column)
-        for cell in col:
-            try:
-                cell_length = len(str(cell.value))
-                if cell_length > max_length:
-                    max_length = cell_length
-            except:
-                pass
-        adjusted_width = (max_length + 2)
-        ws.column_dimensions[col_letter].width = adjusted_width
+    for key, freq, prob in stats.rows():
+        ws.append([key, freq, round(prob, 4)])
 
     try:
         wb.save(file_path)
@@ -1,27 +1,27 @@
 import json
 from hnstatistics.core.errors import ExportIOError, ExportPathError, ProjectEmptyError
+from hnstatistics.core.infrastructure.compression import open_text
 from hnstatistics.core.statistics.model import StatisticsModel
 
-def export_json(stats: StatisticsModel, file_path: str):
+def export_json(stats: StatisticsModel, file_path: str, compression: str | None = None):
+    """
+    逐项写出 {"statistics": [...]}，每个对象占一行，不在内存中构造完整的数据；
+    compression 为 "gzip" / "xz" 时压缩输出（默认按文件扩展名判断）
+    """
     if not stats.frequency:
         raise ProjectEmptyError()
     
     if not file_path or not isinstance(file_path, str):
         raise ExportPathError(file_path, "Export file path is invalid.")
     
-    data = {
-        "statistics": [
-            {
-                "Item": key,
-                "Frequency": stats.frequency[key],
-                "Probability": round(stats.probability[key], 4)
-            }
-            for key in stats.frequency
-        ]
-    }
-
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
     try:
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with open_text(file_path, "w", encoding="utf-8", compression=compression) as f:
+            f.write('{\n  "statistics": [')
+            separator = "\n    "
+            for key, freq, prob in stats.rows():
+                f.write(f'{separator}{{"Item": {dumps(key)}, "Frequency": {freq}, "Probability": {dumps(round(prob, 4))}}}')
+                separator = ",\n    "
+            f.write("\n  ]\n}\n")
     except OSError as e:
         raise ExportIOError(file_path, str(e))
\ No newline at end of file
@@ -0,0 +1,53 @@
+import time
+import zipfile
+from array import array
+
+from hnstatistics.core.errors import ExportIOError, ExportPathError, ProjectEmptyError
+from hnstatistics.core.infrastructure.npy_format import npy_header
+from hnstatistics.core.statistics.compact_model import CompactStatisticsModel
+from hnstatistics.core.statistics.model import StatisticsModel
+
+# 成员名 -> array 类型码；keys 为按 UTF-8 字节序排序后拼接的键，key_offsets 为 len + 1 个偏移量
+NPZ_COLUMNS = {
+    "keys": "B",
+    "key_offsets": "q",
+    "frequency": "q",
+    "probability": "d",
+}
+
+def export_npz(stats: StatisticsModel, file_path: str):
+    """
+    写出不压缩的 .npz（NumPy 可直接 np.load），四个一维数组按列存放，
+    每列的数据区对齐到可以内存映射的位置，由 load_npz 零复制读取
+    """
+    if not stats.frequency:
+        raise ProjectEmptyError()
+
+    if not file_path or not isinstance(file_path, str):
+        raise ExportPathError(file_path, "Export file path is invalid.")
+
+    compact = stats if isinstance(stats, CompactStatisticsModel) else CompactStatisticsModel.from_model(stats)
+    blob, offsets, counts = compact.columns()
+    total = compact.total
+    probability = array("d", (c / total for c in counts)) if total else array("d", bytes(8 * len(counts)))
+    columns = dict(zip(NPZ_COLUMNS, (blob, offsets, counts, probability)))
+
+    try:
+        with zipfile.ZipFile(file_path, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+            for name, typecode in NPZ_COLUMNS.items():
+                _write_column(zf, name, typecode, columns[name])
+    except OSError as e:
+        raise ExportIOError(file_path, str(e))
+
+def _write_column(zf: zipfile.ZipFile, name: str, typecode: str, data):
+    data = memoryview(data).cast("B")
+    info = zipfile.ZipInfo(f"{name}.npy", date_time=time.localtime()[:6])
+    info.compress_type = zipfile.ZIP_STORED
+    zip64 = data.nbytes + (1 << 16) > zipfile.ZIP64_LIMIT
+    # 本地文件头为 30 字节 + 文件名 + zip64 扩展字段（20 字节）
+    local_header = 30 + len(info.filename.encode("utf-8")) + (20 if zip64 else 0)
+    length = data.nbytes // array(typecode).itemsize
+    header = npy_header(typecode, length, zf.fp.tell() + local_header)
+    with zf.open(info, "w", force_zip64=zip64) as f:
+        f.write(header)
+        f.write(data)
\ No newline at end of file
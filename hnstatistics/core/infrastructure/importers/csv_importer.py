@@ -0,0 +1,30 @@
+import csv
+from collections.abc import Iterator
+
+from hnstatistics.core.errors import ImportIOError, ImportParseError
+from hnstatistics.core.infrastructure.compression import open_text
+
+def iter_csv(file_path: str) -> Iterator[tuple[str, int]]:
+    """
+    逐行读取 export_csv 导出的文件（可为 .gz / .xz 压缩），产生 (Item, Frequency)；概率由导入后的总数重新计算
+    """
+    try:
+        with open_text(file_path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            try:
+                key_col = header.index("Item")
+                freq_col = header.index("Frequency")
+            except ValueError:
+                raise ImportParseError(file_path, "CSV header must contain 'Item' and 'Frequency'.")
+            for row in reader:
+                if not row:
+                    continue
+                try:
+                    yield row[key_col], int(row[freq_col])
+                except (IndexError, ValueError):
+                    raise ImportParseError(file_path, f"Invalid row {reader.line_num}: {row!r}.")
+    except (OSError, EOFError) as e:
+        raise ImportIOError(file_path, str(e))
\ No newline at end of file
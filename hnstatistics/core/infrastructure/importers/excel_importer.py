@@ -0,0 +1,34 @@
+from collections.abc import Iterator
+
+from openpyxl import load_workbook
+from hnstatistics.core.errors import ImportIOError, ImportParseError
+
+def iter_excel(file_path: str) -> Iterator[tuple[str, int]]:
+    """
+    以 openpyxl 只读模式逐行读取 export_excel 导出的工作表，产生 (Item, Frequency)
+    """
+    try:
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+    except OSError as e:
+        raise ImportIOError(file_path, str(e))
+    try:
+        ws = wb["Statistics"] if "Statistics" in wb.sheetnames else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = list(header)
+        try:
+            key_col = header.index("Item")
+            freq_col = header.index("Frequency")
+        except ValueError:
+            raise ImportParseError(file_path, "Sheet header must contain 'Item' and 'Frequency'.")
+        for line, row in enumerate(rows, start=2):
+            if row is None or row[key_col] is None:
+                continue
+            try:
+                yield str(row[key_col]), int(row[freq_col])
+            except (IndexError, TypeError, ValueError):
+                raise ImportParseError(file_path, f"Invalid row {line}: {row!r}.")
+    finally:
+        wb.close()
\ No newline at end of file
@@ -0,0 +1,58 @@
+import json
+import re
+from collections.abc import Iterator
+
+from hnstatistics.core.errors import ImportIOError, ImportParseError
+from hnstatistics.core.infrastructure.compression import open_text
+
+READ_SIZE = 1 << 16
+_ARRAY_START = re.compile(r'"statistics"\s*:\s*\[')
+_SEPARATORS = " \t\r\n,"
+
+
+def iter_json(file_path: str) -> Iterator[tuple[str, int]]:
+    """
+    增量解析 export_json 导出的文件（可为 .gz / .xz 压缩）：定位 "statistics" 数组后逐个解码其中的对象，
+    内存中只保留当前读入的一段文本，产生 (Item, Frequency)
+    """
+    decoder = json.JSONDecoder()
+    try:
+        with open_text(file_path, "r", encoding="utf-8-sig") as f:
+            buf = ""
+            pos = 0
+            while True:
+                match = _ARRAY_START.search(buf)
+                if match:
+                    pos = match.end()
+                    break
+                chunk = f.read(READ_SIZE)
+                if not chunk:
+                    raise ImportParseError(file_path, "JSON file has no 'statistics' array.")
+                buf += chunk
+
+            eof = False
+            while True:
+                while pos < len(buf) and buf[pos] in _SEPARATORS:
+                    pos += 1
+                if pos < len(buf) and buf[pos] == "]":
+                    return
+                try:
+                    if pos >= len(buf):
+                        raise ValueError
+                    item, end = decoder.raw_decode(buf, pos)
+                except ValueError:
+                    # 对象跨越了读入的边界：丢弃已解析的部分，再读入一段
+                    if eof:
+                        raise ImportParseError(file_path, "Unexpected end of JSON data.")
+                    chunk = f.read(READ_SIZE)
+                    eof = not chunk
+                    buf = buf[pos:] + chunk
+                    pos = 0
+                    continue
+                pos = end
+                try:
+                    yield item["Item"], int(item["Frequency"])
+                except (KeyError, TypeError, ValueError):
+                    raise ImportParseError(file_path, f"Invalid entry: {item!r}.")
+    except (OSError, EOFError) as e:
+        raise ImportIOError(file_path, str(e))
\ No newline at end of file
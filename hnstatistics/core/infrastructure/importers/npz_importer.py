@@ -0,0 +1,82 @@
+import mmap
+import os
+import struct
+import zipfile
+from array import array
+from collections.abc import Iterator
+
+from hnstatistics.core.errors import ImportIOError, ImportParseError
+from hnstatistics.core.infrastructure.exporters.npz_exporter import NPZ_COLUMNS
+from hnstatistics.core.infrastructure.npy_format import DATA_ALIGNMENT, parse_npy_header
+from hnstatistics.core.statistics.compact_model import CompactStatisticsModel
+
+_LOCAL_HEADER = struct.Struct("<4s22xHH")
+
+
+def load_npz(file_path: str) -> CompactStatisticsModel:
+    """
+    内存映射 export_npz 写出的文件并直接作为 CompactStatisticsModel 的列数据，不复制也不解析每一行；
+    计数列为写时复制映射，修改模型不会写回文件。
+    np.savez_compressed 等压缩过的成员只能解压到内存中
+    """
+    try:
+        with open(file_path, "rb") as f, zipfile.ZipFile(f) as zf:
+            infos = {info.filename: info for info in zf.infolist()}
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            columns = {}
+            for name, typecode in NPZ_COLUMNS.items():
+                info = infos.get(f"{name}.npy")
+                if info is None:
+                    raise ImportParseError(file_path, f"Missing array '{name}'.")
+                columns[name] = _read_column(f, zf, mapped, info, typecode, name == "keys")
+    except zipfile.BadZipFile as e:
+        raise ImportParseError(file_path, str(e))
+    except ValueError as e:
+        raise ImportParseError(file_path, f"Invalid array: {e}.")
+    except OSError as e:
+        raise ImportIOError(file_path, str(e))
+
+    blob, offsets, counts = columns["keys"], columns["key_offsets"], columns["frequency"]
+    if len(offsets) != len(counts) + 1 or offsets[-1] != len(blob):
+        raise ImportParseError(file_path, "Array lengths do not match.")
+    return CompactStatisticsModel.from_columns(blob, offsets, counts)
+
+def iter_npz(file_path: str) -> Iterator[tuple[str, int]]:
+    """
+    逐行产生 (Item, Frequency)，数据来自内存映射
+    """
+    for key, freq, _ in load_npz(file_path).rows():
+        yield key, freq
+
+def _read_column(f, zf: zipfile.ZipFile, mapped: mmap.mmap, info: zipfile.ZipInfo, typecode: str, as_bytes: bool):
+    if info.compress_type != zipfile.ZIP_STORED:
+        data = bytearray(zf.read(info))
+        actual, length, start = parse_npy_header(data)
+        _check_type(actual, typecode)
+        column = memoryview(data)[start:start + length * array(typecode).itemsize]
+        return bytes(column) if as_bytes else column.cast(typecode)
+
+    signature, name_length, extra_length = _LOCAL_HEADER.unpack_from(mapped, info.header_offset)
+    if signature != b"PK\x03\x04":
+        raise ValueError("bad local file header")
+    member = info.header_offset + _LOCAL_HEADER.size + name_length + extra_length
+    actual, length, start = parse_npy_header(memoryview(mapped)[member:member + min(info.file_size, 1 << 17)])
+    _check_type(actual, typecode)
+    start += member
+    size = length * array(typecode).itemsize
+    if start + size > member + info.file_size:
+        raise ValueError("array data is truncated")
+    if as_bytes:
+        # 键列需要切片得到 bytes，单独映射；数据区未对齐时（例如由 NumPy 写出）退回复制
+        if size == 0:
+            return b""
+        if start % DATA_ALIGNMENT == 0:
+            return mmap.mmap(f.fileno(), size, offset=start, access=mmap.ACCESS_READ)
+        return mapped[start:start + size]
+    if size == 0:
+        return array(typecode)
+    return memoryview(mapped)[start:start + size].cast(typecode)
+
+def _check_type(actual: str, expected: str):
+    if actual != expected:
+        raise ValueError(f"expected array type '{expected}', got '{actual}'")
\ No newline at end of file
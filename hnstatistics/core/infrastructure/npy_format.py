@@ -0,0 +1,56 @@
+import ast
+import mmap
+import struct
+import sys
+
+NPY_MAGIC = b"\x93NUMPY"
+# 数据区对齐到内存映射允许的偏移粒度，使每一列都可以单独映射
+DATA_ALIGNMENT = mmap.ALLOCATIONGRANULARITY
+
+_BYTEORDER = "<" if sys.byteorder == "little" else ">"
+
+# array 类型码 -> NumPy dtype
+DTYPES = {
+    "B": "|u1",
+    "q": f"{_BYTEORDER}i8",
+    "d": f"{_BYTEORDER}f8",
+}
+
+def npy_header(typecode: str, length: int, data_offset: int = 0) -> bytes:
+    """
+    一维数组的 .npy 头部；data_offset 为头部在文件中的起始位置，
+    头部用空格填充到数据区起始位置是 DATA_ALIGNMENT 的整数倍
+    """
+    text = f"{{'descr': '{DTYPES[typecode]}', 'fortran_order': False, 'shape': ({length},), }}"
+    for version, prefix in ((1, 10), (2, 12)):
+        unpadded = data_offset + prefix + len(text) + 1
+        padded = text + " " * (-unpadded % DATA_ALIGNMENT) + "\n"
+        if version == 2 or len(padded) < 1 << 16:
+            break
+    size = struct.pack("<H", len(padded)) if version == 1 else struct.pack("<I", len(padded))
+    return NPY_MAGIC + bytes((version, 0)) + size + padded.encode("latin1")
+
+def parse_npy_header(buffer) -> tuple[str, int, int]:
+    """
+    解析 .npy 头部，返回 (array 类型码, 元素个数, 数据区相对于头部的偏移)。
+    只支持本程序写出的一维、C 顺序、本机字节序的数组
+    """
+    if bytes(buffer[:6]) != NPY_MAGIC:
+        raise ValueError("not a .npy array")
+    version = buffer[6]
+    if version == 1:
+        (length,) = struct.unpack("<H", buffer[8:10])
+        start = 10
+    elif version in (2, 3):
+        (length,) = struct.unpack("<I", buffer[8:12])
+        start = 12
+    else:
+        raise ValueError(f"unsupported .npy version {version}")
+    header = ast.literal_eval(bytes(buffer[start:start + length]).decode("latin1"))
+    if header.get("fortran_order") or len(header.get("shape", ())) != 1:
+        raise ValueError("only one-dimensional C-ordered arrays are supported")
+    descr = header.get("descr")
+    typecode = next((t for t, d in DTYPES.items() if d == descr), None)
+    if typecode is None:
+        raise ValueError(f"unsupported dtype {descr!r}")
+    return typecode, header["shape"][0], start + length
\ No newline at end of file
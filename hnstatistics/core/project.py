@@ -2,7 +2,23 @@ from hnstatistics.core.statistics.model import StatisticsModel
 
 
 class Project:
-    def __init__(self, name: str, project_id: int = None, stats=None):
+    def __init__(
+        self,
+        name: str,
+        project_id: int = None,
+        stats=None,
+        total_count: int = 0,
+        distinct_count: int = 0,
+        updated_at: str | None = None,
+        version: int = 0,
+        storage: str = "sqlite",
+    ):
         self.id = project_id
         self.name = name
-        self.stats = stats if stats is not None else StatisticsModel()
\ No newline at end of file
+        self.stats = stats if stats is not None else StatisticsModel()
+        # 数据库中保存的汇总信息，无需加载 stats 即可使用
+        self.total_count = total_count
+        self.distinct_count = distinct_count
+        self.updated_at = updated_at
+        self.version = version
+        self.storage = storage  # StorageBackend 的值
\ No newline at end of file
@@ -0,0 +1,326 @@
+import heapq
+import json
+import mmap
+import os
+import shutil
+import sqlite3
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+
+from hnstatistics.core.db import get_connection_manager
+from hnstatistics.core.errors import RepositoryError
+from hnstatistics.core.statistics.compact_model import CompactStatisticsModel
+from hnstatistics.core.statistics.model import StatisticsModel
+from hnstatistics.core.statistics.query_options import QueryOrder, StatisticsPage, StatisticsQuery
+
+COLUMN_FILES = ("keys", "offsets", "counts")
+LEGACY_CURRENT = "CURRENT"
+
+
+class _Columns:
+    """
+    一个版本（generation）的列数据：keys 为按 UTF-8 字节序排序后拼接的键，
+    offsets 为 count + 1 个 int64 偏移量，counts 为 int64 计数
+    """
+    __slots__ = ("blob", "offsets", "counts", "total")
+
+    def __init__(self, blob, offsets, counts, total: int):
+        self.blob = blob
+        self.offsets = offsets
+        self.counts = counts
+        self.total = total
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def key(self, index: int) -> bytes:
+        return self.blob[self.offsets[index]:self.offsets[index + 1]]
+
+    def bisect(self, target: bytes) -> int:
+        """
+        返回第一个不小于 target 的键的位置
+        """
+        lo, hi = 0, len(self.counts)
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if self.key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+class ColumnarStatisticsRepository:
+    """
+    列式文件存储，接口与 SQLiteStatisticsRepository 相同。每个项目一个目录：
+    <gen>.keys / <gen>.offsets / <gen>.counts / <gen>.meta 为不可变的一个版本。
+    当前版本号保存在数据库的 columnar_generations 表中，与 projects 的汇总和版本在同一事务中更新，
+    数据库是唯一的依据：新版本的文件先写入并落盘，事务提交即完成切换，提交后再删除旧版本的文件；
+    回滚或在提交前崩溃时，新版本的文件不被引用，之后写入时被覆盖或清理。
+    """
+    def __init__(self, conn, root: str | os.PathLike | None = None):
+        self.conn = conn
+        if root is None:
+            root = f"{get_connection_manager().settings.path}-columnar"
+        self.root = Path(root)
+        self._staged: dict[int, int | None] = {}  # project_id -> 本事务写入的版本号，None 表示删除
+
+    def get_by_project_id(self, project_id: int, model_factory=StatisticsModel):
+        """
+        model_factory 为 CompactStatisticsModel 时直接内存映射文件，不复制数据
+        """
+        columns = self._open(project_id)
+        if columns is None:
+            return model_factory()
+        if model_factory is CompactStatisticsModel:
+            return CompactStatisticsModel.from_columns(columns.blob, columns.offsets, columns.counts, columns.total)
+        stats = model_factory()
+        if len(columns):
+            stats.overwrite(dict(CompactStatisticsModel.from_columns(
+                columns.blob, columns.offsets, columns.counts, columns.total
+            ).frequency.items()))
+        return stats
+
+    def delete_by_project_id(self, project_id: int) -> None:
+        try:
+            self.conn.execute("DELETE FROM columnar_generations WHERE project_id = ?;", (project_id,))
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+        self._staged[project_id] = None
+
+    def insert(self, project_id: int, stats) -> None:
+        self.overwrite(project_id, stats)
+
+    def overwrite(self, project_id: int, stats) -> None:
+        if isinstance(stats, CompactStatisticsModel):
+            blob, offsets, counts = stats.columns()
+        else:
+            blob, offsets, counts = CompactStatisticsModel.from_model(stats).columns()
+        gen = self._next_generation(project_id)
+        self._write(project_id, gen, blob, offsets, counts, sum(counts))
+
+    def update(self, project_id: int, stats) -> None:
+        self.overwrite(project_id, stats)
+
+    def merge(self, project_id: int, delta: Mapping) -> None:
+        """
+        生成合并了增量的新版本：已有键只修改计数，新键按位置插入，其余数据按区段整体复制
+        """
+        columns = self._open(project_id) or _Columns(b"", array("q", [0]), array("q"), 0)
+        n = len(columns)
+        counts = array("q", columns.counts)
+        inserts = []
+        added = 0
+        for key, v in sorted((k.encode("utf-8"), v) for k, v in delta.items()):
+            index = columns.bisect(key)
+            if index < n and columns.key(index) == key:
+                counts[index] += v
+            else:
+                inserts.append((index, key, v))
+            added += v
+        gen = self._next_generation(project_id)
+        total = columns.total + added
+        if not inserts:
+            self._write(project_id, gen, columns.blob, columns.offsets, counts, total)
+            return
+
+        blob_parts = []
+        offsets = array("q")
+        new_counts = array("q")
+        old_offsets = columns.offsets
+        prev = 0
+        shift = 0
+        for index, key, v in inserts:
+            blob_parts.append(columns.blob[old_offsets[prev]:old_offsets[index]])
+            offsets.extend(o + shift for o in old_offsets[prev:index])
+            new_counts.extend(counts[prev:index])
+            offsets.append(old_offsets[index] + shift)
+            blob_parts.append(key)
+            new_counts.append(v)
+            shift += len(key)
+            prev = index
+        blob_parts.append(columns.blob[old_offsets[prev]:old_offsets[n]])
+        offsets.extend(o + shift for o in old_offsets[prev:n + 1])
+        new_counts.extend(counts[prev:n])
+        self._write(project_id, gen, b"".join(blob_parts), offsets, new_counts, total)
+
+    def aggregate(self, project_id: int) -> tuple[int, int]:
+        columns = self._open(project_id)
+        if columns is None:
+            return 0, 0
+        return columns.total, len(columns)
+
+    def query(self, project_id: int, query: StatisticsQuery) -> StatisticsPage:
+        """
+        按键排序时二分定位游标后顺序读取；按频率排序时扫描计数列并用堆取出前 offset + limit 个
+        """
+        if query.limit <= 0:
+            raise ValueError("Query limit must be positive.")
+        columns = self._open(project_id)
+        if columns is None:
+            return StatisticsPage()
+        counts = columns.counts
+        lo = query.min_frequency
+        hi = query.max_frequency
+
+        def matches(i):
+            c = counts[i]
+            return (lo is None or c >= lo) and (hi is None or c <= hi)
+
+        wanted = query.offset + query.limit
+        if query.order_by == QueryOrder.KEY:
+            if query.descending:
+                start = len(columns) - 1 if query.after is None else columns.bisect(query.after[0].encode("utf-8")) - 1
+                indexes = range(start, -1, -1)
+            else:
+                start = 0 if query.after is None else columns.bisect(query.after[0].encode("utf-8"))
+                if query.after is not None and start < len(columns) and columns.key(start) == query.after[0].encode("utf-8"):
+                    start += 1
+                indexes = range(start, len(columns))
+            selected = []
+            for i in indexes:
+                if matches(i):
+                    selected.append(i)
+                    if len(selected) == wanted:
+                        break
+        elif query.order_by == QueryOrder.FREQUENCY:
+            # 同频率按键的字节序排序，游标为 (frequency, key)
+            after = query.after
+            if query.descending:
+                sort_key = lambda i: (-counts[i], columns.key(i))
+                cursor = None if after is None else (-after[0], after[1].encode("utf-8"))
+            else:
+                sort_key = lambda i: (counts[i], columns.key(i))
+                cursor = None if after is None else (after[0], after[1].encode("utf-8"))
+            candidates = (i for i in range(len(columns)) if matches(i))
+            if cursor is not None:
+                candidates = (i for i in candidates if sort_key(i) > cursor)
+            selected = heapq.nsmallest(wanted, candidates, key=sort_key)
+        else:
+            raise ValueError(f"Unsupported query order: {query.order_by}")
+
+        total = columns.total
+        rows = []
+        for i in selected[query.offset:]:
+            c = counts[i]
+            rows.append((columns.key(i).decode("utf-8"), c, c / total if total else 0.0))
+        page = StatisticsPage(rows=rows, total=total)
+        if len(rows) == query.limit:
+            key, frequency, _ = rows[-1]
+            page.next_cursor = (frequency, key) if query.order_by == QueryOrder.FREQUENCY else (key,)
+        return page
+
+    def commit(self) -> None:
+        """
+        由 UnitOfWork 在数据库事务提交后调用：新版本已经生效，删除不再引用的旧版本文件
+        """
+        staged, self._staged = self._staged, {}
+        for project_id, gen in staged.items():
+            directory = self._dir(project_id)
+            if gen is None:
+                shutil.rmtree(directory, ignore_errors=True)
+                continue
+            self._remove_generations(project_id, keep=gen)
+            # 旧版本用 CURRENT 文件记录当前版本，改由数据库记录后不再需要
+            (directory / LEGACY_CURRENT).unlink(missing_ok=True)
+
+    def rollback(self) -> None:
+        staged, self._staged = self._staged, {}
+        for project_id, gen in staged.items():
+            if gen is not None:
+                self._remove_generations(project_id, keep=self._current_generation(project_id))
+
+    def _dir(self, project_id: int) -> Path:
+        return self.root / str(project_id)
+
+    def _current_generation(self, project_id: int) -> int | None:
+        if project_id in self._staged:
+            return self._staged[project_id]
+        try:
+            row = self.conn.execute(
+                "SELECT generation FROM columnar_generations WHERE project_id = ?;",
+                (project_id,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+        if row is not None:
+            return row["generation"]
+        try:
+            # 尚未改由数据库记录版本的项目
+            return int((self._dir(project_id) / LEGACY_CURRENT).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def _next_generation(self, project_id: int) -> int:
+        # 跳过回滚或崩溃留下的未被引用的版本号，不覆盖可能仍被映射的文件
+        used = [self._current_generation(project_id) or 0]
+        directory = self._dir(project_id)
+        if directory.exists():
+            stems = (path.name.split(".", 1)[0] for path in directory.iterdir())
+            used += [int(stem) for stem in stems if stem.isdigit()]
+        return max(used) + 1
+
+    def _open(self, project_id: int) -> _Columns | None:
+        gen = self._current_generation(project_id)
+        if gen is None:
+            return None
+        directory = self._dir(project_id)
+        try:
+            meta = json.loads((directory / f"{gen}.meta").read_text(encoding="utf-8"))
+            blob = _map(directory / f"{gen}.keys", mmap.ACCESS_READ)
+            offsets = _map(directory / f"{gen}.offsets", mmap.ACCESS_READ, "q", [0])
+            # 写时复制：内存中修改计数不会写回文件
+            counts = _map(directory / f"{gen}.counts", mmap.ACCESS_COPY, "q")
+        except (OSError, ValueError) as e:
+            raise RepositoryError(f"Cannot open columnar data of project {project_id}: {e}")
+        return _Columns(blob, offsets, counts, meta["total"])
+
+    def _write(self, project_id: int, gen: int, blob, offsets, counts, total: int) -> None:
+        directory = self._dir(project_id)
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            for name, data in zip(COLUMN_FILES, (blob, offsets, counts)):
+                with open(directory / f"{gen}.{name}", "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+            with open(directory / f"{gen}.meta", "w", encoding="utf-8") as f:
+                json.dump({"count": len(counts), "total": total}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            self.conn.execute(
+                """
+                INSERT INTO columnar_generations (project_id, generation) VALUES (?, ?)
+                ON CONFLICT(project_id) DO UPDATE SET generation = excluded.generation;
+                """,
+                (project_id, gen)
+            )
+        except OSError as e:
+            raise RepositoryError(str(e))
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+        self._staged[project_id] = gen
+
+    def _remove_generations(self, project_id: int, keep: int | None) -> None:
+        directory = self._dir(project_id)
+        if not directory.exists():
+            return
+        for path in directory.iterdir():
+            stem = path.name.split(".", 1)[0]
+            if stem.isdigit() and int(stem) != keep:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass  # Windows 上仍被映射的旧版本，下次切换时再删除
+
+
+def _map(path: Path, access: int, typecode: str | None = None, empty=()):
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return array(typecode, empty) if typecode else b""
+        mapped = mmap.mmap(f.fileno(), 0, access=access)
+    if typecode is None:
+        return mapped
+    return memoryview(mapped).cast(typecode)
\ No newline at end of file
@@ -0,0 +1,230 @@
+import sqlite3
+from collections.abc import Mapping
+from hnstatistics.core.errors import NotFoundError, RepositoryError
+from hnstatistics.core.repositories.base_sqlite_repo import BaseSQLiteRepository
+from hnstatistics.core.repositories.statistics_repo import stage_frequencies
+from hnstatistics.core.statistics.commit_mode import CommitMode, CommitRecord
+from hnstatistics.core.statistics.model import StatisticsModel
+
+
+# commit_log.checkpoint 的取值
+NO_CHECKPOINT = 0
+SAVED_CHECKPOINT = 1    # 完整数据保存在 checkpoints 表中
+PENDING_CHECKPOINT = 2  # 最新的检查点：数据 = statistics 减去之后的增量，不复制
+
+
+class SQLiteCommitLogRepository(BaseSQLiteRepository):
+    """
+    只追加的提交日志：合并提交记录增量，覆盖提交和定期的提交作为检查点，
+    任意一次提交之后的状态 = 最近的检查点 + 之后的若干增量。
+    每个项目最新的检查点不复制数据，而是由 statistics 减去其后的增量得到；
+    只有出现新的检查点且旧检查点仍需保留时，才用 materialize() 把它写入 checkpoints 表
+    """
+    def __init__(self, conn):
+        self.conn = conn
+
+    def record(self, project_id: int, seq: int, mode: CommitMode, delta: Mapping | None = None) -> None:
+        try:
+            self.conn.execute(
+                "INSERT INTO commit_log (project_id, seq, mode, delta_size) VALUES (?, ?, ?, ?);",
+                (project_id, seq, mode.value, len(delta) if delta is not None else 0)
+            )
+            if delta is not None:
+                stage_frequencies(self.conn, delta)
+                self.conn.execute(
+                    """
+                    INSERT INTO commit_deltas (project_id, seq, key_id, frequency)
+                    SELECT ?, ?, v.id, t.frequency
+                    FROM statistics_staging t JOIN vocabulary v ON v.key = t.key;
+                    """,
+                    (project_id, seq)
+                )
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+
+    def checkpoint(self, project_id: int, seq: int) -> None:
+        """
+        把第 seq 次提交（项目当前的数据）标记为最新的检查点，不复制数据。
+        之前未写出的检查点不再能由 statistics 得到，改为普通提交；需要保留时应先调用 materialize()
+        """
+        try:
+            self.conn.execute(
+                "UPDATE commit_log SET checkpoint = ? WHERE project_id = ? AND checkpoint = ?;",
+                (NO_CHECKPOINT, project_id, PENDING_CHECKPOINT)
+            )
+            self.conn.execute(
+                "UPDATE commit_log SET checkpoint = ? WHERE project_id = ? AND seq = ?;",
+                (PENDING_CHECKPOINT, project_id, seq)
+            )
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+
+    def materialize(self, project_id: int) -> None:
+        """
+        把最新的检查点写入 checkpoints 表：statistics 减去检查点之后的增量。
+        必须在 statistics 被整体改写之前调用，此时其中的数据仍是最近一次记录的提交之后的状态
+        """
+        try:
+            row = self.conn.execute(
+                "SELECT seq FROM commit_log WHERE project_id = ? AND checkpoint = ?;",
+                (project_id, PENDING_CHECKPOINT)
+            ).fetchone()
+            if row is None:
+                return
+            seq = row["seq"]
+            self.conn.execute(
+                """
+                INSERT INTO checkpoints (project_id, seq, key_id, frequency)
+                SELECT ?, ?, key_id, SUM(frequency) FROM (
+                    SELECT key_id, frequency FROM statistics WHERE project_id = ?
+                    UNION ALL
+                    SELECT key_id, -frequency FROM commit_deltas WHERE project_id = ? AND seq > ?
+                )
+                GROUP BY key_id HAVING SUM(frequency) <> 0;
+                """,
+                (project_id, seq, project_id, project_id, seq)
+            )
+            self.conn.execute(
+                "UPDATE commit_log SET checkpoint = ? WHERE project_id = ? AND seq = ?;",
+                (SAVED_CHECKPOINT, project_id, seq)
+            )
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+
+    def last_checkpoint(self, project_id: int) -> int | None:
+        try:
+            row = self.conn.execute(
+                "SELECT MAX(seq) FROM commit_log WHERE project_id = ? AND checkpoint <> ?;",
+                (project_id, NO_CHECKPOINT)
+            ).fetchone()
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+        return row[0]
+
+    def get_log(self, project_id: int) -> list[CommitRecord]:
+        try:
+            cur = self.conn.execute(
+                """
+                SELECT seq, mode, created_at, delta_size, checkpoint FROM commit_log
+                WHERE project_id = ? ORDER BY seq;
+                """,
+                (project_id,)
+            )
+            return [
+                CommitRecord(
+                    seq=row["seq"],
+                    mode=CommitMode(row["mode"]),
+                    created_at=row["created_at"],
+                    delta_size=row["delta_size"],
+                    checkpoint=bool(row["checkpoint"]),
+                )
+                for row in cur.fetchall()
+            ]
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+
+    def get_as_of(self, project_id: int, seq: int, model_factory=StatisticsModel) -> StatisticsModel:
+        """
+        重建第 seq 次提交之后的数据：读取不晚于 seq 的最近检查点，在 SQL 中叠加之后的增量；
+        最近的检查点是最新的检查点时，由 statistics 减去 seq 之后的增量得到
+        """
+        try:
+            if self.conn.execute(
+                "SELECT 1 FROM commit_log WHERE project_id = ? AND seq = ?;",
+                (project_id, seq)
+            ).fetchone() is None:
+                raise NotFoundError(f"Commit {seq} of project {project_id} is not in the log.")
+            base = self.conn.execute(
+                """
+                SELECT seq, checkpoint FROM commit_log
+                WHERE project_id = ? AND checkpoint <> ? AND seq <= ?
+                ORDER BY seq DESC LIMIT 1;
+                """,
+                (project_id, NO_CHECKPOINT, seq)
+            ).fetchone()
+            if base is None:
+                raise NotFoundError(f"No checkpoint before commit {seq} of project {project_id}.")
+            # 没有增量的提交（覆盖、导入）无法回放，它们本应是检查点
+            if self.conn.execute(
+                "SELECT 1 FROM commit_log WHERE project_id = ? AND seq > ? AND seq <= ? AND delta_size = 0;",
+                (project_id, base["seq"], seq)
+            ).fetchone() is not None:
+                raise NotFoundError(f"Commit {seq} of project {project_id} can no longer be reconstructed.")
+            if base["checkpoint"] == PENDING_CHECKPOINT:
+                source = """
+                    SELECT key_id, frequency FROM statistics WHERE project_id = ?
+                    UNION ALL
+                    SELECT key_id, -frequency FROM commit_deltas WHERE project_id = ? AND seq > ?
+                """
+                params = (project_id, project_id, seq)
+            else:
+                source = """
+                    SELECT key_id, frequency FROM checkpoints WHERE project_id = ? AND seq = ?
+                    UNION ALL
+                    SELECT key_id, frequency FROM commit_deltas WHERE project_id = ? AND seq > ? AND seq <= ?
+                """
+                params = (project_id, base["seq"], project_id, base["seq"], seq)
+            cur = self.conn.execute(
+                f"""
+                SELECT v.key, SUM(c.frequency) AS frequency
+                FROM ({source}) c JOIN vocabulary v ON v.id = c.key_id
+                GROUP BY c.key_id HAVING SUM(c.frequency) <> 0;
+                """,
+                params
+            )
+            freq = {row["key"]: row["frequency"] for row in cur}
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+        stats = model_factory()
+        if freq:
+            stats.overwrite(freq)
+        return stats
+
+    def apply_retention(self, project_id: int, keep_checkpoints: int) -> None:
+        """
+        只保留最近 keep_checkpoints 个检查点，更早的检查点、增量和日志记录一并删除
+        """
+        if keep_checkpoints <= 0:
+            raise ValueError("keep_checkpoints must be positive.")
+        try:
+            row = self.conn.execute(
+                """
+                SELECT seq FROM commit_log WHERE project_id = ? AND checkpoint <> ?
+                ORDER BY seq DESC LIMIT 1 OFFSET ?;
+                """,
+                (project_id, NO_CHECKPOINT, keep_checkpoints - 1)
+            ).fetchone()
+            if row is None:
+                return
+            for table in ("commit_log", "commit_deltas", "checkpoints"):
+                self.conn.execute(
+                    f"DELETE FROM {table} WHERE project_id = ? AND seq < ?;",
+                    (project_id, row["seq"])
+                )
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+
+    def get_journal_seq(self, name: str) -> int:
+        """
+        返回写回日志 name 中已写入数据库的最大序号
+        """
+        try:
+            row = self.conn.execute(
+                "SELECT applied_seq FROM commit_journal WHERE name = ?;",
+                (name,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+        return row["applied_seq"] if row else 0
+
+    def set_journal_seq(self, name: str, seq: int) -> None:
+        try:
+            self.conn.execute(
+                """
+                INSERT INTO commit_journal (name, applied_seq) VALUES (?, ?)
+                ON CONFLICT(name) DO UPDATE SET applied_seq = excluded.applied_seq;
+                """,
+                (name, seq)
+            )
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
\ No newline at end of file
@@ -4,6 +4,8 @@ from hnstatistics.core.errors import DuplicateError, NotFoundError, RepositoryEr
 from hnstatistics.core.project import Project
 from hnstatistics.core.repositories.base_sqlite_repo import BaseSQLiteRepository
 
+PROJECT_COLUMNS = "id, name, total_count, distinct_count, updated_at, version, storage"
+
 class SQLiteProjectRepository(BaseSQLiteRepository):
     def __init__(self, conn):
         self.conn = conn
@@ -11,25 +13,22 @@ class SQLiteProjectRepository(BaseSQLiteRepository):
     def get_all(self) -> list[Project]:
         try:
             cur = self.conn.execute(
-                "SELECT id, name FROM projects ORDER BY id"
+                f"SELECT {PROJECT_COLUMNS} FROM projects ORDER BY id"
             )
-            return [
-                Project(name=row["name"], project_id=row["id"])
-                for row in cur.fetchall()
-            ]
+            return [self._to_project(row) for row in cur.fetchall()]
         except sqlite3.Error as e:
             raise RepositoryError(str(e))
     
     def get_by_id(self, project_id: int) -> Project | None:
         try:
             cur = self.conn.execute(
-                "SELECT id, name FROM projects WHERE id = ?;",
+                f"SELECT {PROJECT_COLUMNS} FROM projects WHERE id = ?;",
                 (project_id,)
             )
             row = cur.fetchone()
             if not row:
                 return None
-            return Project(name=row["name"], project_id=row["id"])
+            return self._to_project(row)
         except sqlite3.Error as e:
             raise RepositoryError(str(e))
             
@@ -63,4 +62,65 @@ class SQLiteProjectRepository(BaseSQLiteRepository):
             if cur.rowcount == 0:
                 raise NotFoundError(f"Project {project_id} not found.")
         except sqlite3.Error as e:
-            raise RepositoryError(str(e))
\ No newline at end of file
+            raise RepositoryError(str(e))
+    
+    def update_aggregates(self, project_id: int, total_count: int, distinct_count: int) -> tuple[int, str]:
+        """
+        提交统计数据时调用：更新汇总信息并递增版本号，返回新的 (version, updated_at)
+        """
+        try:
+            cur = self.conn.execute(
+                """
+                UPDATE projects SET
+                    total_count = ?,
+                    distinct_count = ?,
+                    updated_at = CURRENT_TIMESTAMP,
+                    version = version + 1
+                WHERE id = ?;
+                """,
+                (total_count, distinct_count, project_id)
+            )
+            if cur.rowcount == 0:
+                raise NotFoundError(f"Project {project_id} not found.")
+            row = self.conn.execute(
+                "SELECT version, updated_at FROM projects WHERE id = ?;",
+                (project_id,)
+            ).fetchone()
+            return row["version"], row["updated_at"]
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+    
+    def get_storage(self, project_id: int) -> str:
+        try:
+            row = self.conn.execute(
+                "SELECT storage FROM projects WHERE id = ?;",
+                (project_id,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+        if row is None:
+            raise NotFoundError(f"Project {project_id} not found.")
+        return row["storage"]
+    
+    def set_storage(self, project_id: int, storage: str) -> None:
+        try:
+            cur = self.conn.execute(
+                "UPDATE projects SET storage = ? WHERE id = ?;",
+                (storage, project_id)
+            )
+            if cur.rowcount == 0:
+                raise NotFoundError(f"Project {project_id} not found.")
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+    
+    @staticmethod
+    def _to_project(row) -> Project:
+        return Project(
+            name=row["name"],
+            project_id=row["id"],
+            total_count=row["total_count"],
+            distinct_count=row["distinct_count"],
+            updated_at=row["updated_at"],
+            version=row["version"],
+            storage=row["storage"],
+        )
\ No newline at end of file
@@ -1,28 +1,314 @@
 import sqlite3
+from collections.abc import Mapping
+from math import isqrt
 from hnstatistics.core.errors import RepositoryError
 from hnstatistics.core.repositories.base_sqlite_repo import BaseSQLiteRepository
+from hnstatistics.core.statistics.combine_mode import CombineMode
 from hnstatistics.core.statistics.model import StatisticsModel
+from hnstatistics.core.statistics.query_options import QueryOrder, StatisticsPage, StatisticsQuery
+
+
+def stage_frequencies(conn, freq: Mapping) -> None:
+    """
+    把待写入的键和频率批量放入连接私有的临时表 statistics_staging，并将其中的新键加入共享词表；
+    之后用一条 INSERT ... SELECT 按键关联出 key_id 写入目标表
+    """
+    conn.execute("""
+    CREATE TEMP TABLE IF NOT EXISTS statistics_staging (
+        key TEXT PRIMARY KEY,
+        frequency INTEGER NOT NULL
+    ) WITHOUT ROWID;
+    """)
+    conn.execute("DELETE FROM statistics_staging;")
+    conn.executemany(
+        "INSERT INTO statistics_staging (key, frequency) VALUES (?, ?);",
+        freq.items()
+    )
+    conn.execute("INSERT OR IGNORE INTO vocabulary (key) SELECT key FROM statistics_staging;")
 
 
 class SQLiteStatisticsRepository(BaseSQLiteRepository):
     def __init__(self, conn):
         self.conn = conn
 
-    def get_by_project_id(self, project_id: int) -> StatisticsModel:
-        stats = StatisticsModel()
+    def get_by_project_id(self, project_id: int, model_factory=StatisticsModel) -> StatisticsModel:
+        stats = model_factory()
         try:
             cur = self.conn.execute(
-                "SELECT key, frequency, probability FROM statistics WHERE project_id = ?;",
+                """
+                SELECT v.key, s.frequency
+                FROM statistics s JOIN vocabulary v ON v.id = s.key_id
+                WHERE s.project_id = ?;
+                """,
+                (project_id,)
+            )
+            freq = {row["key"]: row["frequency"] for row in cur}
+            if freq:
+                stats.overwrite(freq)
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+        return stats
+    
+    def query(self, project_id: int, query: StatisticsQuery) -> StatisticsPage:
+        """
+        按频率或键排序读取一页数据，使用 keyset 分页，游标与列式存储相同（代价见 _frequency_page_rows 和 _key_page_sql）；
+        概率使用 projects 表中保存的总数计算，不扫描整个项目
+        """
+        if query.limit <= 0:
+            raise ValueError("Query limit must be positive.")
+        if query.order_by not in (QueryOrder.FREQUENCY, QueryOrder.KEY):
+            raise ValueError(f"Unsupported query order: {query.order_by}")
+        try:
+            row = self.conn.execute(
+                "SELECT total_count, distinct_count FROM projects WHERE id = ?;",
                 (project_id,)
+            ).fetchone()
+            total = row["total_count"] if row else 0
+            if query.order_by == QueryOrder.FREQUENCY:
+                rows = self._frequency_page_rows(project_id, query)[query.offset:]
+            else:
+                sql, params = self._key_page_sql(project_id, query, row["distinct_count"] if row else 0)
+                rows = self.conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+        
+        page = StatisticsPage(
+            rows=[(row["key"], row["frequency"], row["frequency"] / total if total else 0.0) for row in rows],
+            total=total,
+        )
+        if len(rows) == query.limit:
+            last = rows[-1]
+            if query.order_by == QueryOrder.FREQUENCY:
+                page.next_cursor = (last["frequency"], last["key"])
+            else:
+                page.next_cursor = (last["key"],)
+        return page
+    
+    @staticmethod
+    def _frequency_filters(query: StatisticsQuery, conditions: list, params: list):
+        if query.min_frequency is not None:
+            conditions.append("s.frequency >= ?")
+            params.append(query.min_frequency)
+        if query.max_frequency is not None:
+            conditions.append("s.frequency <= ?")
+            params.append(query.max_frequency)
+    
+    def _frequency_page_rows(self, project_id: int, query: StatisticsQuery) -> list:
+        """
+        按 (frequency, key) 排序取出 offset + limit 行：同频率的键按键升序，与列式存储相同，游标与存储方式无关。
+        索引 (project_id, frequency DESC, key_id) 中同频率的行按 key_id 排列，因此沿索引按频率读取，
+        只有完整读到的频率组在 SQL 中按键排序；被截断的组（包括游标所在的组）由 _group_rows 单独读取
+        """
+        need = query.offset + query.limit
+        (vocabulary_size,) = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM vocabulary;").fetchone()
+        conditions = ["s.project_id = ?"]
+        params = [project_id]
+        self._frequency_filters(query, conditions, params)
+        direction = "DESC" if query.descending else "ASC"
+        
+        rows = []
+        bound = None
+        if query.after is not None:
+            frequency, key = query.after
+            if (query.min_frequency is None or frequency >= query.min_frequency) and \
+                    (query.max_frequency is None or frequency <= query.max_frequency):
+                rows += self._group_rows(project_id, frequency, key, need, vocabulary_size)
+            bound = frequency
+        while len(rows) < need:
+            where = list(conditions)
+            where_params = list(params)
+            if bound is not None:
+                where.append("s.frequency < ?" if query.descending else "s.frequency > ?")
+                where_params.append(bound)
+            prefix = need - len(rows)
+            fetched = self.conn.execute(
+                f"""
+                SELECT v.key, p.frequency
+                FROM (
+                    SELECT s.key_id, s.frequency
+                    FROM statistics s INDEXED BY idx_statistics_frequency
+                    WHERE {" AND ".join(where)}
+                    ORDER BY s.frequency {direction}
+                    LIMIT ?
+                ) p CROSS JOIN vocabulary v ON v.id = p.key_id
+                ORDER BY p.frequency {direction}, v.key ASC;
+                """,
+                where_params + [prefix]
+            ).fetchall()
+            if len(fetched) < prefix:
+                rows += fetched
+                break
+            # 最后一个频率组可能被截断，只保留之前完整的组
+            last = fetched[-1]["frequency"]
+            rows += [row for row in fetched if row["frequency"] != last]
+            if len(rows) < need:
+                rows += self._group_rows(project_id, last, None, need - len(rows), vocabulary_size)
+            bound = last
+        return rows[:need]
+    
+    def _group_rows(self, project_id: int, frequency: int, after: str | None, n: int, vocabulary_size: int) -> list:
+        # 按键顺序读取一个频率组中键大于 after 的前 n 行，与 _key_page_sql 相同的两种方式：
+        # 组内的行数不超过 sqrt(n * 词表大小) 时读取整组并排序，否则沿 key 索引扫描词表，
+        # 约访问 n * 词表大小 / 组大小 个词；两者都不超过 sqrt(n * 词表大小)，只有组的最后一页会扫描到词表末尾
+        budget = max(n, isqrt(n * vocabulary_size))
+        (size,) = self.conn.execute(
+            """
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM statistics INDEXED BY idx_statistics_frequency
+                WHERE project_id = ? AND frequency = ? LIMIT ?
+            );
+            """,
+            (project_id, frequency, budget + 1)
+        ).fetchone()
+        if size <= budget:
+            source = "statistics s INDEXED BY idx_statistics_frequency CROSS JOIN vocabulary v ON v.id = s.key_id"
+        else:
+            source = "vocabulary v CROSS JOIN statistics s ON s.key_id = v.id"
+        conditions = ["s.project_id = ?", "s.frequency = ?"]
+        params = [project_id, frequency]
+        if after is not None:
+            conditions.append("v.key > ?")
+            params.append(after)
+        return self.conn.execute(
+            f"""
+            SELECT v.key, s.frequency
+            FROM {source}
+            WHERE {" AND ".join(conditions)}
+            ORDER BY v.key ASC
+            LIMIT ?;
+            """,
+            params + [n]
+        ).fetchall()
+    
+    def _key_page_sql(self, project_id: int, query: StatisticsQuery, distinct_count: int) -> tuple[str, list]:
+        # 词表为所有项目共享，键的顺序只保存在 vocabulary 的 key 索引中，有两种执行方式：
+        # 沿 key 索引扫描词表并按主键查找该项目的频率，每页约访问 (offset + limit) * 词表大小 / 项目键数 个词；
+        # 或按主键 (project_id, key_id) 只读取该项目的行，关联出键后用 LIMIT 限定大小的排序取出一页，访问项目的全部行。
+        # 按估计的访问行数选择较少的一种，项目在词表中越稀疏越倾向后者，每页的代价不超过项目自身的行数
+        (vocabulary_size,) = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM vocabulary;").fetchone()
+        scan_vocabulary = (query.offset + query.limit) * vocabulary_size < distinct_count * distinct_count
+        
+        conditions = ["s.project_id = ?"]
+        params = [project_id]
+        self._frequency_filters(query, conditions, params)
+        if query.after is not None:
+            conditions.append("v.key < ?" if query.descending else "v.key > ?")
+            params.append(query.after[0])
+        if scan_vocabulary:
+            source = "vocabulary v CROSS JOIN statistics s ON s.key_id = v.id"
+        else:
+            source = "statistics s CROSS JOIN vocabulary v ON v.id = s.key_id"
+        sql = f"""
+        SELECT s.key_id, v.key, s.frequency
+        FROM {source}
+        WHERE {" AND ".join(conditions)}
+        ORDER BY v.key {"DESC" if query.descending else "ASC"}
+        LIMIT ? OFFSET ?;
+        """
+        return sql, params + [query.limit, query.offset]
+    
+    def get_combined(self, project_ids: list[int], mode: CombineMode, model_factory=StatisticsModel) -> StatisticsModel:
+        """
+        在 SQLite 中组合多个项目，只把组合结果读入模型
+        """
+        sql, params = self._combined_sql(project_ids, mode)
+        stats = model_factory()
+        try:
+            cur = self.conn.execute(
+                f"""
+                SELECT v.key, c.frequency
+                FROM ({sql}) c JOIN vocabulary v ON v.id = c.key_id;
+                """,
+                params
             )
-            for row in cur.fetchall():
-                stats.frequency[row["key"]] = row["frequency"]
-                stats.probability[row["key"]] = row["probability"]
-            stats._recalc()
+            freq = {row["key"]: row["frequency"] for row in cur}
+            if freq:
+                stats.overwrite(freq)
         except sqlite3.Error as e:
             raise RepositoryError(str(e))
         return stats
     
+    def insert_combined(self, target_id: int, project_ids: list[int], mode: CombineMode) -> None:
+        """
+        把多个项目的组合结果直接写入目标项目，数据不经过 Python
+        """
+        if target_id in project_ids:
+            raise ValueError("Target project must not be one of the combined projects.")
+        sql, params = self._combined_sql(project_ids, mode)
+        try:
+            self.conn.execute(
+                f"""
+                INSERT INTO statistics (project_id, key_id, frequency)
+                SELECT ?, c.key_id, c.frequency FROM ({sql}) c;
+                """,
+                [target_id] + params
+            )
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+    
+    def aggregate(self, project_id: int) -> tuple[int, int]:
+        """
+        返回项目的 (频率总和, 不同键数量)
+        """
+        try:
+            row = self.conn.execute(
+                "SELECT COALESCE(SUM(frequency), 0), COUNT(*) FROM statistics WHERE project_id = ?;",
+                (project_id,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+        return row[0], row[1]
+    
+    @staticmethod
+    def _combined_sql(project_ids: list[int], mode: CombineMode) -> tuple[str, list]:
+        project_ids = list(dict.fromkeys(project_ids))
+        if not project_ids:
+            raise ValueError("No projects to combine.")
+        placeholders = ", ".join("?" * len(project_ids))
+        if mode == CombineMode.UNION:
+            sql = f"""
+            SELECT key_id, SUM(frequency) AS frequency FROM statistics
+            WHERE project_id IN ({placeholders}) GROUP BY key_id
+            """
+            return sql, project_ids
+        if mode == CombineMode.INTERSECTION:
+            sql = f"""
+            SELECT key_id, SUM(frequency) AS frequency FROM statistics
+            WHERE project_id IN ({placeholders}) GROUP BY key_id HAVING COUNT(*) = ?
+            """
+            return sql, project_ids + [len(project_ids)]
+        if mode == CombineMode.DIFFERENCE:
+            others = project_ids[1:]
+            sql = f"""
+            SELECT s.key_id, s.frequency FROM statistics s
+            WHERE s.project_id = ? AND NOT EXISTS (
+                SELECT 1 FROM statistics o
+                WHERE o.project_id IN ({", ".join("?" * len(others))}) AND o.key_id = s.key_id
+            )
+            """
+            return sql, project_ids
+        raise ValueError(f"Unsupported combine mode: {mode}")
+    
+    def prune_vocabulary(self) -> int:
+        """
+        删除不再被 statistics、commit_deltas 和 checkpoints 引用的词，返回删除的行数。
+        用 EXCEPT 一次求差集，代价与各表的总行数成正比，适合在删除项目或维护时执行，不在每次提交时执行
+        """
+        try:
+            cur = self.conn.execute(
+                """
+                DELETE FROM vocabulary WHERE id IN (
+                    SELECT id FROM vocabulary
+                    EXCEPT SELECT key_id FROM statistics
+                    EXCEPT SELECT key_id FROM commit_deltas
+                    EXCEPT SELECT key_id FROM checkpoints
+                );
+                """
+            )
+        except sqlite3.Error as e:
+            raise RepositoryError(str(e))
+        return cur.rowcount
+    
     def delete_by_project_id(self, project_id: int) -> None:
         try:
             self.conn.execute(
@@ -34,17 +320,41 @@ class SQLiteStatisticsRepository(BaseSQLiteRepository):
     
     def insert(self, project_id: int, stats: StatisticsModel) -> None:
         try:
-            for key, freq in stats.frequency.items():
-                self.conn.execute(
-                    "INSERT INTO statistics (project_id, key, frequency, probability) VALUES (?, ?, ?, ?);",
-                    (project_id, key, freq, stats.probability[key])
-                )
+            stage_frequencies(self.conn, stats.frequency)
+            self.conn.execute(
+                """
+                INSERT INTO statistics (project_id, key_id, frequency)
+                SELECT ?, v.id, t.frequency
+                FROM statistics_staging t JOIN vocabulary v ON v.key = t.key
+                ORDER BY v.id;
+                """,
+                (project_id,)
+            )
         except sqlite3.Error as e:
             raise RepositoryError(str(e))
     
-    def update(self, project_id: int, stats: StatisticsModel) -> None:
+    def merge(self, project_id: int, delta: Mapping) -> None:
+        """
+        只写入增量：已存在的键累加频率，新键直接插入
+        """
         try:
-            self.delete_by_project_id(project_id)
-            self.insert(project_id, stats)
+            stage_frequencies(self.conn, delta)
+            self.conn.execute(
+                """
+                INSERT INTO statistics (project_id, key_id, frequency)
+                SELECT ?, v.id, t.frequency
+                FROM statistics_staging t JOIN vocabulary v ON v.key = t.key
+                WHERE true
+                ON CONFLICT(project_id, key_id) DO UPDATE SET frequency = frequency + excluded.frequency;
+                """,
+                (project_id,)
+            )
         except sqlite3.Error as e:
-            raise RepositoryError(str(e))
\ No newline at end of file
+            raise RepositoryError(str(e))
+    
+    def overwrite(self, project_id: int, stats: StatisticsModel) -> None:
+        self.delete_by_project_id(project_id)
+        self.insert(project_id, stats)
+    
+    def update(self, project_id: int, stats: StatisticsModel) -> None:
+        self.overwrite(project_id, stats)
\ No newline at end of file
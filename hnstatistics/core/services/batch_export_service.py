@@ -0,0 +1,266 @@
+import json
+import os
+import re
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+
+from hnstatistics.core.db import configure_database, get_connection_manager
+from hnstatistics.core.errors import ExportFormatError, ExportIOError
+from hnstatistics.core.services.export_service import export_project
+from hnstatistics.core.services.project_service import ProjectService
+
+MANIFEST_NAME = "manifest.json"
+BATCH_FORMATS = ("csv", "xlsx", "json", "npz", "csv.gz", "csv.xz", "json.gz", "json.xz")
+_UNSAFE_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+
+class ExportStatus(Enum):
+    EXPORTED = "exported"
+    SKIPPED = "skipped"    # 版本号与上次导出时相同
+    FAILED = "failed"
+
+@dataclass
+class ProjectExportResult:
+    project_id: int
+    name: str
+    status: ExportStatus
+    version: int = 0
+    files: list[str] = field(default_factory=list)
+    rows: int = 0
+    bytes_written: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+@dataclass
+class BatchExportReport:
+    output_dir: str
+    results: list[ProjectExportResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def by_status(self, status: ExportStatus) -> list[ProjectExportResult]:
+        return [r for r in self.results if r.status == status]
+
+    @property
+    def rows(self) -> int:
+        return sum(r.rows for r in self.results)
+
+    @property
+    def bytes_written(self) -> int:
+        return sum(r.bytes_written for r in self.results)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class BatchExportService:
+    """
+    把多个项目导出为多种格式，每个项目在进程池中单独加载和导出（XLSX 的生成受 CPU 限制）。
+    目录结构为 <output_dir>/<格式>/<项目ID>-<项目名>.<格式>，
+    <output_dir>/manifest.json 记录每个文件导出时的项目版本，版本未变且文件仍在时跳过
+    """
+    def __init__(self, max_workers: int | None = None, project_service: ProjectService | None = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.project_service = project_service or ProjectService()
+
+    def export(
+        self,
+        project_ids: Iterable[int],
+        formats: Iterable[str],
+        output_dir: str,
+        force: bool = False,
+        progress: Callable[[float], None] | None = None,
+        check_cancelled: Callable[[], None] | None = None,
+    ) -> BatchExportReport:
+        formats = _check_formats(formats)
+        output = Path(output_dir)
+        start = time.perf_counter()
+        report = BatchExportReport(output_dir=str(output))
+        manifest = _load_manifest(output)
+        entries = manifest.setdefault("projects", {})
+
+        projects = {p.id: p for p in self.project_service.list_projects()}
+        jobs = []
+        for project_id in dict.fromkeys(project_ids):
+            project = projects.get(project_id)
+            if project is None:
+                report.results.append(ProjectExportResult(
+                    project_id, "", ExportStatus.FAILED, error=f"Project {project_id} not found."
+                ))
+                continue
+            entry = entries.get(str(project_id), {})
+            files = entry.get("files", {})
+            targets = {fmt: project_file(project_id, project.name, fmt) for fmt in formats}
+            if force or entry.get("version") != project.version:
+                pending = list(targets.items())
+            else:
+                pending = [
+                    (fmt, path) for fmt, path in targets.items()
+                    if files.get(fmt) != path or not (output / path).exists()
+                ]
+            if not pending:
+                report.results.append(ProjectExportResult(
+                    project_id, project.name, ExportStatus.SKIPPED, version=project.version,
+                ))
+                continue
+            jobs.append((project, pending))
+
+        done_count = 0
+        for project, result in self._run(output, jobs, check_cancelled):
+            report.results.append(result)
+            if result.status == ExportStatus.EXPORTED:
+                entry = entries.setdefault(str(project.id), {})
+                files = entry.setdefault("files", {})
+                for fmt, path in result.files:
+                    old = files.get(fmt)
+                    if old is not None and old != path:
+                        # 项目改名后旧文件名的导出已经过时
+                        (output / old).unlink(missing_ok=True)
+                    files[fmt] = path
+                entry["name"] = project.name
+                entry["version"] = result.version
+                entry["exported_at"] = datetime.now().isoformat(timespec="seconds")
+                result.files = [path for _, path in result.files]
+                _save_manifest(output, manifest)
+            done_count += 1
+            if progress is not None:
+                progress(done_count / len(jobs))
+
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def _run(self, output: Path, jobs: list, check_cancelled):
+        """
+        按完成顺序产生 (project, ProjectExportResult)；只有一个任务或一个进程时在当前进程中执行
+        """
+        workers = min(self.max_workers, len(jobs))
+        if workers <= 1:
+            for project, targets in jobs:
+                if check_cancelled is not None:
+                    check_cancelled()
+                yield project, _to_result(project, export_worker(None, project.id, str(output), targets))
+            return
+
+        import multiprocessing
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+        db_path = get_connection_manager().settings.path
+        # 使用 spawn：fork 出的子进程会继承父进程已打开的 SQLite 连接，不能安全使用
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = {
+                executor.submit(export_worker, db_path, project.id, str(output), targets): project
+                for project, targets in jobs
+            }
+            pending = set(futures)
+            try:
+                while pending:
+                    done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                    if check_cancelled is not None:
+                        check_cancelled()
+                    for future in done:
+                        project = futures[future]
+                        try:
+                            outcome = future.result()
+                        except Exception as e:  # 工作进程异常退出
+                            outcome = {"error": f"{type(e).__name__}: {e}"}
+                        yield project, _to_result(project, outcome)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+def project_file(project_id: int, name: str, fmt: str) -> str:
+    """
+    导出文件相对于输出目录的路径
+    """
+    safe = _UNSAFE_CHARS.sub("_", name).strip().rstrip(". ") or "project"
+    return f"{fmt}/{project_id}-{safe}.{fmt}"
+
+def export_worker(db_path: str | None, project_id: int, output_dir: str, targets: list[tuple[str, str]]) -> dict:
+    """
+    在工作进程中加载项目并导出为各个格式。先写入临时文件再改名，中途失败不会留下不完整的文件。
+    异常转换为字符串返回，自定义异常不一定能跨进程还原
+    """
+    start = time.perf_counter()
+    written = []
+    try:
+        if db_path is not None and get_connection_manager().settings.path != db_path:
+            configure_database(db_path)
+        project = ProjectService().load(project_id, compact=True)
+        size = 0
+        for fmt, relative in targets:
+            path = Path(output_dir) / relative
+            tmp = path.with_name(f".tmp-{os.getpid()}-{path.name}")
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                export_project(project, str(tmp), fmt.rsplit(".", 1)[-1])
+                os.replace(tmp, path)
+            except OSError as e:
+                raise ExportIOError(str(path), str(e))
+            finally:
+                if tmp.exists():
+                    tmp.unlink()
+            size += path.stat().st_size
+            written.append((fmt, relative))
+        return {
+            "version": project.version,
+            "rows": len(project.stats.frequency),
+            "bytes": size,
+            "files": written,
+            "seconds": time.perf_counter() - start,
+        }
+    except Exception as e:
+        return {"error": str(e) or type(e).__name__, "files": written, "seconds": time.perf_counter() - start}
+
+def _to_result(project, outcome: dict) -> ProjectExportResult:
+    if "error" in outcome:
+        return ProjectExportResult(
+            project.id, project.name, ExportStatus.FAILED,
+            version=project.version, seconds=outcome.get("seconds", 0.0), error=outcome["error"],
+        )
+    return ProjectExportResult(
+        project.id, project.name, ExportStatus.EXPORTED,
+        version=outcome["version"],
+        files=outcome["files"],
+        rows=outcome["rows"],
+        bytes_written=outcome["bytes"],
+        seconds=outcome["seconds"],
+    )
+
+def _check_formats(formats: Iterable[str]) -> list[str]:
+    result = []
+    for fmt in formats:
+        fmt = fmt.lower().lstrip(".")
+        if fmt not in BATCH_FORMATS:
+            raise ExportFormatError(fmt, "Unsupported export format.")
+        if fmt not in result:
+            result.append(fmt)
+    if not result:
+        raise ExportFormatError("", "No export format given.")
+    return result
+
+def _load_manifest(output: Path) -> dict:
+    try:
+        with open(output / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}  # 没有清单或清单损坏时全部重新导出
+
+def _save_manifest(output: Path, manifest: dict):
+    tmp = output / f"{MANIFEST_NAME}.tmp"
+    try:
+        output.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, output / MANIFEST_NAME)
+    except OSError as e:
+        raise ExportIOError(str(output / MANIFEST_NAME), str(e))
\ No newline at end of file
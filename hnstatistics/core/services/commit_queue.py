@@ -0,0 +1,228 @@
+import json
+import os
+import threading
+import time
+
+from hnstatistics.core.db import get_connection_manager
+from hnstatistics.core.project import Project
+from hnstatistics.core.services.statistics_service import StatisticsService
+from hnstatistics.core.statistics.commit_mode import CommitMode
+from hnstatistics.core.statistics.model import StatisticsModel
+from hnstatistics.core.uow import UnitOfWork
+
+DEFAULT_MAX_PENDING_KEYS = 100_000
+DEFAULT_MAX_DELAY = 2.0  # seconds
+JOURNAL_NAME = "write-behind"
+
+
+class WriteBehindCommitQueue:
+    """
+    写回提交队列：合并提交由 apply_commit 立即作用于内存中的 project.stats，增量按项目累积，
+    达到键数或时间阈值、切换项目、退出或显式调用 flush() 时在一个事务中写入数据库。
+    每个增量先追加到日志文件，崩溃后由 recover() 重放尚未写入数据库的部分。
+    """
+    def __init__(
+        self,
+        statistics_service: StatisticsService,
+        journal_path: str | None = None,
+        max_pending_keys: int = DEFAULT_MAX_PENDING_KEYS,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        fsync: bool = True,
+    ):
+        self.statistics_service = statistics_service
+        self.journal_path = journal_path
+        self.max_pending_keys = max_pending_keys
+        self.max_delay = max_delay
+        self.fsync = fsync
+        self.last_error: Exception | None = None
+
+        self._lock = threading.Lock()        # 保护待写入的增量和日志文件
+        self._flush_lock = threading.Lock()  # 保证写入数据库的顺序，先于 _lock 获取
+        self._wakeup = threading.Condition(self._lock)
+        self._pending: dict[int, tuple[Project, tuple[int, int], dict]] = {}  # project_id -> (项目, 写入后的汇总, 增量)
+        self._pending_keys = 0
+        self._oldest: float | None = None
+        self._seq: int | None = None
+        self._journal = None
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    @property
+    def pending_keys(self) -> int:
+        return self._pending_keys
+
+    def recover(self):
+        """
+        重放日志中尚未写入数据库的增量（上次异常退出时遗留），然后清空日志；
+        应在第一次提交之前调用，否则在第一次提交时自动调用
+        """
+        if self._journal is not None:
+            raise RuntimeError("Commit queue is already open.")
+        with self._flush_lock:
+            path = self._journal_path()
+            with UnitOfWork() as uow:
+                applied = uow.commit_log.get_journal_seq(JOURNAL_NAME)
+            last = applied
+            deltas: dict[int, dict] = {}
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            break  # 崩溃时未写完的最后一行
+                        if record["seq"] <= applied:
+                            continue
+                        delta = deltas.setdefault(record["project_id"], {})
+                        for k, v in record["delta"].items():
+                            delta[k] = delta.get(k, 0) + v
+                        last = record["seq"]
+            if last > applied:
+                with UnitOfWork() as uow:
+                    existing = {pid for pid in deltas if uow.projects.get_by_id(pid) is not None}
+                self.statistics_service.write_deltas(
+                    [(pid, delta, None) for pid, delta in deltas.items() if pid in existing],
+                    journal=(JOURNAL_NAME, last),
+                )
+            if os.path.exists(path):
+                os.remove(path)
+            with self._lock:
+                self._seq = last
+
+    def commit(self, project: Project, stats: StatisticsModel, mode: CommitMode):
+        """
+        与 StatisticsService.commit 相同的接口
+        """
+        self.statistics_service.apply_commit(project, self.write_commit(project, stats, mode))
+
+    def write_commit(self, project: Project, stats: StatisticsModel, mode: CommitMode) -> tuple:
+        """
+        与 StatisticsService.write_commit 相同的接口，同样不修改 project；
+        精确模型的合并提交延迟写入，返回的结果中没有版本号，写入数据库时再更新 project，其他提交先写出队列再同步执行
+        """
+        if not stats:
+            raise ValueError("No statistics to commit.")
+        if mode != CommitMode.MERGE or not (project.stats.exact and stats.exact):
+            with self._flush_lock:
+                self._flush_locked()
+                return self.statistics_service.write_commit(project, stats, mode)
+
+        delta = dict(stats.frequency.items())
+        # project.stats 尚未合并本次增量，由它推算写入后的汇总
+        counts = self.statistics_service.merged_counts(project.stats, delta)
+        with self._lock:
+            self._ensure_open()
+            self._seq += 1
+            self._append({"seq": self._seq, "project_id": project.id, "delta": delta})
+
+            _, _, pending = self._pending.get(project.id, (None, None, {}))
+            self._pending[project.id] = (project, counts, pending)
+            before = len(pending)
+            for k, v in delta.items():
+                pending[k] = pending.get(k, 0) + v
+            self._pending_keys += len(pending) - before
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._wakeup.notify()
+        return None, delta, None
+
+    def flush(self):
+        """
+        立即把所有待写入的增量写入数据库，返回后数据已持久化
+        """
+        with self._flush_lock:
+            self._flush_locked()
+
+    def close(self):
+        """
+        写出剩余的增量并停止后台线程，程序退出前调用
+        """
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def _flush_locked(self):
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            self._pending_keys = 0
+            self._oldest = None
+            seq = self._seq
+            # 每个项目最后一次提交时推算的汇总包含全部待写入的增量
+            batch = [(project_id, delta, counts) for project_id, (_, counts, delta) in pending.items()]
+        try:
+            results = self.statistics_service.write_deltas(batch, journal=(JOURNAL_NAME, seq))
+        except Exception:
+            with self._lock:
+                self._restore(pending)
+            raise
+        for project_id, result in results.items():
+            self.statistics_service.apply_commit_result(pending[project_id][0], result)
+        with self._lock:
+            if self._seq == seq and self._journal is not None:
+                # 期间没有新的提交，日志中的内容都已写入数据库
+                self._journal.truncate(0)
+
+    def _restore(self, pending: dict):
+        for project_id, (project, counts, delta) in pending.items():
+            _, _, current = self._pending.setdefault(project_id, (project, counts, {}))
+            before = len(current)
+            for k, v in delta.items():
+                current[k] = current.get(k, 0) + v
+            self._pending_keys += len(current) - before
+        self._oldest = time.monotonic()
+
+    def _ensure_open(self):
+        if self._closed:
+            raise RuntimeError("Commit queue is closed.")
+        if self._seq is None:
+            self._lock.release()
+            try:
+                self.recover()
+            finally:
+                self._lock.acquire()
+        if self._journal is None:
+            self._journal = open(self._journal_path(), "a", encoding="utf-8")
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="commit-queue", daemon=True)
+            self._thread.start()
+
+    def _journal_path(self) -> str:
+        if self.journal_path is None:
+            self.journal_path = f"{get_connection_manager().settings.path}-commit-journal"
+        return self.journal_path
+
+    def _append(self, record: dict):
+        journal = self._journal
+        journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+        journal.flush()
+        if self.fsync:
+            os.fsync(journal.fileno())
+
+    def _run(self):
+        with self._lock:
+            while not self._closed:
+                timeout = None
+                if self._oldest is not None:
+                    timeout = self._oldest + self.max_delay - time.monotonic()
+                    if timeout <= 0 or self._pending_keys >= self.max_pending_keys:
+                        self._lock.release()
+                        try:
+                            self.flush()
+                            self.last_error = None
+                        except Exception as e:
+                            # 增量已放回队列，等待下一个周期重试
+                            self.last_error = e
+                        finally:
+                            self._lock.acquire()
+                        continue
+                self._wakeup.wait(timeout)
\ No newline at end of file
@@ -1,23 +1,47 @@
+from importlib import import_module
+
 from hnstatistics.core.errors import ExportFormatError, ProjectEmptyError
-from hnstatistics.core.infrastructure.exporters.csv_exporter import export_csv
-from hnstatistics.core.infrastructure.exporters.excel_exporter import export_excel
-from hnstatistics.core.infrastructure.exporters.json_exporter import export_json
+from hnstatistics.core.infrastructure.compression import COMPRESSIONS, split_compression
+
+# 格式 -> (模块, 函数, 是否支持压缩)；导出器在第一次使用时才导入，例如 openpyxl 只在导出 XLSX 时加载
+EXPORTERS = {
+    "csv": ("hnstatistics.core.infrastructure.exporters.csv_exporter", "export_csv", True),
+    "xlsx": ("hnstatistics.core.infrastructure.exporters.excel_exporter", "export_excel", False),
+    "xls": ("hnstatistics.core.infrastructure.exporters.excel_exporter", "export_excel", False),
+    "json": ("hnstatistics.core.infrastructure.exporters.json_exporter", "export_json", True),
+    "npz": ("hnstatistics.core.infrastructure.exporters.npz_exporter", "export_npz", False),
+}
+
+def get_exporter(fmt: str, compression: str | None = None):
+    """
+    返回格式对应的导出函数，需要时才导入其模块
+    """
+    entry = EXPORTERS.get(fmt)
+    if entry is None or (compression is not None and not entry[2]):
+        raise ExportFormatError(fmt, "Unsupported export format.")
+    module, name, _ = entry
+    try:
+        return getattr(import_module(module), name)
+    except ImportError as e:
+        # 例如没有安装 openpyxl
+        raise ExportFormatError(fmt, f"Exporter is not available: {e}")
 
 def export_project(project, file_path: str, fmt: str):
     if project is None:
         raise ProjectEmptyError()
-    
+
     stats = project.stats
     if stats is None or not stats.frequency or not stats.probability:
         raise ProjectEmptyError()
-    
+
     fmt = fmt.lower()
-    
-    if fmt == "csv":
-        export_csv(stats, file_path)
-    elif fmt in ("xlsx", "xls"):
-        export_excel(stats, file_path)
-    elif fmt == "json":
-        export_json(stats, file_path)
+    compression = None
+    if fmt in COMPRESSIONS:
+        # 例如 "data.csv.gz"：压缩方式由最后一个扩展名决定，格式由前一个扩展名决定
+        fmt, compression = split_compression(file_path)
+
+    exporter = get_exporter(fmt, compression)
+    if compression is None:
+        exporter(stats, file_path)
     else:
-        raise ExportFormatError(fmt, "Unsupported export format.")
\ No newline at end of file
+        exporter(stats, file_path, compression)
\ No newline at end of file
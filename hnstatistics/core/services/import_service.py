@@ -0,0 +1,108 @@
+from collections.abc import Iterable, Iterator
+from importlib import import_module
+from itertools import islice
+
+from hnstatistics.core.errors import ImportFormatError, NotFoundError
+from hnstatistics.core.infrastructure.compression import split_compression
+from hnstatistics.core.project import Project
+from hnstatistics.core.services.statistics_service import StatisticsService
+from hnstatistics.core.statistics.commit_mode import CommitMode
+from hnstatistics.core.statistics.compact_model import CompactStatisticsModel
+from hnstatistics.core.uow import UnitOfWork
+
+IMPORT_BATCH_SIZE = 50_000
+
+# 格式 -> (模块, 函数, 是否支持压缩)，与 export_service.EXPORTERS 相同，第一次使用时才导入
+IMPORTERS = {
+    "csv": ("hnstatistics.core.infrastructure.importers.csv_importer", "iter_csv", True),
+    "xlsx": ("hnstatistics.core.infrastructure.importers.excel_importer", "iter_excel", False),
+    "xls": ("hnstatistics.core.infrastructure.importers.excel_importer", "iter_excel", False),
+    "json": ("hnstatistics.core.infrastructure.importers.json_importer", "iter_json", True),
+    "npz": ("hnstatistics.core.infrastructure.importers.npz_importer", "iter_npz", False),
+}
+
+def iter_import_rows(file_path: str, fmt: str | None = None) -> Iterator[tuple[str, int]]:
+    """
+    按格式逐行读取 export_project 导出的文件，产生 (Item, Frequency)
+    """
+    detected, compression = split_compression(file_path)
+    fmt = (fmt or detected).lower()
+    entry = IMPORTERS.get(fmt)
+    if entry is None or (compression is not None and not entry[2]):
+        raise ImportFormatError(fmt, "Unsupported import format.")
+    module, name, _ = entry
+    try:
+        importer = getattr(import_module(module), name)
+    except ImportError as e:
+        raise ImportFormatError(fmt, f"Importer is not available: {e}")
+    return importer(file_path)
+
+def iter_batches(rows: Iterable[tuple[str, int]], batch_size: int = IMPORT_BATCH_SIZE) -> Iterator[dict]:
+    """
+    把行按 batch_size 分批汇总为 {键: 频率}，同一批中重复的键累加
+    """
+    rows = iter(rows)
+    while True:
+        batch = {}
+        for key, freq in islice(rows, batch_size):
+            batch[key] = batch.get(key, 0) + freq
+        if not batch:
+            return
+        yield batch
+
+
+class ImportService:
+    """
+    export_project 的逆操作：流式读取导出文件，分批写入数据库，不把整个文件读入内存
+    """
+    def __init__(self, statistics_service: StatisticsService | None = None, batch_size: int = IMPORT_BATCH_SIZE):
+        self.statistics_service = statistics_service or StatisticsService()
+        self.batch_size = batch_size
+
+    def import_new_project(self, name: str, file_path: str, fmt: str | None = None) -> Project:
+        """
+        新建项目并导入文件，失败时不会留下空项目
+        """
+        with UnitOfWork() as uow:
+            project_id = uow.projects.insert(name)
+            self._import(uow, project_id, file_path, fmt, CommitMode.OVERWRITE)
+            return uow.projects.get_by_id(project_id)
+
+    def import_into_project(
+        self,
+        project_id: int,
+        file_path: str,
+        fmt: str | None = None,
+        mode: CommitMode = CommitMode.MERGE,
+    ) -> Project:
+        """
+        导入到已有项目：MERGE 累加到现有数据，OVERWRITE 替换现有数据
+        """
+        with UnitOfWork() as uow:
+            if uow.projects.get_by_id(project_id) is None:
+                raise NotFoundError(f"Project {project_id} not found.")
+            self._import(uow, project_id, file_path, fmt, mode)
+            return uow.projects.get_by_id(project_id)
+
+    def _import(self, uow: UnitOfWork, project_id: int, file_path: str, fmt: str | None, mode: CommitMode):
+        if mode not in (CommitMode.MERGE, CommitMode.OVERWRITE):
+            raise ValueError(f"Unsupported commit mode: {mode}")
+        repo = uow.statistics_for(project_id)
+        batches = iter_batches(iter_import_rows(file_path, fmt), self.batch_size)
+        if repo is uow.statistics:
+            self.statistics_service.prepare_rewrite(uow, repo, project_id)
+            if mode == CommitMode.OVERWRITE:
+                repo.delete_by_project_id(project_id)
+            for batch in batches:
+                repo.merge(project_id, batch)
+        else:
+            # 列式存储每次写入都会生成新版本，先在紧凑模型中累积，最后整体写入一次
+            if mode == CommitMode.OVERWRITE:
+                stats = CompactStatisticsModel()
+            else:
+                stats = repo.get_by_project_id(project_id, CompactStatisticsModel)
+            for batch in batches:
+                stats.merge(batch)
+            repo.overwrite(project_id, stats)
+        # 导入的数据量可能很大，不作为增量记录，而是作为检查点
+        self.statistics_service.record_commit(uow, repo, project_id, mode, None, None)
\ No newline at end of file
@@ -1,6 +1,11 @@
 from hnstatistics.core.errors import ProjectNotSelectedError
 from hnstatistics.core.project import Project
 from hnstatistics.core.repositories.sqlite_project_repo import SQLiteProjectRepository
+from hnstatistics.core.statistics.combine_mode import CombineMode
+from hnstatistics.core.statistics.commit_mode import CommitMode
+from hnstatistics.core.statistics.compact_model import CompactStatisticsModel
+from hnstatistics.core.statistics.model import StatisticsModel
+from hnstatistics.core.statistics.storage_backend import StorageBackend
 from hnstatistics.core.uow import UnitOfWork
 
 
@@ -9,10 +14,33 @@ class ProjectService:
         with UnitOfWork() as uow:
             return uow.projects.get_all()
     
-    def create(self, name: str) -> Project:
+    def create(self, name: str, storage: StorageBackend = StorageBackend.SQLITE) -> Project:
         with UnitOfWork() as uow:
             project_id = uow.projects.insert(name)
-            return Project(name=name, project_id=project_id)
+            if storage != StorageBackend.SQLITE:
+                uow.projects.set_storage(project_id, storage.value)
+            return Project(name=name, project_id=project_id, storage=storage.value)
+    
+    def create_combined(self, name: str, project_ids: list[int], mode: CombineMode = CombineMode.UNION) -> Project:
+        """
+        把多个项目的组合结果保存为新项目，整个过程在一个事务中由 SQL 完成
+        """
+        with UnitOfWork() as uow:
+            require_sqlite_storage(uow, project_ids)
+            project_id = uow.projects.insert(name)
+            uow.statistics.insert_combined(project_id, project_ids, mode)
+            total_count, distinct_count = uow.statistics.aggregate(project_id)
+            version, updated_at = uow.projects.update_aggregates(project_id, total_count, distinct_count)
+            uow.commit_log.record(project_id, version, CommitMode.OVERWRITE)
+            uow.commit_log.checkpoint(project_id, version)
+            return Project(
+                name=name,
+                project_id=project_id,
+                total_count=total_count,
+                distinct_count=distinct_count,
+                updated_at=updated_at,
+                version=version,
+            )
     
     def rename(self, project_id: int, new_name: str):
         with UnitOfWork() as uow:
@@ -20,17 +48,50 @@ class ProjectService:
     
     def delete(self, project_id: int):
         with UnitOfWork() as uow:
+            if uow.projects.get_storage(project_id) == StorageBackend.COLUMNAR.value:
+                uow.columnar.delete_by_project_id(project_id)
             uow.projects.delete(project_id)
+            # 项目的统计数据和提交日志随项目级联删除，只被该项目使用的词随之从共享词表中移除
+            uow.statistics.prune_vocabulary()
     
-    def load(self, project_id: int) -> Project:
+    def load(self, project_id: int, compact: bool = False) -> Project:
+        """
+        列式存储的项目总是以内存映射的 CompactStatisticsModel 打开
+        """
         with UnitOfWork() as uow:
             project = uow.projects.get_by_id(project_id)
-            statistics  = uow.statistics.get_by_project_id(project_id)
             if project is None:
                 raise ProjectNotSelectedError("Project with the given ID does not exist.")
-            project.stats = statistics
+            if compact or project.storage == StorageBackend.COLUMNAR.value:
+                model_factory = CompactStatisticsModel
+            else:
+                model_factory = StatisticsModel
+            project.stats = uow.backend(project.storage).get_by_project_id(project_id, model_factory)
             return project
     
+    def convert_storage(self, project_id: int, storage: StorageBackend):
+        """
+        在两种存储方式之间转换项目的统计数据。
+        提交日志只记录 SQLite 存储的项目，转换为 SQLite 时设一个检查点作为新的历史起点
+        """
+        with UnitOfWork() as uow:
+            current = uow.projects.get_storage(project_id)
+            if current == storage.value:
+                return
+            source = uow.backend(current)
+            target = uow.backend(storage.value)
+            stats = source.get_by_project_id(project_id, CompactStatisticsModel)
+            if current == StorageBackend.SQLITE.value:
+                # 最新的检查点由 statistics 推算，删除前先写出，保留转换前的历史
+                uow.commit_log.materialize(project_id)
+            target.overwrite(project_id, stats)
+            source.delete_by_project_id(project_id)
+            uow.projects.set_storage(project_id, storage.value)
+            version, _ = uow.projects.update_aggregates(project_id, stats.total, len(stats.frequency))
+            if storage == StorageBackend.SQLITE:
+                uow.commit_log.record(project_id, version, CommitMode.OVERWRITE)
+                uow.commit_log.checkpoint(project_id, version)
+    
     def save(self, project: Project):
         with UnitOfWork() as uow:
             uow.projects.update(project)
@@ -38,4 +99,12 @@ class ProjectService:
     def save_as(self, project_id: int, new_name: str) -> Project:
         with UnitOfWork() as uow:
             new_project_id = uow.projects.save_as(project_id, new_name)
-            return uow.projects.get_by_id(new_project_id)
\ No newline at end of file
+            return uow.projects.get_by_id(new_project_id)
+
+def require_sqlite_storage(uow: UnitOfWork, project_ids: list[int]):
+    """
+    跨项目的 SQL 操作只支持 SQLite 存储的项目
+    """
+    for project_id in project_ids:
+        if uow.projects.get_storage(project_id) != StorageBackend.SQLITE.value:
+            raise ValueError(f"Project {project_id} does not use SQLite storage.")
\ No newline at end of file
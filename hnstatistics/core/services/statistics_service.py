@@ -1,42 +1,216 @@
+from collections.abc import Mapping
 from copy import deepcopy
 from hnstatistics.core.project import Project
+from hnstatistics.core.services.project_service import require_sqlite_storage
+from hnstatistics.core.statistics.algorithms import DistributionSummary, StreamSource
 from hnstatistics.core.statistics.analyze_options import AnalyzeOptions
-from hnstatistics.core.statistics.commit_mode import CommitMode
+from hnstatistics.core.statistics.combine_mode import CombineMode
+from hnstatistics.core.statistics.commit_mode import CommitMode, CommitRecord
 from hnstatistics.core.statistics.draft import DraftStatistics
 from hnstatistics.core.statistics.model import StatisticsModel
+from hnstatistics.core.statistics.model_factory import create_model, merge_models
+from hnstatistics.core.statistics.query_options import StatisticsPage, StatisticsQuery
 from hnstatistics.core.uow import UnitOfWork
 
 
+DEFAULT_CHECKPOINT_INTERVAL = 32
+DEFAULT_KEEP_CHECKPOINTS = 3
+
+
 class StatisticsService:
+    def __init__(
+        self,
+        checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+        keep_checkpoints: int | None = DEFAULT_KEEP_CHECKPOINTS,
+    ):
+        """
+        每 checkpoint_interval 次提交设一个检查点，重建历史状态最多回放这么多个增量；
+        keep_checkpoints 为保留的检查点个数，None 表示保留全部历史。
+        最新的检查点直接使用 statistics 中的数据，只有被新检查点取代且仍要保留时才复制一份
+        """
+        self.checkpoint_interval = checkpoint_interval
+        self.keep_checkpoints = keep_checkpoints
+
     def create_draft(self):
         return DraftStatistics()
 
     def analyze_draft(self, draft: DraftStatistics, text: str, options: AnalyzeOptions = AnalyzeOptions()):
-        draft.snapshot()
-        draft.current.analyze(text, options)
+        draft.analyze(text, options)
+
+    def analyze_draft_stream(self, draft: DraftStatistics, source: StreamSource, options: AnalyzeOptions = AnalyzeOptions()):
+        draft.analyze_stream(source, options)
 
     def merge_draft(self, draft: DraftStatistics, new_stats: StatisticsModel):
-        draft.snapshot()
-        draft.current.merge(new_stats.frequency)
+        draft.merge(new_stats.frequency)
 
     def overwrite_draft(self, draft: DraftStatistics, new_stats: StatisticsModel):
-        draft.snapshot()
-        draft.current.overwrite(new_stats.frequency)
+        draft.overwrite(new_stats.frequency)
 
     def commit(self, project: Project, stats: StatisticsModel, mode: CommitMode):
+        self.apply_commit(project, self.write_commit(project, stats, mode))
+
+    def write_commit(self, project: Project, stats: StatisticsModel, mode: CommitMode) -> tuple:
+        """
+        把提交写入数据库，不修改 project 和 project.stats，因此可以在后台线程中执行而界面继续显示 project.stats。
+        返回 (new_stats, delta, result)，由 apply_commit 更新 project：
+        两个精确模型合并时 new_stats 为 None，apply_commit 把 delta 原地合并进 project.stats，代价与增量大小成正比；
+        其他提交 new_stats 为提交后的新模型（覆盖时复制新数据，近似模型大小固定）。
+        同一项目的下一次提交须在 apply_commit 之后
+        """
         if not stats:
             raise ValueError("No statistics to commit.")
+        if mode not in (CommitMode.MERGE, CommitMode.OVERWRITE):
+            raise ValueError(f"Unsupported commit mode: {mode}")
         
-        if mode == CommitMode.MERGE:
-            project.stats.merge(stats.frequency)
-        elif mode == CommitMode.OVERWRITE:
-            project.stats = deepcopy(stats)
+        # 只有两个精确模型合并时结果才等于数据库中的数据加上增量；
+        # 近似模型合并时会淘汰键（sketch 也是原地合并），必须整体重写
+        delta_only = mode == CommitMode.MERGE and project.stats.exact and stats.exact
+        new_stats = delta = None
+        if delta_only:
+            delta = stats.frequency
+            counts = self.merged_counts(project.stats, delta)
         else:
-            raise ValueError(f"Unsupported commit mode: {mode}")
+            if mode == CommitMode.MERGE:
+                # 以近似模型为基础的合并会修改基础模型，先复制（大小固定）
+                base = project.stats if project.stats.exact else deepcopy(project.stats)
+                new_stats = merge_models(base, stats)
+            else:
+                new_stats = deepcopy(stats)
+            counts = (new_stats.total, len(new_stats.frequency))
 
         with UnitOfWork() as uow:
-            uow.statistics.update(project.id, project.stats)
+            repo = uow.statistics_for(project.id)
+            if delta_only:
+                repo.merge(project.id, delta)
+            else:
+                self.prepare_rewrite(uow, repo, project.id)
+                repo.overwrite(project.id, new_stats)
+            result = self.record_commit(uow, repo, project.id, mode, delta, counts)
             uow.commit()
+        return new_stats, delta, result
+    
+    def apply_commit(self, project: Project, committed: tuple):
+        """
+        把 write_commit 的结果应用到 project，应在读取 project.stats 的线程（界面线程）中调用
+        """
+        new_stats, delta, result = committed
+        if new_stats is not None:
+            project.stats = new_stats
+        elif delta is not None:
+            project.stats.merge(delta)
+        if result is not None:
+            self.apply_commit_result(project, result)
+    
+    @staticmethod
+    def merged_counts(stats, delta: Mapping) -> tuple[int, int]:
+        """
+        精确模型合并 delta 之后的 (频率总和, 不同键数量)，只遍历增量，不修改模型
+        """
+        frequency = stats.frequency
+        added = sum(1 for k in delta if k not in frequency)
+        return stats.total + sum(delta.values()), len(frequency) + added
+    
+    def write_deltas(
+        self,
+        batch: list[tuple[int, Mapping, tuple[int, int] | None]],
+        journal: tuple[str, int] | None = None,
+    ) -> dict[int, tuple]:
+        """
+        在一个事务中写入多个项目已在内存中合并过的增量，供写回队列使用。
+        batch 中每项为 (project_id, delta, (total_count, distinct_count))，汇总未知时为 None，由 SQL 重新统计；
+        journal 为 (日志名, 序号)，与数据在同一事务中记录已写入的日志位置。
+        返回 project_id -> 提交结果，可用 apply_commit_result 更新 Project
+        """
+        results = {}
+        with UnitOfWork() as uow:
+            for project_id, delta, counts in batch:
+                repo = uow.statistics_for(project_id)
+                repo.merge(project_id, delta)
+                results[project_id] = self.record_commit(uow, repo, project_id, CommitMode.MERGE, delta, counts)
+            if journal is not None:
+                uow.commit_log.set_journal_seq(*journal)
+            uow.commit()
+        return results
+    
+    @staticmethod
+    def apply_commit_result(project: Project, result: tuple):
+        (total_count, distinct_count), version, updated_at = result
+        project.total_count = total_count
+        project.distinct_count = distinct_count
+        project.version = version
+        project.updated_at = updated_at
+    
+    def prepare_rewrite(self, uow: UnitOfWork, repo, project_id: int):
+        """
+        不以增量方式写入 statistics（覆盖、导入）之前调用：最新的检查点由 statistics 推算，
+        写入后即失效，保留策略仍会保留它时先把它写入 checkpoints 表
+        """
+        if repo is uow.statistics and self._keeps_replaced_checkpoint():
+            uow.commit_log.materialize(project_id)
+    
+    def record_commit(self, uow: UnitOfWork, repo, project_id: int, mode: CommitMode, delta, counts) -> tuple:
+        """
+        写入统计数据之后调用：更新项目汇总和版本号并追加提交日志。
+        delta 为 None 表示整体写入（作为检查点，写入前须调用 prepare_rewrite），counts 为 None 时由 repo 重新统计
+        """
+        if counts is None:
+            counts = repo.aggregate(project_id)
+        version, updated_at = uow.projects.update_aggregates(project_id, *counts)
+        # 提交日志的增量和检查点保存在 SQLite 中，只记录 SQLite 存储的项目
+        if repo is uow.statistics:
+            self._log_commit(uow, project_id, version, mode, delta)
+        return counts, version, updated_at
+    
+    def _log_commit(self, uow: UnitOfWork, project_id: int, seq: int, mode: CommitMode, delta=None):
+        """
+        追加提交日志；没有增量（整体重写）、尚无检查点或距上个检查点已满 checkpoint_interval 次时设为新的检查点
+        """
+        uow.commit_log.record(project_id, seq, mode, delta)
+        last = uow.commit_log.last_checkpoint(project_id)
+        if delta is None or last is None or seq - last >= self.checkpoint_interval:
+            if delta is not None and self._keeps_replaced_checkpoint():
+                # 被取代的检查点 = 合并后的 statistics 减去它之后的增量
+                uow.commit_log.materialize(project_id)
+            uow.commit_log.checkpoint(project_id, seq)
+            if self.keep_checkpoints is not None:
+                uow.commit_log.apply_retention(project_id, self.keep_checkpoints)
+    
+    def _keeps_replaced_checkpoint(self) -> bool:
+        # 只保留一个检查点时，旧检查点在新检查点设立后立即被保留策略删除，无需写出
+        return self.keep_checkpoints is None or self.keep_checkpoints > 1
+    
+    def prune_vocabulary(self) -> int:
+        """
+        维护步骤：从共享词表中删除覆盖提交和日志保留策略留下的不再使用的词，返回删除的词数
+        """
+        with UnitOfWork() as uow:
+            return uow.statistics.prune_vocabulary()
+    
+    def commit_log(self, project_id: int) -> list[CommitRecord]:
+        with UnitOfWork() as uow:
+            return uow.commit_log.get_log(project_id)
+    
+    def load_as_of(self, project_id: int, seq: int) -> StatisticsModel:
+        """
+        重建项目在第 seq 次提交之后的数据
+        """
+        with UnitOfWork() as uow:
+            return uow.commit_log.get_as_of(project_id, seq)
+    
+    def query(self, project_id: int, query: StatisticsQuery = StatisticsQuery()) -> StatisticsPage:
+        with UnitOfWork() as uow:
+            return uow.statistics_for(project_id).query(project_id, query)
+    
+    def top(self, project_id: int, n: int = 100) -> StatisticsPage:
+        return self.query(project_id, StatisticsQuery(limit=n))
+    
+    def combine(self, project_ids: list[int], mode: CombineMode = CombineMode.UNION) -> StatisticsModel:
+        """
+        在数据库中组合多个项目，只返回组合结果，不加载各个项目
+        """
+        with UnitOfWork() as uow:
+            require_sqlite_storage(uow, project_ids)
+            return uow.statistics.get_combined(project_ids, mode)
     
     def merge_statistics(self, base_stats: StatisticsModel, new_stats: StatisticsModel):
         base_stats.merge(new_stats.frequency)
@@ -44,7 +218,15 @@ class StatisticsService:
     def overwrite_statistics(self, base_stats: StatisticsModel, new_stats: StatisticsModel):
         base_stats.overwrite(new_stats.frequency)
     
+    def summarize(self, stats: StatisticsModel) -> DistributionSummary:
+        return stats.summary()
+    
     def analyze_text(self, text: str, options: AnalyzeOptions = AnalyzeOptions()) -> StatisticsModel:
-        stats = StatisticsModel()
+        stats = create_model(options)
         stats.analyze(text, options)
+        return stats
+    
+    def analyze_stream(self, source: StreamSource, options: AnalyzeOptions = AnalyzeOptions()) -> StatisticsModel:
+        stats = create_model(options)
+        stats.analyze_stream(source, options)
         return stats
\ No newline at end of file
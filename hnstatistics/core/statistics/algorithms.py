@@ -1,21 +1,173 @@
+import codecs
+import math
+import os
 from collections import Counter
+from collections.abc import Mapping
+from dataclasses import dataclass
+from itertools import islice
+from typing import BinaryIO, Callable, Iterable, Iterator, TextIO
 
 from hnstatistics.core.statistics.analyze_options import AnalyzeOptions
+from hnstatistics.core.statistics.tokenizers import Tokenizer, WhitespaceTokenizer, get_tokenizer
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+StreamSource = str | os.PathLike | BinaryIO | TextIO | Iterable[str | bytes]
 
 def count_frequencies(text: str, options: AnalyzeOptions) -> dict:
     """
     统计频率
     """
-    items = text.split()
+    tokenizer = get_tokenizer(options)
+    if options.ngram > 1:
+        return count_token_batches([list(tokenizer.tokenize(text))], options)
+    if isinstance(tokenizer, WhitespaceTokenizer):
+        items = text.split()
+    else:
+        items = list(tokenizer.tokenize(text))
     if options.enable_star:
         result = {}
-        for item in list(items):
-            base, count = parse_text_with_star(item)
-            result[base] = result.get(base, 0) + count
+        accumulate_star(result, items)
         return result
     else:
         return dict(Counter(items))
 
+def count_frequencies_stream(
+    source: StreamSource,
+    options: AnalyzeOptions,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+) -> dict:
+    """
+    流式统计频率，逐块分词，内存占用与输入大小无关
+    """
+    batches = iter_token_batches(iter_chunks(source, chunk_size, encoding), get_tokenizer(options))
+    return count_token_batches(batches, options)
+
+def count_token_batches(batches: Iterable[list[str]], options: AnalyzeOptions) -> dict:
+    """
+    汇总多批词的频率；n-gram 窗口可以跨越批次边界
+    """
+    if options.ngram > 1 or options.enable_star:
+        result = {}
+        for counts in iter_batch_counts(batches, options):
+            for k, v in counts.items():
+                result[k] = result.get(k, 0) + v
+        return result
+
+    counter = Counter()
+    for tokens in batches:
+        counter.update(tokens)
+    return dict(counter)
+
+def iter_batch_counts(batches: Iterable[list[str]], options: AnalyzeOptions) -> Iterator[Mapping[str, int]]:
+    """
+    将每批词转换为该批的计数；启用 n-gram 时保留上一批末尾的 n-1 个词作为滑动窗口的开头
+    """
+    n = options.ngram
+    if n > 1:
+        separator = get_tokenizer(options).ngram_separator
+        carry = []
+        for tokens in batches:
+            window = carry + tokens if carry else tokens
+            if len(window) >= n:
+                # 以元组计数滑动窗口，只为每个不同的 n-gram 拼接一次字符串；
+                # 分隔符为空时不同的元组可能拼接出相同的字符串，因此需要累加
+                counts = {}
+                for gram, count in Counter(zip(*(islice(window, i, None) for i in range(n)))).items():
+                    key = separator.join(gram)
+                    counts[key] = counts.get(key, 0) + count
+                yield counts
+            carry = window[-(n - 1):]
+    elif options.enable_star:
+        for tokens in batches:
+            counts = {}
+            accumulate_star(counts, tokens)
+            yield counts
+    else:
+        for tokens in batches:
+            yield Counter(tokens)
+
+def iter_chunks(
+    source: StreamSource,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+) -> Iterator[str]:
+    """
+    将文件路径、二进制/文本流或分块可迭代对象统一转换为文本块
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding=encoding) as f:
+            yield from _read_text(f, chunk_size)
+        return
+
+    if hasattr(source, "read"):
+        if isinstance(source.read(0), bytes):
+            decoder = codecs.getincrementaldecoder(encoding)()
+            while True:
+                block = source.read(chunk_size)
+                if not block:
+                    break
+                yield decoder.decode(block)
+            yield decoder.decode(b"", final=True)
+        else:
+            yield from _read_text(source, chunk_size)
+        return
+
+    decoder = None
+    for chunk in source:
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(encoding)()
+            yield decoder.decode(chunk)
+        else:
+            yield chunk
+    if decoder is not None:
+        yield decoder.decode(b"", final=True)
+
+def iter_text_chunks(
+    text: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_progress: Callable[[float], None] | None = None,
+    check_cancelled: Callable[[], None] | None = None,
+) -> Iterator[str]:
+    """
+    将内存中的文本切成块供流式分析使用，每块之前检查取消并报告进度
+    """
+    length = len(text)
+    for start in range(0, length, chunk_size):
+        if check_cancelled is not None:
+            check_cancelled()
+        if on_progress is not None:
+            on_progress(start / length)
+        yield text[start:start + chunk_size]
+    if on_progress is not None:
+        on_progress(1.0)
+
+def iter_token_batches(chunks: Iterable[str], tokenizer: Tokenizer | None = None) -> Iterator[list[str]]:
+    """
+    逐块分词；块末尾未结束的词会拼接到下一块，保证跨块的词（包括 item*3）完整
+    """
+    if tokenizer is not None and not isinstance(tokenizer, WhitespaceTokenizer):
+        yield from _iter_tokenizer_batches(chunks, tokenizer)
+        return
+
+    tail = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if tail:
+            chunk = tail + chunk
+        tokens = chunk.split()
+        if tokens and not chunk[-1].isspace():
+            tail = tokens.pop()
+        else:
+            tail = ""
+        if tokens:
+            yield tokens
+    if tail:
+        yield [tail]
+
 def calculate_probability(freq: dict) -> dict:
     """
     计算概率
@@ -25,6 +177,106 @@ def calculate_probability(freq: dict) -> dict:
         return {}
     return {k: v / total for k, v in freq.items()}
 
+@dataclass
+class DistributionSummary:
+    total: int = 0
+    distinct: int = 0
+    entropy: float = 0.0             # Shannon entropy in bits
+    normalized_entropy: float = 0.0  # entropy / log2(distinct)
+    concentration: float = 0.0       # Herfindahl index, sum of p^2
+    singleton_ratio: float = 0.0     # share of distinct items seen exactly once
+    zipf_exponent: float = 0.0       # rank-frequency exponent s in f(r) ~ r^-s
+
+class SummaryAccumulator:
+    """
+    分布摘要的累加器：只保存若干累加量，键的计数变化时以 O(1) 更新
+    """
+    __slots__ = ("total", "distinct", "singletons", "_sum_clogc", "_sum_c2", "_histogram")
+
+    def __init__(self):
+        self.total = 0
+        self.distinct = 0
+        self.singletons = 0
+        self._sum_clogc = 0.0
+        self._sum_c2 = 0
+        # 频数的频数：计数值 -> 具有该计数的键数，用于不排序地拟合 Zipf 指数
+        self._histogram = {}
+
+    @classmethod
+    def from_counts(cls, counts: Iterable[int]) -> "SummaryAccumulator":
+        acc = cls()
+        histogram = Counter(c for c in counts if c > 0)
+        log = math.log
+        for c, n in histogram.items():
+            acc.total += c * n
+            acc.distinct += n
+            acc._sum_clogc += n * c * log(c)
+            acc._sum_c2 += n * c * c
+        acc.singletons = histogram.get(1, 0)
+        acc._histogram = dict(histogram)
+        return acc
+
+    def update(self, old: int, new: int):
+        """
+        某个键的计数由 old 变为 new（0 表示不存在）
+        """
+        if old == new:
+            return
+        self.total += new - old
+        self.distinct += (new > 0) - (old > 0)
+        self.singletons += (new == 1) - (old == 1)
+        self._sum_clogc += _clogc(new) - _clogc(old)
+        self._sum_c2 += new * new - old * old
+        histogram = self._histogram
+        if old > 0:
+            if histogram[old] == 1:
+                del histogram[old]
+            else:
+                histogram[old] -= 1
+        if new > 0:
+            histogram[new] = histogram.get(new, 0) + 1
+
+    def summary(self) -> DistributionSummary:
+        total = self.total
+        distinct = self.distinct
+        if total <= 0 or distinct == 0:
+            return DistributionSummary()
+        entropy = max(0.0, (math.log(total) - self._sum_clogc / total) / math.log(2))
+        return DistributionSummary(
+            total=total,
+            distinct=distinct,
+            entropy=entropy,
+            normalized_entropy=entropy / math.log2(distinct) if distinct > 1 else 0.0,
+            concentration=self._sum_c2 / (total * total),
+            singleton_ratio=self.singletons / distinct,
+            zipf_exponent=self._fit_zipf(),
+        )
+
+    def _fit_zipf(self) -> float:
+        # 每个不同的计数值 c 对应一个点 (log r, log c)，r 为计数不小于 c 的键数，
+        # 对这些点做最小二乘，斜率的相反数即为 Zipf 指数
+        n = sx = sy = sxx = sxy = 0.0
+        rank = 0
+        for c in sorted(self._histogram, reverse=True):
+            rank += self._histogram[c]
+            x = math.log(rank)
+            y = math.log(c)
+            n += 1
+            sx += x
+            sy += y
+            sxx += x * x
+            sxy += x * y
+        denominator = n * sxx - sx * sx
+        if n < 2 or denominator == 0:
+            return 0.0
+        return -(n * sxy - sx * sy) / denominator
+
+def summarize(freq: dict) -> DistributionSummary:
+    """
+    一次遍历计算分布摘要：熵、集中度、不同项数、单次项比例和 Zipf 指数
+    """
+    return SummaryAccumulator.from_counts(freq.values()).summary()
+
 def parse_text_with_star(text: str) -> tuple[str, int]:
     """
     根据分析选项预处理文本
@@ -44,4 +296,42 @@ def parse_text_with_star(text: str) -> tuple[str, int]:
     count = int(count)
     if count <= 0:
         return text, 1
-    return base, count
\ No newline at end of file
+    return base, count
+
+def accumulate_star(result: dict, items: Iterable[str]) -> None:
+    # 先在 C 层按原始词计数，再对每个不同的词解析一次 * 语法，
+    # 解析开销与不同词数而非总词数成正比，且语义与 parse_text_with_star 完全一致
+    for item, n in Counter(items).items():
+        if '*' in item:
+            base, count = parse_text_with_star(item)
+            count *= n
+        else:
+            base, count = item, n
+        result[base] = result.get(base, 0) + count
+
+def _clogc(c: int) -> float:
+    return c * math.log(c) if c > 0 else 0.0
+
+def _iter_tokenizer_batches(chunks: Iterable[str], tokenizer: Tokenizer) -> Iterator[list[str]]:
+    tail = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if tail:
+            chunk = tail + chunk
+        cut = tokenizer.safe_cut(chunk)
+        tail = chunk[cut:]
+        tokens = list(tokenizer.tokenize(chunk[:cut]))
+        if tokens:
+            yield tokens
+    if tail:
+        tokens = list(tokenizer.tokenize(tail))
+        if tokens:
+            yield tokens
+
+def _read_text(f: TextIO, chunk_size: int) -> Iterator[str]:
+    while True:
+        block = f.read(chunk_size)
+        if not block:
+            break
+        yield block
@@ -3,4 +3,11 @@ from dataclasses import dataclass
 
 @dataclass
 class AnalyzeOptions:
-    enable_star: bool = False
\ No newline at end of file
+    enable_star: bool = False
+    workers: int | None = None  # None: use all CPUs, 1: always serial
+    shard_size: int = 4 << 20   # characters per shard for parallel counting
+    approximate: bool = False   # keep only the top_k heavy hitters in fixed memory
+    top_k: int = 1000
+    tokenizer: str = "whitespace"  # see tokenizers.available_tokenizers()
+    token_pattern: str = r"\w+"    # used by the "regex" tokenizer
+    ngram: int = 1                 # n > 1 counts sliding n-grams; '*' syntax applies to n = 1 only
\ No newline at end of file
@@ -0,0 +1,6 @@
+from enum import Enum
+
+class CombineMode(Enum):
+    UNION = "union"                # 所有项目中出现的键，频率求和
+    INTERSECTION = "intersection"  # 在每个项目中都出现的键，频率求和
+    DIFFERENCE = "difference"      # 只在第一个项目中出现的键，保留其频率
\ No newline at end of file
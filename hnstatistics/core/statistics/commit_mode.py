@@ -1,5 +1,14 @@
+from dataclasses import dataclass
 from enum import Enum
 
 class CommitMode(Enum):
     MERGE = "merge"
-    OVERWRITE = "overwrite"
\ No newline at end of file
+    OVERWRITE = "overwrite"
+
+@dataclass
+class CommitRecord:
+    seq: int            # 提交后的项目版本号
+    mode: CommitMode
+    created_at: str
+    delta_size: int     # 合并提交记录的增量键数，覆盖提交为 0
+    checkpoint: bool    # 该提交是否为检查点（最新的检查点直接使用 statistics 中的数据）
\ No newline at end of file
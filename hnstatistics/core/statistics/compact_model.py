@@ -0,0 +1,306 @@
+import sys
+from array import array
+from copy import deepcopy
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping
+from itertools import accumulate
+
+from hnstatistics.core.errors import ProjectEmptyError
+from hnstatistics.core.statistics.algorithms import (
+    DEFAULT_CHUNK_SIZE,
+    DistributionSummary,
+    StreamSource,
+    SummaryAccumulator,
+)
+from hnstatistics.core.statistics.analyze_options import AnalyzeOptions
+from hnstatistics.core.statistics.model import ProbabilityView, StatisticsModel
+from hnstatistics.core.statistics.parallel import count_frequencies_parallel, count_frequencies_stream_parallel
+
+MIN_DELTA_SIZE = 1024
+
+class CompactFrequencyView(MutableMapping):
+    """
+    CompactStatisticsModel 的频率视图，提供与 dict 相同的读写接口
+    """
+    __slots__ = ("_stats",)
+
+    def __init__(self, stats: "CompactStatisticsModel"):
+        self._stats = stats
+
+    def __getitem__(self, key: str) -> int:
+        stats = self._stats
+        index = stats._find(key)
+        if index >= 0:
+            return stats._counts[index]
+        return stats._delta[key]
+
+    def __setitem__(self, key: str, value: int):
+        stats = self._stats
+        index = stats._search(key)
+        if index >= 0 and index in stats._deleted:
+            # 重新加入已删除的键，直接复用原位置
+            stats._deleted.discard(index)
+            old = 0
+            stats._counts[index] = value
+        elif index >= 0:
+            old = stats._counts[index]
+            stats._counts[index] = value
+        else:
+            old = stats._delta.get(key, 0)
+            stats._delta[key] = value
+        stats.total += value - old
+        if stats._summary is not None:
+            stats._summary.update(old, value)
+        if index < 0:
+            stats._maybe_fold()
+
+    def __delitem__(self, key: str):
+        stats = self._stats
+        if key in stats._delta:
+            old = stats._delta.pop(key)
+            stats.total -= old
+            if stats._summary is not None:
+                stats._summary.update(old, 0)
+            return
+        index = stats._find(key)
+        if index < 0:
+            raise KeyError(key)
+        # 有序数组中的键只标记为删除，计数置零，合并增量字典时才真正移除
+        old = stats._counts[index]
+        stats._counts[index] = 0
+        stats._deleted.add(index)
+        stats.total -= old
+        if stats._summary is not None:
+            stats._summary.update(old, 0)
+        stats._maybe_fold()
+
+    def __iter__(self) -> Iterator[str]:
+        for key, _ in self._stats._iter_items():
+            yield key
+
+    def __len__(self) -> int:
+        stats = self._stats
+        return len(stats._counts) - len(stats._deleted) + len(stats._delta)
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and (key in self._stats._delta or self._stats._find(key) >= 0)
+
+    def items(self):
+        return self._stats._iter_items()
+
+    def values(self):
+        return (v for _, v in self._stats._iter_items())
+
+class CompactStatisticsModel:
+    """
+    紧凑的统计模型：键按 UTF-8 字节序排序后拼接为一个 bytes，配合偏移数组和 int64 计数数组存储；
+    新键先写入小字典，删除的键先记入 _deleted，超过阈值后批量合并回有序数组。概率由计数和总数即时计算，不单独存储。
+    """
+    __slots__ = ("_blob", "_offsets", "_counts", "_delta", "_deleted", "_summary", "total")
+    exact = True
+
+    def __init__(self):
+        self._blob = b""
+        self._offsets = array("q", [0])
+        self._counts = array("q")
+        self._delta = {}
+        self._deleted = set()  # 已删除的有序数组位置，计数为 0
+        self._summary = None
+        self.total = 0
+
+    @classmethod
+    def from_model(cls, stats) -> "CompactStatisticsModel":
+        compact = cls()
+        compact._build(stats.frequency.items())
+        return compact
+
+    @classmethod
+    def from_columns(cls, blob, offsets, counts, total: int | None = None) -> "CompactStatisticsModel":
+        """
+        直接使用已排序的列数据（例如内存映射的文件）构造模型，不复制数据；
+        offsets 为 len(counts) + 1 个 int64 偏移量，counts 必须可写
+        """
+        compact = cls()
+        compact._blob = blob
+        compact._offsets = offsets
+        compact._counts = counts
+        if total is None:
+            compact._recalc()
+        else:
+            compact.total = total
+        return compact
+
+    def columns(self) -> tuple:
+        """
+        合并增量字典和删除标记后返回 (blob, offsets, counts) 三列
+        """
+        if self._delta or self._deleted:
+            self._build(self._iter_items())
+        return self._blob, self._offsets, self._counts
+
+    def __deepcopy__(self, memo) -> "CompactStatisticsModel":
+        # 列数据可能是内存映射，复制为普通的 bytes / array
+        compact = type(self)()
+        compact._blob = bytes(self._blob)
+        compact._offsets = array("q", self._offsets)
+        compact._counts = array("q", self._counts)
+        compact._delta = dict(self._delta)
+        compact._deleted = set(self._deleted)
+        compact._summary = deepcopy(self._summary, memo)
+        compact.total = self.total
+        return compact
+
+    def to_model(self) -> StatisticsModel:
+        stats = StatisticsModel()
+        stats.frequency = dict(self._iter_items())
+        stats.total = self.total
+        return stats
+
+    @property
+    def frequency(self) -> CompactFrequencyView:
+        return CompactFrequencyView(self)
+
+    @property
+    def probability(self) -> ProbabilityView:
+        return ProbabilityView(self)
+
+    def summary(self) -> DistributionSummary:
+        if self._summary is None:
+            self._summary = SummaryAccumulator.from_counts(v for _, v in self._iter_items())
+        return self._summary.summary()
+
+    def merge(self, new_freq: Mapping):
+        if not new_freq:
+            raise ProjectEmptyError()
+        counts = self._counts
+        delta = self._delta
+        summary = self._summary
+        added = 0
+        deleted = self._deleted
+        for k, v in new_freq.items():
+            index = self._search(k)
+            if index >= 0:
+                deleted.discard(index)  # 已删除的位置计数为 0
+                old = counts[index]
+                counts[index] = old + v
+            else:
+                old = delta.get(k, 0)
+                delta[k] = old + v
+            if summary is not None:
+                summary.update(old, old + v)
+            added += v
+        self.total += added
+        self._maybe_fold()
+
+    def apply_counts(self, counts: Mapping):
+        """
+        直接设置若干键的计数，None 表示删除该键；总数和摘要按变化量更新
+        """
+        frequency = self.frequency
+        for k, v in counts.items():
+            if v is None:
+                if k in frequency:
+                    del frequency[k]
+            else:
+                frequency[k] = v
+
+    def overwrite(self, new_freq: Mapping):
+        if not new_freq:
+            raise ProjectEmptyError()
+        self._build(new_freq.items())
+        self._summary = None
+
+    def analyze(self, text: str, options: AnalyzeOptions):
+        self._build(count_frequencies_parallel(text, options).items())
+        self._summary = None
+
+    def analyze_stream(self, source: StreamSource, options: AnalyzeOptions, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._build(count_frequencies_stream_parallel(source, options, chunk_size).items())
+        self._summary = None
+
+    def rows(self) -> Iterator[tuple[str, int, float]]:
+        total = self.total
+        for k, v in self._iter_items():
+            yield k, v, (v / total if total else 0.0)
+
+    def memory_usage(self) -> int:
+        """
+        估算占用的字节数（有序数组 + 增量字典中的键和值 + 删除标记）
+        """
+        size = (
+            sys.getsizeof(self._blob)
+            + sys.getsizeof(self._offsets)
+            + sys.getsizeof(self._counts)
+            + sys.getsizeof(self._delta)
+            + sys.getsizeof(self._deleted)
+        )
+        for k, v in self._delta.items():
+            size += sys.getsizeof(k) + sys.getsizeof(v)
+        return size
+
+    def _recalc(self):
+        self.total = sum(self._counts) + sum(self._delta.values())
+
+    def _find(self, key: str) -> int:
+        """
+        键在有序数组中的位置，不存在或已删除时返回 -1
+        """
+        index = self._search(key)
+        if index >= 0 and index in self._deleted:
+            return -1
+        return index
+
+    def _search(self, key: str) -> int:
+        target = key.encode("utf-8")
+        blob = self._blob
+        offsets = self._offsets
+        n = len(self._counts)
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if blob[offsets[mid]:offsets[mid + 1]] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < n and blob[offsets[lo]:offsets[lo + 1]] == target:
+            return lo
+        return -1
+
+    def _iter_base(self) -> Iterator[tuple[str, int]]:
+        blob = self._blob
+        offsets = self._offsets
+        deleted = self._deleted
+        for i, count in enumerate(self._counts):
+            if deleted and i in deleted:
+                continue
+            yield blob[offsets[i]:offsets[i + 1]].decode("utf-8"), count
+
+    def _iter_items(self) -> Iterator[tuple[str, int]]:
+        yield from self._iter_base()
+        yield from list(self._delta.items())
+
+    def _maybe_fold(self):
+        if len(self._delta) + len(self._deleted) > max(MIN_DELTA_SIZE, len(self._counts) >> 3):
+            self._build(self._iter_items())
+
+    def _build(self, items: Iterable[tuple[str, int]]):
+        encoded = sorted((k.encode("utf-8"), v) for k, v in items)
+        keys = [k for k, _ in encoded]
+        self._blob = b"".join(keys)
+        self._offsets = array("q", accumulate((len(k) for k in keys), initial=0))
+        self._counts = array("q", (v for _, v in encoded))
+        self._delta = {}
+        self._deleted = set()
+        self._recalc()
+
+def estimate_memory(stats) -> int:
+    """
+    估算统计模型占用的字节数，用于比较 StatisticsModel 与 CompactStatisticsModel
+    """
+    if isinstance(stats, CompactStatisticsModel):
+        return stats.memory_usage()
+    size = sys.getsizeof(stats.frequency)
+    for k, v in stats.frequency.items():
+        size += sys.getsizeof(k)
+        if not -5 <= v <= 256:
+            size += sys.getsizeof(v)
+    return size
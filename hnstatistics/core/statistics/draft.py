@@ -1,25 +1,140 @@
+from collections import deque
 from copy import deepcopy
+from hnstatistics.core.errors import ProjectEmptyError
+from hnstatistics.core.statistics.algorithms import StreamSource
+from hnstatistics.core.statistics.analyze_options import AnalyzeOptions
 from hnstatistics.core.statistics.model import StatisticsModel
+from hnstatistics.core.statistics.model_factory import create_model
+
+DEFAULT_MAX_STEPS = 100
+DEFAULT_MAX_ENTRIES = 5_000_000
+
+
+class _Delta:
+    """
+    可逆的增量记录：被修改的键及其修改前后的计数（None 表示该键不存在）
+    """
+    __slots__ = ("changes",)
+
+    def __init__(self, changes: dict):
+        self.changes = changes
+
+    @property
+    def cost(self) -> int:
+        return len(self.changes)
+
+    def undo(self, draft: "DraftStatistics"):
+        draft.current.apply_counts({key: pair[0] for key, pair in self.changes.items()})
+
+    def redo(self, draft: "DraftStatistics"):
+        draft.current.apply_counts({key: pair[1] for key, pair in self.changes.items()})
+
+
+class _Replace:
+    """
+    整体替换记录：保存替换前后的模型对象本身，用于覆盖和重新分析
+    """
+    __slots__ = ("before", "after")
+
+    def __init__(self, before, after):
+        self.before = before
+        self.after = after
+
+    @property
+    def cost(self) -> int:
+        return len(self.before.frequency)
+
+    def undo(self, draft: "DraftStatistics"):
+        draft.current = self.before
+
+    def redo(self, draft: "DraftStatistics"):
+        draft.current = self.after
 
 
 class DraftStatistics:
-    def __init__(self):
-        self._history = []
+    def __init__(
+        self,
+        model_factory=StatisticsModel,
+        max_steps: int = DEFAULT_MAX_STEPS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """
+        max_steps 限制可撤销的步数，max_entries 限制历史中保存的键总数，超出时淘汰最早的记录
+        """
+        self._history = deque()
         self._future = []
-        self.current = StatisticsModel()
+        self._history_cost = 0
+        self.max_steps = max_steps
+        self.max_entries = max_entries
+        self.model_factory = model_factory
+        self.current = model_factory()
+
+    def analyze(self, text: str, options: AnalyzeOptions):
+        stats = create_model(options, self.model_factory)
+        stats.analyze(text, options)
+        self._replace(stats)
+
+    def analyze_stream(self, source: StreamSource, options: AnalyzeOptions):
+        stats = create_model(options, self.model_factory)
+        stats.analyze_stream(source, options)
+        self._replace(stats)
+
+    def merge(self, new_freq: dict):
+        if not new_freq:
+            raise ProjectEmptyError()
+        if not self.current.exact:
+            # 近似模型合并时可能淘汰任意键，无法用增量还原；其大小固定，直接保存快照
+            self.snapshot()
+            self.current.merge(new_freq)
+            return
+        frequency = self.current.frequency
+        changes = {}
+        for k, v in new_freq.items():
+            old = frequency.get(k)
+            changes[k] = (old, (old or 0) + v)
+        self.current.merge(new_freq)
+        self._record(_Delta(changes))
+
+    def overwrite(self, new_freq: dict):
+        if not new_freq:
+            raise ProjectEmptyError()
+        stats = self.model_factory()
+        stats.overwrite(new_freq)
+        self._replace(stats)
 
     def snapshot(self):
-        self._history.append(deepcopy(self.current))
-        self._future.clear()
+        """
+        记录完整快照，之后 current 指向一个副本，供直接修改 current 的调用方使用
+        """
+        self._replace(deepcopy(self.current))
 
     def undo(self):
         if not self._history:
             return
-        self._future.append(self.current)
-        self.current = self._history.pop()
+        entry = self._history.pop()
+        self._history_cost -= entry.cost
+        entry.undo(self)
+        self._future.append(entry)
 
     def redo(self):
         if not self._future:
             return
-        self._history.append(self.current)
-        self.current = self._future.pop()
+        entry = self._future.pop()
+        entry.redo(self)
+        self._push(entry)
+
+    def _replace(self, stats):
+        self._record(_Replace(self.current, stats))
+        self.current = stats
+
+    def _record(self, entry):
+        self._future.clear()
+        self._push(entry)
+
+    def _push(self, entry):
+        self._history.append(entry)
+        self._history_cost += entry.cost
+        while len(self._history) > 1 and (
+            len(self._history) > self.max_steps or self._history_cost > self.max_entries
+        ):
+            self._history_cost -= self._history.popleft().cost
@@ -1,31 +1,103 @@
-from hnstatistics.core.statistics.algorithms import calculate_probability, count_frequencies
+from collections.abc import Iterator, Mapping
+
+from hnstatistics.core.statistics.algorithms import (
+    DEFAULT_CHUNK_SIZE,
+    DistributionSummary,
+    StreamSource,
+    SummaryAccumulator,
+)
 from hnstatistics.core.errors import ProjectEmptyError
 from hnstatistics.core.statistics.analyze_options import AnalyzeOptions
+from hnstatistics.core.statistics.parallel import count_frequencies_parallel, count_frequencies_stream_parallel
+
+class ProbabilityView(Mapping):
+    """
+    按需由频率和总数计算概率的只读视图，不单独存储每个键的概率
+    """
+    __slots__ = ("_stats",)
+
+    def __init__(self, stats: "StatisticsModel"):
+        self._stats = stats
+
+    def __getitem__(self, key) -> float:
+        freq = self._stats.frequency[key]
+        total = self._stats.total
+        return freq / total if total else 0.0
+
+    def __iter__(self):
+        return iter(self._stats.frequency)
+
+    def __len__(self) -> int:
+        return len(self._stats.frequency)
+
+    def __contains__(self, key) -> bool:
+        return key in self._stats.frequency
 
 class StatisticsModel:
+    exact = True
+
     def __init__(self):
         self.frequency = {}
-        self.probability = {}
-    
+        self.total = 0
+        self._summary = None
+
+    @property
+    def probability(self) -> ProbabilityView:
+        return ProbabilityView(self)
+
+    def rows(self) -> Iterator[tuple[str, int, float]]:
+        total = self.total
+        for k, v in self.frequency.items():
+            yield k, v, (v / total if total else 0.0)
+
+    def summary(self) -> DistributionSummary:
+        if self._summary is None:
+            self._summary = SummaryAccumulator.from_counts(self.frequency.values())
+        return self._summary.summary()
+
     def merge(self, new_freq: dict):
         if not new_freq:
             raise ProjectEmptyError()
+        frequency = self.frequency
+        summary = self._summary
         for k, v in new_freq.items():
-            self.frequency[k] = self.frequency.get(k, 0) + v
-        self._recalc()
-    
+            old = frequency.get(k, 0)
+            frequency[k] = old + v
+            if summary is not None:
+                summary.update(old, old + v)
+        self.total += sum(new_freq.values())
+
+    def apply_counts(self, counts: Mapping):
+        """
+        直接设置若干键的计数，None 表示删除该键；总数和摘要按变化量更新
+        """
+        frequency = self.frequency
+        summary = self._summary
+        for k, v in counts.items():
+            old = frequency.get(k, 0)
+            if v is None:
+                del frequency[k]
+                v = 0
+            else:
+                frequency[k] = v
+            self.total += v - old
+            if summary is not None:
+                summary.update(old, v)
+
     def overwrite(self, new_freq: dict):
         if not new_freq:
             raise ProjectEmptyError()
-        self.frequency = new_freq
+        self.frequency = new_freq if isinstance(new_freq, dict) else dict(new_freq.items())
         self._recalc()
-        
+
     def analyze(self, text: str, options: AnalyzeOptions):
-        self.frequency = count_frequencies(text, options)
-        self.probability = calculate_probability(self.frequency)
-    
+        self.frequency = count_frequencies_parallel(text, options)
+        self._recalc()
+
+    def analyze_stream(self, source: StreamSource, options: AnalyzeOptions, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.frequency = count_frequencies_stream_parallel(source, options, chunk_size)
+        self._recalc()
+
     def _recalc(self):
-        total = sum(self.frequency.values())
-        self.probability = {
-            k: v / total for k, v in self.frequency.items()
-        }
\ No newline at end of file
+        self.total = sum(self.frequency.values())
+        self._summary = None
\ No newline at end of file
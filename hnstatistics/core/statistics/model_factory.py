@@ -0,0 +1,29 @@
+from copy import deepcopy
+
+from hnstatistics.core.statistics.analyze_options import AnalyzeOptions
+from hnstatistics.core.statistics.model import StatisticsModel
+from hnstatistics.core.statistics.sketch import HeavyHitterModel
+
+
+def create_model(options: AnalyzeOptions, default_factory=StatisticsModel):
+    """
+    根据分析选项创建统计模型：近似模式使用 HeavyHitterModel，否则使用 default_factory
+    """
+    if options.approximate:
+        return HeavyHitterModel(options.top_k)
+    return default_factory()
+
+def merge_models(base, new):
+    """
+    将 new 合并进 base 并返回合并结果；任意一方为近似模型时结果为近似模型，内存保持固定
+    """
+    if isinstance(new, HeavyHitterModel):
+        if isinstance(base, HeavyHitterModel):
+            base.merge_sketch(new)
+            return base
+        merged = deepcopy(new)
+        if base.frequency:
+            merged.merge(base.frequency)
+        return merged
+    base.merge(new.frequency)
+    return base
\ No newline at end of file
@@ -0,0 +1,175 @@
+import os
+import re
+from typing import Iterable, Iterator
+
+from hnstatistics.core.statistics.algorithms import (
+    DEFAULT_CHUNK_SIZE,
+    StreamSource,
+    count_frequencies,
+    count_frequencies_stream,
+    iter_chunks,
+)
+from hnstatistics.core.statistics.analyze_options import AnalyzeOptions
+
+_WHITESPACE = re.compile(r"\s")
+
+# 进程池和 concurrent.futures 在第一次并行统计时才创建和导入，不拖慢程序启动
+_executor = None
+_executor_workers = 0
+
+def resolve_workers(options: AnalyzeOptions) -> int:
+    """
+    解析实际使用的进程数，None 表示使用全部 CPU
+    """
+    if options.workers is None:
+        return os.cpu_count() or 1
+    return max(1, options.workers)
+
+def count_frequencies_parallel(text: str, options: AnalyzeOptions) -> dict:
+    """
+    多进程 map-reduce 统计频率；输入不足两个分片时退回串行路径
+    """
+    workers = resolve_workers(options)
+    if workers <= 1 or not _shardable(options) or len(text) < 2 * options.shard_size:
+        return count_frequencies(text, options)
+    return _map_reduce(split_shards(text, options.shard_size), options, workers)
+
+def count_frequencies_stream_parallel(
+    source: StreamSource,
+    options: AnalyzeOptions,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+) -> dict:
+    """
+    流式输入的多进程统计；流长度不足两个分片时在当前进程内完成
+    """
+    workers = resolve_workers(options)
+    if workers <= 1 or not _shardable(options):
+        return count_frequencies_stream(source, options, chunk_size, encoding)
+
+    shards = _iter_stream_shards(iter_chunks(source, chunk_size, encoding), options.shard_size)
+    first = next(shards, None)
+    if first is None:
+        return {}
+    second = next(shards, None)
+    if second is None:
+        return count_frequencies(first, options)
+
+    def all_shards():
+        yield first
+        yield second
+        yield from shards
+
+    return _map_reduce(all_shards(), options, workers)
+
+def split_shards(text: str, shard_size: int) -> Iterator[str]:
+    """
+    按空白边界切分文本，保证每个词完整地落在一个分片内
+    """
+    start = 0
+    length = len(text)
+    while start < length:
+        end = start + shard_size
+        if end >= length:
+            yield text[start:]
+            return
+        match = _WHITESPACE.search(text, end)
+        if match is None:
+            yield text[start:]
+            return
+        yield text[start:match.start()]
+        start = match.start()
+
+def merge_partials(partials: Iterable[dict]) -> dict:
+    """
+    两两树形归约部分结果，同时只保留 O(log n) 个中间字典
+    """
+    stack: list[tuple[int, dict]] = []
+    for partial in partials:
+        level = 0
+        while stack and stack[-1][0] == level:
+            _, other = stack.pop()
+            partial = _merge_pair(other, partial)
+            level += 1
+        stack.append((level, partial))
+
+    result = {}
+    while stack:
+        _, other = stack.pop()
+        result = _merge_pair(other, result)
+    return result
+
+def shutdown_pool():
+    global _executor, _executor_workers
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+        _executor_workers = 0
+
+def _shardable(options: AnalyzeOptions) -> bool:
+    # 只有按空白分词的 unigram 统计可以在空白处切分而不丢失跨分片的词或 n-gram 窗口
+    return options.tokenizer == "whitespace" and options.ngram == 1
+
+def _map_reduce(shards: Iterable[str], options: AnalyzeOptions, workers: int) -> dict:
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    executor = _get_executor(workers)
+    max_in_flight = workers * 2
+    pending = set()
+
+    def partials():
+        nonlocal pending
+        for shard in shards:
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(executor.submit(count_frequencies, shard, options))
+        for future in pending:
+            yield future.result()
+
+    return merge_partials(partials())
+
+def _get_executor(workers: int):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != workers:
+        shutdown_pool()
+        # 使用 spawn：进程池由界面的后台线程创建，fork 多线程进程及其已打开的 SQLite 连接不安全
+        context = multiprocessing.get_context("spawn")
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        _executor_workers = workers
+    return _executor
+
+def _iter_stream_shards(chunks: Iterable[str], shard_size: int) -> Iterator[str]:
+    buffer = []
+    buffered = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered < shard_size:
+            continue
+        text = "".join(buffer)
+        cut = len(text)
+        while cut > 0 and not text[cut - 1].isspace():
+            cut -= 1
+        if cut == 0:
+            buffer = [text]
+            continue
+        yield text[:cut]
+        rest = text[cut:]
+        buffer = [rest] if rest else []
+        buffered = len(rest)
+    if buffer:
+        yield "".join(buffer)
+
+def _merge_pair(a: dict, b: dict) -> dict:
+    if len(a) < len(b):
+        a, b = b, a
+    for k, v in b.items():
+        a[k] = a.get(k, 0) + v
+    return a
@@ -0,0 +1,24 @@
+from dataclasses import dataclass, field
+from enum import Enum
+
+class QueryOrder(Enum):
+    FREQUENCY = "frequency"
+    KEY = "key"
+
+
+@dataclass
+class StatisticsQuery:
+    order_by: QueryOrder = QueryOrder.FREQUENCY
+    descending: bool = True
+    limit: int = 100
+    min_frequency: int | None = None
+    max_frequency: int | None = None
+    after: tuple | None = None  # keyset cursor: next_cursor of the previous page
+    offset: int = 0             # rows skipped after the cursor, for jumping to a page number
+
+
+@dataclass
+class StatisticsPage:
+    rows: list[tuple[str, int, float]] = field(default_factory=list)  # (key, frequency, probability)
+    total: int = 0                  # stored project total used for the probabilities
+    next_cursor: tuple | None = None  # None when there are no more rows
\ No newline at end of file
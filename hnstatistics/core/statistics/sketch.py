@@ -0,0 +1,183 @@
+from collections.abc import Iterator, Mapping
+from heapq import heapify, heappop, heappush, nlargest
+
+from hnstatistics.core.errors import ProjectEmptyError
+from hnstatistics.core.statistics.algorithms import (
+    DEFAULT_CHUNK_SIZE,
+    DistributionSummary,
+    StreamSource,
+    SummaryAccumulator,
+    iter_batch_counts,
+    iter_chunks,
+    iter_token_batches,
+)
+from hnstatistics.core.statistics.analyze_options import AnalyzeOptions
+from hnstatistics.core.statistics.model import ProbabilityView
+from hnstatistics.core.statistics.tokenizers import get_tokenizer
+
+DEFAULT_TOP_K = 1000
+
+
+class SpaceSavingSketch:
+    """
+    Space-Saving 算法：最多保留 capacity 个计数器，每个计数是真实频率的上界，
+    errors 记录每个键可能被高估的量，因此真实频率落在 [count - error, count] 之间
+    """
+    __slots__ = ("capacity", "counts", "errors", "total", "_heap")
+
+    def __init__(self, capacity: int = DEFAULT_TOP_K):
+        if capacity <= 0:
+            raise ValueError("Sketch capacity must be positive.")
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        self._heap = []
+
+    def update(self, key: str, weight: int = 1):
+        counts = self.counts
+        self.total += weight
+        if key in counts:
+            # 堆中的旧计数会在 _pop_min 时惰性修正
+            counts[key] += weight
+            return
+        if len(counts) < self.capacity:
+            counts[key] = weight
+            self.errors[key] = 0
+            heappush(self._heap, (weight, key))
+            return
+        min_key, min_count = self._pop_min()
+        del counts[min_key]
+        del self.errors[min_key]
+        counts[key] = min_count + weight
+        self.errors[key] = min_count
+        heappush(self._heap, (min_count + weight, key))
+
+    def update_counts(self, freq: Mapping):
+        for key, weight in freq.items():
+            self.update(key, weight)
+
+    def min_count(self) -> int:
+        """
+        未被跟踪的键的真实频率上界；计数器未满时为 0
+        """
+        if len(self.counts) < self.capacity:
+            return 0
+        min_key, min_count = self._pop_min()
+        heappush(self._heap, (min_count, min_key))
+        return min_count
+
+    def merge(self, other: "SpaceSavingSketch"):
+        """
+        合并另一个 sketch：缺失的键按对方的最小计数补上界，再保留计数最大的 capacity 个
+        """
+        m1 = self.min_count()
+        m2 = other.min_count()
+        merged = []
+        for key in self.counts.keys() | other.counts.keys():
+            merged.append((
+                self.counts.get(key, m1) + other.counts.get(key, m2),
+                self.errors.get(key, m1) + other.errors.get(key, m2),
+                key,
+            ))
+        top = nlargest(self.capacity, merged)
+        self.counts = {key: count for count, _, key in top}
+        self.errors = {key: error for _, error, key in top}
+        self.total += other.total
+        self._heap = [(count, key) for count, _, key in top]
+        heapify(self._heap)
+
+    def _pop_min(self) -> tuple[str, int]:
+        heap = self._heap
+        counts = self.counts
+        while True:
+            count, key = heappop(heap)
+            actual = counts.get(key)
+            if actual is None:
+                continue
+            if actual == count:
+                return key, count
+            heappush(heap, (actual, key))
+
+
+class HeavyHitterModel:
+    """
+    近似统计模型：使用固定大小的 Space-Saving sketch 只跟踪出现最多的 top_k 个键，
+    内存与不同键的数量无关。frequency 为估计值（上界），total 为精确的总数。
+    """
+    exact = False
+
+    def __init__(self, top_k: int = DEFAULT_TOP_K):
+        self.sketch = SpaceSavingSketch(top_k)
+
+    @property
+    def frequency(self) -> dict:
+        return self.sketch.counts
+
+    @property
+    def error(self) -> dict:
+        return self.sketch.errors
+
+    @property
+    def total(self) -> int:
+        return self.sketch.total
+
+    @total.setter
+    def total(self, value: int):
+        self.sketch.total = value
+
+    @property
+    def probability(self) -> ProbabilityView:
+        return ProbabilityView(self)
+
+    @property
+    def error_bound(self) -> int:
+        """
+        任意键的最大高估量，不超过 total / top_k
+        """
+        return self.sketch.min_count()
+
+    def summary(self) -> DistributionSummary:
+        """
+        仅基于被跟踪的 top_k 个键的估计计数计算摘要
+        """
+        return SummaryAccumulator.from_counts(self.sketch.counts.values()).summary()
+
+    def bounds(self, key: str) -> tuple[int, int]:
+        """
+        返回键的真实频率区间 (下界, 上界)
+        """
+        count = self.sketch.counts.get(key)
+        if count is None:
+            return 0, self.sketch.min_count()
+        return count - self.sketch.errors[key], count
+
+    def rows(self) -> Iterator[tuple[str, int, float]]:
+        total = self.total
+        for k, v in sorted(self.sketch.counts.items(), key=lambda kv: kv[1], reverse=True):
+            yield k, v, (v / total if total else 0.0)
+
+    def merge(self, new_freq: Mapping):
+        if not new_freq:
+            raise ProjectEmptyError()
+        self.sketch.update_counts(new_freq)
+
+    def merge_sketch(self, other: "HeavyHitterModel"):
+        self.sketch.merge(other.sketch)
+
+    def overwrite(self, new_freq: Mapping):
+        if not new_freq:
+            raise ProjectEmptyError()
+        self.sketch = SpaceSavingSketch(self.sketch.capacity)
+        self.sketch.update_counts(new_freq)
+
+    def analyze(self, text: str, options: AnalyzeOptions):
+        chunks = (text[i:i + DEFAULT_CHUNK_SIZE] for i in range(0, len(text), DEFAULT_CHUNK_SIZE))
+        self.analyze_stream(chunks, options)
+
+    def analyze_stream(self, source: StreamSource, options: AnalyzeOptions, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        batches = iter_token_batches(iter_chunks(source, chunk_size), get_tokenizer(options))
+        sketch = SpaceSavingSketch(options.top_k)
+        for counts in iter_batch_counts(batches, options):
+            sketch.update_counts(counts)
+        self.sketch = sketch
@@ -0,0 +1,5 @@
+from enum import Enum
+
+class StorageBackend(Enum):
+    SQLITE = "sqlite"        # 每个键一行，存放在 statistics 表中
+    COLUMNAR = "columnar"    # 每个项目一组列式文件，打开时内存映射
\ No newline at end of file
@@ -0,0 +1,127 @@
+import re
+from functools import lru_cache
+from typing import Iterator
+
+from hnstatistics.core.statistics.analyze_options import AnalyzeOptions
+
+_CJK_RANGES = (
+    "\u3040-\u30ff"          # 平假名、片假名
+    "\u3400-\u4dbf"          # CJK 扩展 A
+    "\u4e00-\u9fff"          # CJK 统一表意文字
+    "\uac00-\ud7af"          # 韩文音节
+    "\uf900-\ufaff"          # CJK 兼容表意文字
+    "\U00020000-\U0002ebef"  # CJK 扩展 B-F
+)
+# 这两个正则编译约需 10 ms，在第一次创建 CJKTokenizer 时才通过 _compile 编译，不拖慢程序启动
+_CJK_CHAR_PATTERN = f"[{_CJK_RANGES}]"
+_CJK_TOKEN_PATTERN = f"[{_CJK_RANGES}]|[^\\s{_CJK_RANGES}]+"
+_NON_SPACE_CHAR = re.compile(r"\S")
+
+_TOKENIZERS: dict[str, type["Tokenizer"]] = {}
+
+
+def register_tokenizer(name: str):
+    """
+    注册分词器类，之后可通过 AnalyzeOptions.tokenizer 按名称选择
+    """
+    def decorator(cls):
+        cls.name = name
+        _TOKENIZERS[name] = cls
+        return cls
+    return decorator
+
+def available_tokenizers() -> list[str]:
+    return list(_TOKENIZERS)
+
+def get_tokenizer(options: AnalyzeOptions) -> "Tokenizer":
+    return _get_tokenizer(options.tokenizer, options.token_pattern)
+
+@lru_cache(maxsize=32)
+def _get_tokenizer(name: str, pattern: str) -> "Tokenizer":
+    cls = _TOKENIZERS.get(name)
+    if cls is None:
+        raise ValueError(f"Unsupported tokenizer: {name}")
+    return cls(pattern)
+
+@lru_cache(maxsize=32)
+def _compile(pattern: str) -> re.Pattern:
+    return re.compile(pattern)
+
+
+class Tokenizer:
+    name = ""
+    ngram_separator = " "
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+
+    def tokenize(self, text: str) -> Iterator[str]:
+        raise NotImplementedError
+
+    def safe_cut(self, text: str) -> int:
+        """
+        返回可以安全切分文本的位置：该位置之前的内容分词结果不会受后续文本影响
+        """
+        cut = len(text)
+        while cut > 0 and not text[cut - 1].isspace():
+            cut -= 1
+        return cut
+
+
+@register_tokenizer("whitespace")
+class WhitespaceTokenizer(Tokenizer):
+    def tokenize(self, text: str) -> Iterator[str]:
+        yield from text.split()
+
+
+@register_tokenizer("regex")
+class RegexTokenizer(Tokenizer):
+    """
+    按正则表达式匹配词，假定一个词不会跨越空白字符
+    """
+    def __init__(self, pattern: str):
+        super().__init__(pattern)
+        self._regex = _compile(pattern)
+
+    def tokenize(self, text: str) -> Iterator[str]:
+        for match in self._regex.finditer(text):
+            yield match.group()
+
+
+@register_tokenizer("cjk")
+class CJKTokenizer(Tokenizer):
+    """
+    中日韩字符逐字切分，其他连续的非空白字符作为一个词
+    """
+    ngram_separator = ""
+
+    def __init__(self, pattern: str):
+        super().__init__(pattern)
+        self._token = _compile(_CJK_TOKEN_PATTERN)
+        self._char = _compile(_CJK_CHAR_PATTERN)
+
+    def tokenize(self, text: str) -> Iterator[str]:
+        for match in self._token.finditer(text):
+            yield match.group()
+
+    def safe_cut(self, text: str) -> int:
+        cut = len(text)
+        char = self._char
+        while cut > 0 and not (text[cut - 1].isspace() or char.match(text[cut - 1])):
+            cut -= 1
+        return cut
+
+
+@register_tokenizer("char")
+class CharTokenizer(Tokenizer):
+    """
+    每个非空白字符作为一个词
+    """
+    ngram_separator = ""
+
+    def tokenize(self, text: str) -> Iterator[str]:
+        for match in _NON_SPACE_CHAR.finditer(text):
+            yield match.group()
+
+    def safe_cut(self, text: str) -> int:
+        return len(text)
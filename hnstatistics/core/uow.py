@@ -1,6 +1,9 @@
 from hnstatistics.core.db import get_connection
+from hnstatistics.core.repositories.columnar_statistics_repo import ColumnarStatisticsRepository
+from hnstatistics.core.repositories.commit_log_repo import SQLiteCommitLogRepository
 from hnstatistics.core.repositories.sqlite_project_repo import SQLiteProjectRepository
 from hnstatistics.core.repositories.statistics_repo import SQLiteStatisticsRepository
+from hnstatistics.core.statistics.storage_backend import StorageBackend
 
 class UnitOfWork:
     def __enter__(self):
@@ -8,20 +11,35 @@ class UnitOfWork:
 
         self.projects = SQLiteProjectRepository(self.conn)
         self.statistics = SQLiteStatisticsRepository(self.conn)
+        self.columnar = ColumnarStatisticsRepository(self.conn)
+        self.commit_log = SQLiteCommitLogRepository(self.conn)
         
-        self.conn.execute("BEGIN;")
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN;")
 
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        try:
-            if exc_type is None:
-                self.conn.commit()
-            else:
-                self.conn.rollback()
-        finally:
-            self.conn.close()
+        # 连接由 ConnectionManager 持有并复用，这里只结束事务
+        if exc_type is None:
+            self.commit()
+        else:
+            self.conn.rollback()
+            self.columnar.rollback()
         return False
 
     def commit(self):
-        self.conn.commit()
\ No newline at end of file
+        # 列式存储的当前版本号在数据库事务中，提交即切换；之后才删除旧版本的文件
+        self.conn.commit()
+        self.columnar.commit()
+
+    def statistics_for(self, project_id: int):
+        """
+        返回项目所用存储方式对应的统计数据仓库
+        """
+        return self.backend(self.projects.get_storage(project_id))
+
+    def backend(self, storage: str):
+        if StorageBackend(storage) == StorageBackend.COLUMNAR:
+            return self.columnar
+        return self.statistics
\ No newline at end of file
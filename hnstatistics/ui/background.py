@@ -0,0 +1,84 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from hnstatistics.core.errors import OperationCancelledError
+
+POLL_INTERVAL_MS = 100
+
+
+class JobContext:
+    """
+    传给后台任务的上下文：任务通过 report() 报告进度，通过 check_cancelled() 响应取消
+    """
+    def __init__(self):
+        self.cancel_event = threading.Event()
+        self.progress = 0.0
+
+    def report(self, fraction: float):
+        self.progress = min(max(fraction, 0.0), 1.0)
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise OperationCancelledError()
+
+
+class JobRunner:
+    """
+    在单个后台线程中运行耗时任务，通过 Tk 的 after() 轮询把进度和结果交回主线程；
+    同一时间只允许一个任务运行
+    """
+    def __init__(self, root, poll_interval_ms: int = POLL_INTERVAL_MS):
+        self.root = root
+        self.poll_interval_ms = poll_interval_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hnstatistics-job")
+        self._future: Future | None = None
+        self._context: JobContext | None = None
+
+    @property
+    def busy(self) -> bool:
+        return self._future is not None
+
+    def submit(
+        self,
+        job: Callable[[JobContext], object],
+        on_done: Callable[[object], None],
+        on_error: Callable[[BaseException], None],
+        on_progress: Callable[[float], None] | None = None,
+    ) -> bool:
+        if self.busy:
+            return False
+        self._context = JobContext()
+        self._future = self._executor.submit(job, self._context)
+        self.root.after(self.poll_interval_ms, self._poll, on_done, on_error, on_progress)
+        return True
+
+    def cancel(self):
+        if self._context is not None:
+            self._context.cancel_event.set()
+
+    def shutdown(self, wait: bool = True):
+        """
+        取消正在运行的任务并停止后台线程；wait 为 True 时等待任务结束，
+        已开始写入数据库的任务不响应取消，会在写完后才返回
+        """
+        self.cancel()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _poll(self, on_done, on_error, on_progress):
+        future = self._future
+        if future is None:
+            return
+        if on_progress is not None:
+            on_progress(self._context.progress)
+        if not future.done():
+            self.root.after(self.poll_interval_ms, self._poll, on_done, on_error, on_progress)
+            return
+
+        self._future = None
+        self._context = None
+        error = future.exception()
+        if error is not None:
+            on_error(error)
+        else:
+            on_done(future.result())
\ No newline at end of file
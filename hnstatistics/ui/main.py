@@ -1,4 +1,5 @@
 from copy import deepcopy
+from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter import simpledialog
@@ -6,18 +7,24 @@ from tkinter import filedialog
 
 from hnstatistics.core.config.config_dialog import ConfigDialog
 from hnstatistics.core.config.app_config import AppConfig
-from hnstatistics.core.db import init_db
+from hnstatistics.core.db import close_connections, init_db
 from hnstatistics.core.path import APP_ROOT, ensure_dir, get_default_save_dir
 from hnstatistics.core.project import Project
 from hnstatistics.core.config.config_service import ConfigService
+from hnstatistics.core.services.commit_queue import WriteBehindCommitQueue
 from hnstatistics.core.services.project_service import ProjectService
-from hnstatistics.core.errors import HNStatisticsError
+from hnstatistics.core.errors import HNStatisticsError, OperationCancelledError
 from hnstatistics.core.services.statistics_service import StatisticsService
 from hnstatistics.core.services.export_service import export_project
+from hnstatistics.core.statistics.algorithms import iter_text_chunks
 from hnstatistics.core.statistics.analyze_options import AnalyzeOptions
 from hnstatistics.core.statistics.commit_mode import CommitMode
 from hnstatistics.core.statistics.draft import DraftStatistics
 from hnstatistics.core.statistics.model import StatisticsModel
+from hnstatistics.core.statistics.model_factory import merge_models
+from hnstatistics.ui.background import JobRunner
+from hnstatistics.ui.result_rows import ResultRows
+from hnstatistics.ui.virtual_tree import VirtualTreeview
 
 # ========== UI State ==========
 class UIState:
@@ -26,6 +33,7 @@ class UIState:
         self.selected_project = None
         self.draft: DraftStatistics = DraftStatistics()
         self.preview_stats: StatisticsModel | None = None
+        self.result_rows: ResultRows | None = None
         self.project_list = []
         self.filtered_projects = []
         
@@ -36,13 +44,32 @@ class UIState:
         self.analyze_options: AnalyzeOptions = AnalyzeOptions()
 
 CONFIG_PATH = APP_ROOT / "myconfig" / "app_config.json"
+UI_CHUNK_SIZE = 256 * 1024
 
 ui = {}
 state = UIState()
 project_service = ProjectService()
 statistics_service = StatisticsService()
+commit_queue = WriteBehindCommitQueue(statistics_service)
 config_service = ConfigService(CONFIG_PATH)
-app_config = config_service.load()
+app_config = AppConfig()  # 在 main() 中加载，导入本模块时不读写任何文件
+# 第一屏用不到的服务在第一次使用时才导入和创建
+import_service = None
+batch_export_service = None
+
+def get_import_service():
+    global import_service
+    if import_service is None:
+        from hnstatistics.core.services.import_service import ImportService
+        import_service = ImportService(statistics_service)
+    return import_service
+
+def get_batch_export_service():
+    global batch_export_service
+    if batch_export_service is None:
+        from hnstatistics.core.services.batch_export_service import BatchExportService
+        batch_export_service = BatchExportService()
+    return batch_export_service
 
 def refresh_project_list(projects=None):
     tree = ui['project_tree']
@@ -59,42 +86,41 @@ def refresh_project_list(projects=None):
         tags = ()
         if keyword and keyword in project.name.lower():
             tags = ("search_match",)
-        tree.insert("", "end", text=project.name, tags=tags)
+        tree.insert("", "end", text=project.name, values=(f"{project.distinct_count:,}",), tags=tags)
         
 def refresh_result_view():
-    tree = ui['result_tree']
-    tree.delete(*tree.get_children())
-    
+    view = ui['result_view']
     stats = state.preview_stats
     
     if not stats:
+        state.result_rows = None
+        view.set_rows(0, None)
+        ui['result_count'].set("")
         return
     
-    for k in stats.frequency:
-        tree.insert(
-            "",
-            "end",
-            values=(
-                k,
-                stats.frequency[k],
-                f"{stats.probability[k]:.4f}"
-            )
-        )
-    
+    # 结果表是虚拟化的，只有可见的几十行对应 Treeview 条目，打开任意大小的项目耗时基本不变
+    rows = state.result_rows = ResultRows(stats)
     if state.sort_column:
-        sort_result_tree(state.sort_column)
+        rows.sort(state.sort_column, state.sort_reverse)
+    view.set_rows(len(rows), rows.row)
+    ui['result_count'].set(f"{len(rows):,} items")
 
 def set_status(message):
     ui['status_bar'].set(message)
 
+def describe_summary(stats) -> str:
+    summary = statistics_service.summarize(stats)
+    return (
+        f"Total: {summary.total} | Distinct: {summary.distinct} | "
+        f"Entropy: {summary.entropy:.3f} bits | Concentration: {summary.concentration:.4f} | "
+        f"Singletons: {summary.singleton_ratio:.1%} | Zipf: {summary.zipf_exponent:.2f}"
+    )
+
 def sort_result_tree(column: str):
-    tree = ui['result_tree']
-    
-    rows = []
+    if job_busy():
+        return
     
-    for iid in tree.get_children():
-        values = tree.item(iid, "values")
-        rows.append(values)
+    rows = state.result_rows
     
     if not rows:
         return
@@ -105,25 +131,8 @@ def sort_result_tree(column: str):
         state.sort_column = column
         state.sort_reverse = True
     
-    col_index = {"item": 0, "freq": 1, "prob": 2}[column]
-    
-    def sort_key(row):
-        value = row[col_index]
-        if column == "item":
-            return value
-        elif column == "freq":
-            return int(value)
-        elif column == "prob":
-            return float(value)
-    
-    rows.sort(
-        key=sort_key,
-        reverse=state.sort_reverse
-    )
-    
-    tree.delete(*tree.get_children())
-    for row in rows:
-        tree.insert("", "end", values=row)
+    rows.sort(column, state.sort_reverse)
+    ui['result_view'].set_rows(len(rows), rows.row)
     
     update_result_tree_headers()
     
@@ -149,6 +158,58 @@ def update_result_tree_headers():
             command=lambda c=col: sort_result_tree(c)
         )
 
+# ========== background jobs ==========
+def job_busy() -> bool:
+    runner = ui.get("job_runner")
+    if runner is not None and runner.busy:
+        set_status("Another operation is still running")
+        return True
+    return False
+
+def start_job(message, job, on_done):
+    set_job_controls(running=True)
+    set_status(message)
+    
+    def finish():
+        set_job_controls(running=False)
+    
+    def done(result):
+        finish()
+        on_done(result)
+    
+    def error(e):
+        finish()
+        if isinstance(e, OperationCancelledError):
+            set_status("Operation cancelled")
+        elif isinstance(e, HNStatisticsError):
+            messagebox.showerror("Error", str(e))
+            set_status("Operation failed")
+        else:
+            # 例如 sqlite3.Error 或 OSError：在 after() 回调中抛出只会打印到控制台
+            messagebox.showerror("Error", f"{type(e).__name__}: {e}")
+            set_status("Operation failed")
+    
+    def progress(fraction):
+        ui["progress_var"].set(fraction * 100)
+    
+    ui["job_runner"].submit(job, done, error, progress)
+
+def set_job_controls(running: bool):
+    button_state = "disabled" if running else "normal"
+    ui["analyze_button"].configure(state=button_state)
+    ui["commit_button"].configure(state=button_state)
+    ui["progress_var"].set(0)
+    if running:
+        ui["progress_bar"].pack(side="left", padx=4)
+        ui["cancel_button"].pack(side="left", padx=4)
+    else:
+        ui["progress_bar"].pack_forget()
+        ui["cancel_button"].pack_forget()
+
+def command_cancel_job():
+    ui["job_runner"].cancel()
+    set_status("Cancelling...")
+
 # ========== command functions ==========
 def command_create_project():
     name = simpledialog.askstring("Create Project", "Enter project name:")
@@ -163,15 +224,20 @@ def command_create_project():
         messagebox.showerror("Error", str(e))
 
 def command_open_project():
+    if job_busy():
+        return
+    
     index = get_selected_index()
     if index is None:
         return
     
     project = state.filtered_projects[index]
+    # 切换项目前把写回队列中的增量写入数据库
+    commit_queue.flush()
     state.current_project = project_service.load(project.id)
     state.preview_stats = state.current_project.stats
     refresh_result_view()
-    set_status(f"Opened project: {state.current_project.name}")
+    set_status(f"Opened project: {state.current_project.name} - {describe_summary(state.current_project.stats)}")
 
 def command_rename_project():
     index = get_selected_index()
@@ -196,6 +262,9 @@ def command_rename_project():
         messagebox.showerror("Error", str(e))
 
 def command_delete_project():
+    if job_busy():
+        return
+    
     index = get_selected_index()
     if index is None:
         return
@@ -211,33 +280,43 @@ def command_delete_project():
         return
     
     try:
+        commit_queue.flush()
         project_service.delete(project.id)
         refresh_project_list()
     except HNStatisticsError as e:
         messagebox.showerror("Error", str(e))
 
 def command_analyze():
+    if job_busy():
+        return
+    
     text = ui["input_text"].get("1.0", tk.END).strip()
     
     if not text and not state.current_project:
         messagebox.showwarning("Warning", "Input text is empty")
         return
     
-    try:
-        state.draft = statistics_service.create_draft()
-        statistics_service.analyze_draft(state.draft, text, state.analyze_options)
-        state.preview_stats = deepcopy(state.draft.current)
-        if state.current_project:
-            if state.commit_mode == CommitMode.MERGE:
-                statistics_service.merge_statistics(
-                    state.preview_stats,
-                    state.current_project.stats
-                )
-        state.last_analyzed_mode = state.commit_mode
+    project = state.current_project
+    mode = state.commit_mode
+    options = deepcopy(state.analyze_options)
+    
+    def job(ctx):
+        draft = statistics_service.create_draft()
+        chunks = iter_text_chunks(text, UI_CHUNK_SIZE, ctx.report, ctx.check_cancelled)
+        statistics_service.analyze_draft_stream(draft, chunks, options)
+        ctx.check_cancelled()
+        preview = deepcopy(draft.current)
+        if project and mode == CommitMode.MERGE and project.stats.frequency:
+            preview = merge_models(preview, project.stats)
+        return draft, preview
+    
+    def on_done(result):
+        state.draft, state.preview_stats = result
+        state.last_analyzed_mode = mode
         refresh_result_view()
-        set_status("Analysis completed")
-    except HNStatisticsError as e:
-        messagebox.showerror("Error", str(e))
+        set_status(f"Analysis completed - {describe_summary(state.preview_stats)}")
+    
+    start_job("Analyzing...", job, on_done)
 
 def command_change_commit_mode():
     if state.commit_mode == CommitMode.OVERWRITE:
@@ -250,6 +329,9 @@ def command_change_commit_mode():
     set_status(f"Commit mode changed to: {state.commit_mode.value}")
 
 def command_commit():
+    if job_busy():
+        return
+    
     if not state.current_project:
         messagebox.showwarning("Warning", "No project opened")
         return
@@ -270,16 +352,31 @@ def command_commit():
         )
         return
     
-    try:
-        statistics_service.analyze_draft(state.draft, text, state.analyze_options)
-        statistics_service.commit(state.current_project, state.draft.current, mode)
-        state.preview_stats = deepcopy(state.current_project.stats)
+    project = state.current_project
+    draft = state.draft
+    options = deepcopy(state.analyze_options)
+    
+    def job(ctx):
+        chunks = iter_text_chunks(text, UI_CHUNK_SIZE, ctx.report, ctx.check_cancelled)
+        statistics_service.analyze_draft_stream(draft, chunks, options)
+        ctx.check_cancelled()
+        # 写入数据库之后不再响应取消；write_commit 不修改界面正在显示的 project.stats，
+        # 内存中的合并在主线程中由 apply_commit 完成，代价与本次增量成正比
+        if app_config.write_behind:
+            return commit_queue.write_commit(project, draft.current, mode)
+        return statistics_service.write_commit(project, draft.current, mode)
+    
+    def on_done(committed):
+        statistics_service.apply_commit(project, committed)
+        state.preview_stats = project.stats
         refresh_result_view()
+        refresh_project_list()
         set_status(
-            f"Commited {mode.value} changes to project: {state.current_project.name}"
+            f"Commited {mode.value} changes to project: {project.name}"
+            f" - {describe_summary(project.stats)}"
         )
-    except HNStatisticsError as e:
-        messagebox.showerror("Error", str(e))
+    
+    start_job("Committing...", job, on_done)
 
 def command_open_preferences():
     def on_save():
@@ -290,6 +387,9 @@ def command_open_preferences():
     set_status("Preferences saved")
 
 def command_undo():
+    if job_busy():
+        return
+    
     if not state.draft:
         messagebox.showwarning("Warning", "No project opened")
         return
@@ -298,6 +398,9 @@ def command_undo():
     refresh_result_view()
 
 def command_redo():
+    if job_busy():
+        return
+    
     if not state.draft:
         messagebox.showwarning("Warning", "No project opened")
         return
@@ -315,7 +418,9 @@ def build_menu_bar(parent):
     
     file_menu.add_command(label="Create Project", command=command_create_project)
     file_menu.add_command(label="Open Project", command=command_open_project)
+    file_menu.add_command(label="Import...", command=on_import_project)
     file_menu.add_command(label="Export...", command=on_export_project)
+    file_menu.add_command(label="Export All Projects...", command=on_export_all_projects)
     file_menu.add_separator()
     file_menu.add_command(label="Preferences", command=command_open_preferences)
     file_menu.add_separator()
@@ -349,7 +454,11 @@ def build_project_panel(parent, font):
     
     search_var.trace_add("write", on_project_search_change)
     
-    tree = ttk.Treeview(frame, show="tree")
+    tree = ttk.Treeview(frame, columns=("items",), show=("tree", "headings"))
+    tree.heading("#0", text="Name", anchor="w")
+    tree.heading("items", text="Items", anchor="e")
+    tree.column("#0", width=130, stretch=True)
+    tree.column("items", width=70, anchor="e", stretch=False)
     tree.pack(fill="both", expand=True, padx=8, pady=4)
     tree.tag_configure(
         "search_match",
@@ -412,46 +521,63 @@ def build_editor_panel(parent, font):
     btn_bar = ttk.Frame(frame)
     btn_bar.pack(fill="x", padx=8, pady=4)
     
-    ttk.Button(btn_bar, text="Analyze", command=command_analyze).pack(side="right", padx=4)
+    ui["analyze_button"] = ttk.Button(btn_bar, text="Analyze", command=command_analyze)
+    ui["analyze_button"].pack(side="right", padx=4)
     ui["commit_mode_button"] = tk.StringVar(value="Commit Mode: Overwrite")
     ttk.Button(btn_bar, textvariable=ui["commit_mode_button"], command=command_change_commit_mode).pack(side="right", padx=4)
-    ttk.Button(btn_bar, text="Commit", command=command_commit).pack(side="right", padx=4)
+    ui["commit_button"] = ttk.Button(btn_bar, text="Commit", command=command_commit)
+    ui["commit_button"].pack(side="right", padx=4)
     
     return frame
 
 def build_result_panel(parent, font):
     frame = ttk.Frame(parent)
     
+    header = ttk.Frame(frame)
+    header.pack(fill="x", padx=8, pady=4)
     ttk.Label(
-        frame,
+        header,
         text="Results",
         font=font
-    ).pack(anchor="w", padx=8, pady=4)
-    tree = ttk.Treeview(
-        frame,
-        columns=("item", "freq", "prob"),
-        show="headings",
-    )
+    ).pack(side="left")
+    ui["result_count"] = tk.StringVar(value="")
+    ttk.Label(header, textvariable=ui["result_count"]).pack(side="right")
+    
+    view = VirtualTreeview(frame, columns=("item", "freq", "prob"))
+    tree = view.tree
     
     tree.heading("item", text="Item", command=lambda: sort_result_tree("item"))
     tree.heading("freq", text="Frequency", command=lambda: sort_result_tree("freq"))
     tree.heading("prob", text="Probability", command=lambda: sort_result_tree("prob"))
     
-    tree.pack(fill="both", expand=True, padx=8, pady=4)
+    view.pack(fill="both", expand=True, padx=8, pady=4)
     
+    ui["result_view"] = view
     ui["result_tree"] = tree
     update_result_tree_headers()
     return frame
 
 def build_status_bar(parent, font):
+    bar = ttk.Frame(parent, relief="sunken")
+    bar.pack(fill="x", side="bottom")
+    
     ui['status_bar'] = tk.StringVar(value="HNStatistics - Ready")
     status = ttk.Label(
-        parent,
+        bar,
         textvariable=ui['status_bar'],
-        relief="sunken",
         anchor="w"
     )
-    status.pack(fill="x", side="bottom")
+    status.pack(fill="x", side="left", expand=True)
+    
+    ui["progress_var"] = tk.DoubleVar(value=0)
+    ui["progress_bar"] = ttk.Progressbar(
+        bar,
+        variable=ui["progress_var"],
+        maximum=100,
+        length=160,
+        mode="determinate"
+    )
+    ui["cancel_button"] = ttk.Button(bar, text="Cancel", command=command_cancel_job)
 
 # ========== event handlers ==========
 def on_project_enter(event):
@@ -470,8 +596,12 @@ def on_project_single_click(event):
         return
     
     index = tree.index(selection[0])
-    state.selected_project = state.project_list[index]
-    set_status(f"Selected project: {state.selected_project.name}")
+    project = state.selected_project = state.project_list[index]
+    updated = f", updated {project.updated_at} UTC" if project.updated_at else ""
+    set_status(
+        f"Selected project: {project.name} - {project.distinct_count:,} items,"
+        f" total {project.total_count:,}{updated}"
+    )
 
 def on_project_right_click(event):
     tree = ui['project_tree']
@@ -557,6 +687,9 @@ def on_export_project():
             ("Excel Files", "*.xlsx"),
             ("CSV Files", "*.csv"),
             ("JSON Files", "*.json"),
+            ("NumPy Archives", "*.npz"),
+            ("Compressed CSV Files", "*.csv.gz *.csv.xz"),
+            ("Compressed JSON Files", "*.json.gz *.json.xz"),
             ("All Files", "*.*")
         ]
     )
@@ -573,6 +706,87 @@ def on_export_project():
         messagebox.showerror("Error", str(e))
         set_status("Export failed")
 
+def on_export_all_projects():
+    if job_busy():
+        return
+    
+    output_dir = filedialog.askdirectory(
+        title="Export All Projects",
+        initialdir=ensure_dir(get_default_save_dir(app_config)),
+    )
+    
+    if not output_dir:
+        return
+    
+    formats = simpledialog.askstring(
+        "Export All Projects",
+        "Formats (comma separated: xlsx, csv, json, npz, csv.gz, json.gz, ...):",
+        initialvalue="xlsx"
+    )
+    
+    if not formats:
+        return
+    
+    formats = [f.strip() for f in formats.split(",") if f.strip()]
+    project_ids = [p.id for p in state.project_list]
+    commit_queue.flush()
+    
+    def job(ctx):
+        return get_batch_export_service().export(
+            project_ids, formats, output_dir,
+            progress=ctx.report, check_cancelled=ctx.check_cancelled,
+        )
+    
+    def on_done(report):
+        from hnstatistics.core.services.batch_export_service import ExportStatus
+        
+        exported = report.by_status(ExportStatus.EXPORTED)
+        skipped = report.by_status(ExportStatus.SKIPPED)
+        failed = report.by_status(ExportStatus.FAILED)
+        set_status(
+            f"Exported {len(exported)} projects, skipped {len(skipped)} unchanged, {len(failed)} failed - "
+            f"{report.rows:,} rows in {report.seconds:.1f}s"
+        )
+        if failed:
+            details = "\n".join(f"{r.name or r.project_id}: {r.error}" for r in failed)
+            messagebox.showerror("Export Failed", details)
+    
+    start_job("Exporting projects...", job, on_done)
+
+def on_import_project():
+    if job_busy():
+        return
+    
+    file_path = filedialog.askopenfilename(
+        title="Import Project",
+        initialdir=ensure_dir(get_default_save_dir(app_config)),
+        filetypes=[
+            ("Exported Projects", "*.xlsx *.csv *.json *.npz *.csv.gz *.csv.xz *.json.gz *.json.xz"),
+            ("All Files", "*.*")
+        ]
+    )
+    
+    if not file_path:
+        return
+    
+    name = simpledialog.askstring(
+        "Import Project",
+        "Enter new project name:",
+        initialvalue=Path(file_path).stem
+    )
+    
+    if not name:
+        return
+    
+    def job(ctx):
+        return get_import_service().import_new_project(name, file_path)
+    
+    def on_done(project):
+        refresh_project_list()
+        set_status(f"Imported project: {project.name} - {project.distinct_count:,} items")
+    
+    start_job("Importing...", job, on_done)
+
 def apply_config():
     default_font = (app_config.font_family, app_config.font_size, app_config.font_weight)
     root = ui['result_tree'].winfo_toplevel()
@@ -595,13 +809,17 @@ def get_selected_index():
 
 # ========== app entry ==========
 def main():
+    global app_config
+    app_config = config_service.load()
     init_db()
+    commit_queue.recover()
     
     root = tk.Tk()
     root.title("HNStatistics")
     root.geometry("900x600")
     
     ui['root'] = root
+    ui['job_runner'] = JobRunner(root)
     
     text_font = (app_config.font_family, app_config.font_size, app_config.font_weight)
     root.option_add("*Font", text_font)
@@ -629,6 +847,14 @@ def main():
     refresh_project_list()
     
     root.mainloop()
+    # 先等后台任务结束，再关闭写回队列和它使用的数据库连接
+    ui['job_runner'].shutdown(wait=True)
+    commit_queue.close()
+    try:
+        statistics_service.prune_vocabulary()
+    except HNStatisticsError:
+        pass  # 只是回收空间，下次退出时重试
+    close_connections()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,49 @@
+from array import array
+
+from hnstatistics.core.statistics.compact_model import CompactStatisticsModel
+
+SORT_COLUMNS = ("item", "freq", "prob")
+
+
+class ResultRows:
+    """
+    结果表的数据源：按位置读取模型中的 (键, 频率, 概率)。
+    排序只生成一个位置索引数组，不复制键；CompactStatisticsModel 直接按位置读取列数据，不解码全部键
+    """
+    def __init__(self, stats):
+        self.stats = stats
+        self.total = stats.total
+        if isinstance(stats, CompactStatisticsModel):
+            blob, offsets, counts = stats.columns()
+            self._key = lambda i: bytes(blob[offsets[i]:offsets[i + 1]]).decode("utf-8")
+            self._counts = counts
+            self._sorted_by_key = True  # 列数据按 UTF-8 字节序排列，与按字符串排序的顺序相同
+        else:
+            self._key = list(stats.frequency).__getitem__
+            self._counts = array("q", stats.frequency.values())
+            self._sorted_by_key = False
+        self._order: array | range | None = None  # None 表示模型自身的顺序
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def row(self, index: int) -> tuple:
+        if self._order is not None:
+            index = self._order[index]
+        count = self._counts[index]
+        probability = count / self.total if self.total else 0.0
+        return self._key(index), count, f"{probability:.4f}"
+
+    def sort(self, column: str, descending: bool):
+        """
+        按列排序；概率与频率的顺序相同
+        """
+        if column not in SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {column}")
+        n = len(self._counts)
+        if column == "item" and self._sorted_by_key:
+            self._order = range(n - 1, -1, -1) if descending else None
+        elif column == "item":
+            self._order = array("q", sorted(range(n), key=self._key, reverse=descending))
+        else:
+            self._order = array("q", sorted(range(n), key=self._counts.__getitem__, reverse=descending))
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+启动耗时检查：在新的解释器中以 -X importtime 导入程序入口，列出累计耗时最多的模块，
+并检查两类回归——导入总耗时超出预算，或者第一屏用不到的模块（openpyxl、导入导出实现、进程池等）在启动时被导入。
+
+    python -m hnstatistics.ui.startup_check [--budget-ms 150] [--top 15] [--runs 5] [--db hnstatistics.db]
+
+发现回归时退出码为 1，可以放在提交前或持续集成中运行
+"""
+import argparse
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+ENTRY_MODULE = "hnstatistics.ui.main"
+DEFAULT_BUDGET_MS = 150.0
+DEFAULT_RUNS = 5
+DEFAULT_TOP = 15
+
+# 只在导出、导入、批量导出或并行统计时才需要，启动时导入即视为回归
+DEFERRED_MODULES = (
+    "openpyxl",
+    "hnstatistics.core.infrastructure.exporters",
+    "hnstatistics.core.infrastructure.importers",
+    "hnstatistics.core.services.import_service",
+    "hnstatistics.core.services.batch_export_service",
+    "multiprocessing",
+    "concurrent.futures.process",
+    "zipfile",
+    "gzip",
+)
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure_imports(module: str = ENTRY_MODULE, runs: int = DEFAULT_RUNS) -> list[ImportRecord]:
+    """
+    在新的解释器中导入 module 共 runs 次，返回入口模块累计耗时最短的一次的记录
+    """
+    best = None
+    best_total = None
+    for _ in range(max(1, runs)):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+        records = parse_importtime(result.stderr)
+        total = entry_time(records, module)
+        if best_total is None or total < best_total:
+            best, best_total = records, total
+    return best
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    """
+    解析 -X importtime 的输出："import time: self [us] | cumulative | imported package"
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表头
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        records.append(ImportRecord(
+            name=stripped,
+            self_us=int(parts[0]),
+            cumulative_us=int(parts[1]),
+            depth=(len(name) - len(stripped) - 1) // 2,
+        ))
+    return records
+
+def entry_time(records: list[ImportRecord], module: str = ENTRY_MODULE) -> int:
+    for record in records:
+        if record.name == module and record.depth == 0:
+            return record.cumulative_us
+    raise ValueError(f"{module} not found in import time output.")
+
+def deferred_imports(records: list[ImportRecord], deferred=DEFERRED_MODULES) -> list[str]:
+    return [
+        r.name for r in records
+        if any(r.name == m or r.name.startswith(m + ".") for m in deferred)
+    ]
+
+def measure_init_db(db_path: str) -> tuple[float, float]:
+    """
+    返回 (init_db, 读取项目列表) 的耗时（毫秒），即窗口显示前访问数据库的时间
+    """
+    from hnstatistics.core.db import configure_database, init_db
+    from hnstatistics.core.services.project_service import ProjectService
+
+    configure_database(db_path)
+    start = time.perf_counter()
+    init_db()
+    middle = time.perf_counter()
+    ProjectService().list_projects()
+    end = time.perf_counter()
+    return (middle - start) * 1000, (end - middle) * 1000
+
+def report(records: list[ImportRecord], top: int = DEFAULT_TOP, module: str = ENTRY_MODULE) -> str:
+    lines = [f"{module}: {entry_time(records, module) / 1000:.1f} ms ({len(records)} modules)", ""]
+    lines.append(f"{'cumulative':>12} {'self':>10}  module")
+    for r in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        lines.append(f"{r.cumulative_us / 1000:>9.1f} ms {r.self_us / 1000:>7.1f} ms  {'  ' * r.depth}{r.name}")
+    return "\n".join(lines)
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Report and check the import time of the application.")
+    parser.add_argument("--module", default=ENTRY_MODULE)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    parser.add_argument("--db", help="also time init_db() and the project list on this database")
+    args = parser.parse_args(argv)
+
+    records = measure_imports(args.module, args.runs)
+    print(report(records, args.top, args.module))
+
+    problems = []
+    total_ms = entry_time(records, args.module) / 1000
+    if total_ms > args.budget_ms:
+        problems.append(f"import time {total_ms:.1f} ms exceeds the budget of {args.budget_ms:.0f} ms")
+    for name in deferred_imports(records):
+        problems.append(f"{name} is imported at startup")
+
+    if args.db:
+        init_ms, list_ms = measure_init_db(args.db)
+        print(f"\ninit_db: {init_ms:.1f} ms, project list: {list_ms:.1f} ms")
+
+    print()
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if not problems:
+        print("OK")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,180 @@
+import sys
+from tkinter import ttk
+from typing import Callable
+
+OVERSCAN_ROWS = 8
+DEFAULT_ROW_HEIGHT = 20
+WHEEL_ROWS = 3
+
+
+class VirtualTreeview(ttk.Frame):
+    """
+    虚拟化的表格：Treeview 中只有可见的行和其后 overscan 行对应的条目，条目数量与数据量无关。
+    数据由行数和 get_row(index) 提供，滚动只改变第一行可见行的数据索引 top，再把这些条目的值换成对应的行；
+    Treeview 自身的视图始终停在第一个条目，滚动条、滚轮和方向键都由本类处理
+    """
+    def __init__(self, parent, columns, overscan: int = OVERSCAN_ROWS, **options):
+        super().__init__(parent)
+        self.overscan = overscan
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", selectmode="browse", **options)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self._count = 0
+        self._get_row: Callable[[int], tuple] | None = None
+        self._top = 0
+        self._visible = 1
+        self._items: list[str] = []
+        self._selected: int | None = None  # 选中行的数据索引
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        if sys.platform.startswith("linux"):
+            self.tree.bind("<Button-4>", lambda e: self._scroll_rows(-WHEEL_ROWS))
+            self.tree.bind("<Button-5>", lambda e: self._scroll_rows(WHEEL_ROWS))
+        else:
+            self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        for key, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page"),
+                          ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(key, lambda e, s=step: self._move_selection(s))
+
+    @property
+    def row_count(self) -> int:
+        return self._count
+
+    @property
+    def top(self) -> int:
+        return self._top
+
+    @property
+    def selected_index(self) -> int | None:
+        return self._selected
+
+    def set_rows(self, count: int, get_row: Callable[[int], tuple] | None, keep_position: bool = False):
+        """
+        更换数据；keep_position 为 False 时回到第一行并清除选中
+        """
+        self._count = count if get_row is not None else 0
+        self._get_row = get_row
+        if not keep_position:
+            self._top = 0
+            self._selected = None
+        elif self._selected is not None and self._selected >= self._count:
+            self._selected = None
+        self._render()
+
+    def refresh(self):
+        """
+        数据顺序或内容改变后重新填充可见的行
+        """
+        self._render()
+
+    def scroll_to(self, index: int):
+        """
+        把数据索引 index 滚动为第一行可见行
+        """
+        self._top = index
+        self._render()
+
+    def see(self, index: int):
+        """
+        必要时滚动，使数据索引 index 可见
+        """
+        self._reveal(index)
+        self._render()
+
+    def _render(self):
+        count = self._count
+        top = max(0, min(self._top, count - self._visible))
+        self._top = top
+        stop = min(count, top + self._visible + self.overscan)
+        wanted = stop - top
+
+        tree = self.tree
+        items = self._items
+        if len(items) > wanted:
+            tree.delete(*items[wanted:])
+            del items[wanted:]
+        while len(items) < wanted:
+            items.append(tree.insert("", "end"))
+
+        get_row = self._get_row
+        for offset, iid in enumerate(items):
+            tree.item(iid, values=get_row(top + offset))
+
+        selected = self._selected
+        if selected is not None and top <= selected < stop:
+            iid = items[selected - top]
+            if tree.selection() != (iid,):
+                tree.selection_set(iid)
+            tree.focus(iid)
+        elif tree.selection():
+            tree.selection_remove(*tree.selection())
+        tree.yview_moveto(0)
+
+        if count:
+            self.scrollbar.set(top / count, min(1.0, (top + self._visible) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _reveal(self, index: int):
+        if index < self._top:
+            self._top = index
+        elif index >= self._top + self._visible:
+            self._top = index - self._visible + 1
+
+    def _measure_visible(self) -> int:
+        height = self.tree.winfo_height()
+        if self._items:
+            box = self.tree.bbox(self._items[0])
+            if box:
+                _, y, _, row_height = box
+                if row_height > 0:
+                    return max(1, (height - y) // row_height)
+        return max(1, height // DEFAULT_ROW_HEIGHT - 1)
+
+    def _on_configure(self, event=None):
+        visible = self._measure_visible()
+        if visible != self._visible:
+            self._visible = visible
+            self._render()
+
+    def _on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection and selection[0] in self._items:
+            self._selected = self._top + self._items.index(selection[0])
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self._count))
+        elif action == "scroll":
+            step = int(value)
+            self._scroll_rows(step * self._visible if unit == "pages" else step)
+
+    def _on_mousewheel(self, event):
+        # Windows 上每格 delta 为 120，macOS 上为较小的整数
+        steps = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._scroll_rows(-steps * WHEEL_ROWS)
+
+    def _scroll_rows(self, rows: int):
+        self.scroll_to(self._top + rows)
+        return "break"
+
+    def _move_selection(self, step):
+        if not self._count:
+            return "break"
+        current = self._selected if self._selected is not None else self._top - 1
+        if step == "home":
+            index = 0
+        elif step == "end":
+            index = self._count - 1
+        elif step == "page":
+            index = current + self._visible
+        elif step == "-page":
+            index = current - self._visible
+        else:
+            index = current + step
+        self._selected = max(0, min(index, self._count - 1))
+        self.see(self._selected)
+        return "break"
\ No newline at end of file
@@ -0,0 +1,13 @@
+import pytest
+
+from hnstatistics.core.db import close_connections, configure_database, init_db
+
+
+@pytest.fixture
+def database(tmp_path):
+    # 每个测试使用独立的临时数据库，列式存储的文件位于其旁边的目录中
+    path = tmp_path / "hnstatistics.db"
+    configure_database(path)
+    init_db()
+    yield path
+    close_connections()
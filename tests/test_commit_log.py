@@ -0,0 +1,97 @@
+"""
+提交日志的重建与保留策略：保留的每次提交都能由检查点和增量重建，最新的检查点由 statistics 推算
+"""
+import csv
+import random
+
+import pytest
+
+from hnstatistics.core.services.import_service import ImportService
+from hnstatistics.core.services.project_service import ProjectService
+from hnstatistics.core.services.statistics_service import StatisticsService
+from hnstatistics.core.statistics.commit_mode import CommitMode
+from hnstatistics.core.statistics.model import StatisticsModel
+from hnstatistics.core.uow import UnitOfWork
+
+
+def model(freq: dict) -> StatisticsModel:
+    stats = StatisticsModel()
+    stats.overwrite(freq)
+    return stats
+
+def random_freq(rng: random.Random) -> dict:
+    keys = rng.sample([f"k{i}" for i in range(40)], rng.randint(1, 12))
+    return {k: rng.randint(1, 9) for k in keys}
+
+def write_csv(path, freq: dict):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Item", "Frequency"])
+        writer.writerows(freq.items())
+
+def saved_checkpoints(project_id: int) -> set[int]:
+    with UnitOfWork() as uow:
+        return {row[0] for row in uow.conn.execute(
+            "SELECT DISTINCT seq FROM checkpoints WHERE project_id = ?;", (project_id,)
+        )}
+
+def assert_history(service: StatisticsService, project, history: dict):
+    log = service.commit_log(project.id)
+    assert log[-1].seq == project.version
+    live = ProjectService().load(project.id).stats
+    assert dict(live.frequency.items()) == history[project.version]
+    # 保留的每次提交都能重建，最后一次与 statistics 一致
+    for record in log:
+        assert dict(service.load_as_of(project.id, record.seq).frequency.items()) == history[record.seq]
+    # 保留策略：日志从一个检查点开始，检查点不超过 keep_checkpoints 个
+    checkpoints = [record.seq for record in log if record.checkpoint]
+    assert checkpoints and checkpoints[0] == log[0].seq
+    if service.keep_checkpoints is not None:
+        assert len(checkpoints) <= service.keep_checkpoints
+    # 只有被取代的检查点写入 checkpoints 表，最新的检查点不复制
+    assert saved_checkpoints(project.id) == set(checkpoints[:-1])
+
+@pytest.mark.parametrize("keep_checkpoints", [None, 1, 2, 3])
+def test_retained_commits_replay_to_history(database, tmp_path, keep_checkpoints):
+    rng = random.Random(keep_checkpoints or 0)
+    service = StatisticsService(checkpoint_interval=3, keep_checkpoints=keep_checkpoints)
+    importer = ImportService(service)
+    project = ProjectService().create("log")
+    current: dict = {}
+    history: dict[int, dict] = {}
+    for step in range(40):
+        freq = random_freq(rng)
+        action = rng.choice(["merge", "merge", "merge", "overwrite", "import merge", "import overwrite"])
+        if action == "merge":
+            service.commit(project, model(freq), CommitMode.MERGE)
+            for k, v in freq.items():
+                current[k] = current.get(k, 0) + v
+        elif action == "overwrite":
+            service.commit(project, model(freq), CommitMode.OVERWRITE)
+            current = dict(freq)
+        else:
+            mode = CommitMode.MERGE if action == "import merge" else CommitMode.OVERWRITE
+            path = tmp_path / f"{step}.csv"
+            write_csv(path, freq)
+            imported = importer.import_into_project(project.id, str(path), mode=mode)
+            project = ProjectService().load(project.id)
+            assert project.version == imported.version
+            if mode == CommitMode.MERGE:
+                for k, v in freq.items():
+                    current[k] = current.get(k, 0) + v
+            else:
+                current = dict(freq)
+        history[project.version] = dict(current)
+        assert_history(service, project, history)
+
+def test_single_checkpoint_keeps_no_copies(database):
+    service = StatisticsService(checkpoint_interval=2, keep_checkpoints=1)
+    project = ProjectService().create("head only")
+    for i in range(10):
+        mode = CommitMode.OVERWRITE if i % 3 == 0 else CommitMode.MERGE
+        service.commit(project, model({f"k{i}": i + 1, "shared": 1}), mode)
+    assert saved_checkpoints(project.id) == set()
+    log = service.commit_log(project.id)
+    assert sum(record.checkpoint for record in log) == 1
+    assert dict(service.load_as_of(project.id, log[-1].seq).frequency.items()) == \
+        dict(ProjectService().load(project.id).stats.frequency.items())
@@ -0,0 +1,102 @@
+"""
+写回队列的崩溃恢复：日志中尚未写入数据库的增量在重新打开时重放且只重放一次
+"""
+import shutil
+
+import pytest
+
+from hnstatistics.core.services.commit_queue import WriteBehindCommitQueue
+from hnstatistics.core.services.project_service import ProjectService
+from hnstatistics.core.services.statistics_service import StatisticsService
+from hnstatistics.core.statistics.commit_mode import CommitMode
+from hnstatistics.core.statistics.model import StatisticsModel
+
+
+def model(freq: dict) -> StatisticsModel:
+    stats = StatisticsModel()
+    stats.overwrite(freq)
+    return stats
+
+def add(current: dict, freq: dict):
+    for k, v in freq.items():
+        current[k] = current.get(k, 0) + v
+
+@pytest.fixture
+def journal(tmp_path):
+    return str(tmp_path / "commit-journal")
+
+def open_queue(journal: str) -> WriteBehindCommitQueue:
+    # 阈值足够大，测试期间后台线程不会自动写入
+    queue = WriteBehindCommitQueue(
+        StatisticsService(), journal_path=journal, max_pending_keys=10**9, max_delay=3600, fsync=False
+    )
+    queue.recover()
+    return queue
+
+def assert_saved(project_id: int, expected: dict, version: int):
+    saved = ProjectService().load(project_id)
+    assert dict(saved.stats.frequency.items()) == expected
+    assert (saved.total_count, saved.distinct_count) == (sum(expected.values()), len(expected))
+    assert saved.version == version
+
+def test_recover_replays_unflushed_deltas_once(database, journal):
+    a = ProjectService().create("a")
+    b = ProjectService().create("b")
+    expected_a, expected_b = {}, {}
+    queue = open_queue(journal)
+    for freq in ({"x": 1, "y": 2}, {"y": 3, "z": 1}):
+        queue.commit(a, model(freq), CommitMode.MERGE)
+        add(expected_a, freq)
+    queue.commit(b, model({"x": 5}), CommitMode.MERGE)
+    add(expected_b, {"x": 5})
+    assert queue.pending_keys > 0
+    # 崩溃：队列没有写入数据库也没有关闭
+    assert_saved(a.id, {}, 0)
+
+    recovered = open_queue(journal)
+    # 每个项目的未写入增量在一个事务中作为一次合并提交写入
+    assert_saved(a.id, expected_a, 1)
+    assert_saved(b.id, expected_b, 1)
+    assert StatisticsService().commit_log(a.id)[-1].delta_size == len(expected_a)
+    recovered.close()
+
+    # 再次打开时不会重复写入
+    open_queue(journal).close()
+    assert_saved(a.id, expected_a, 1)
+    assert_saved(b.id, expected_b, 1)
+
+def test_recover_skips_deltas_already_flushed(database, journal):
+    project = ProjectService().create("p")
+    expected = {}
+    queue = open_queue(journal)
+    queue.commit(project, model({"a": 1}), CommitMode.MERGE)
+    add(expected, {"a": 1})
+    queue.flush()
+    queue.commit(project, model({"a": 2, "b": 1}), CommitMode.MERGE)
+    add(expected, {"a": 2, "b": 1})
+    # 写入数据库后、截断日志前崩溃：日志中仍有已写入的记录
+    shutil.copy(journal, journal + ".bak")
+    queue.flush()
+    shutil.copy(journal + ".bak", journal)
+    assert_saved(project.id, expected, 2)
+
+    queue.commit(project, model({"c": 4}), CommitMode.MERGE)
+    add(expected, {"c": 4})
+    # 崩溃时最后一行只写了一半
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write('{"seq": 99, "project_id": ')
+
+    open_queue(journal).close()
+    assert_saved(project.id, expected, 3)
+
+def test_recover_ignores_deleted_projects(database, journal):
+    kept = ProjectService().create("kept")
+    deleted = ProjectService().create("deleted")
+    queue = open_queue(journal)
+    queue.commit(kept, model({"a": 1}), CommitMode.MERGE)
+    queue.commit(deleted, model({"b": 1}), CommitMode.MERGE)
+    ProjectService().delete(deleted.id)
+
+    open_queue(journal).close()
+    assert_saved(kept.id, {"a": 1}, 1)
+    assert [p.id for p in ProjectService().list_projects()] == [kept.id]
@@ -0,0 +1,87 @@
+"""
+accumulate_star 与原来逐词调用 parse_text_with_star 的实现的差分测试
+"""
+import io
+import random
+
+import pytest
+
+from hnstatistics.core.statistics.algorithms import (
+    accumulate_star,
+    count_frequencies,
+    count_frequencies_stream,
+    parse_text_with_star,
+)
+from hnstatistics.core.statistics.analyze_options import AnalyzeOptions
+
+
+def reference_count(items) -> dict:
+    # 原来的 count_frequencies 中 enable_star 的分支
+    result = {}
+    for item in list(items):
+        base, count = parse_text_with_star(item)
+        result[base] = result.get(base, 0) + count
+    return result
+
+def batched_count(items) -> dict:
+    result = {}
+    accumulate_star(result, items)
+    return result
+
+CASES = {
+    "empty input": [],
+    "no star": ["a", "b", "a", "c", "a"],
+    "empty segments": ["*", "**", "*3", "a*", "a**", "**3", "a**3", "*a*", " * ", "a* ", " *3"],
+    "missing star": ["a3", "3", "a", "a3", "3"],
+    "non-integer multipliers": ["a*x", "a*1.5", "a*-2", "a*+2", "a*0", "a*00", "a*3x", "a*٣", "a*1e3"],
+    "repeated keys": ["a*3", "a", "a*3", "a*2", "a", "a*0", "a*", "b*1", "b"],
+    "star in base": ["a*b*3", "a*b", "a*b*3", "*a*2", "a**2"],
+    "whitespace around parts": ["a *3", "a* 3", " a * 3 ", "a * 3"],
+    "large multiplier": ["a*99999999999999999999", "a*99999999999999999999"],
+}
+
+@pytest.mark.parametrize("items", CASES.values(), ids=CASES.keys())
+def test_accumulate_star_matches_reference(items):
+    assert batched_count(items) == reference_count(items)
+
+def test_accumulate_star_raises_like_reference():
+    # str.isdigit() 接受上标数字，但 int() 不能转换，两种实现都抛出 ValueError
+    items = ["a", "a*²"]
+    with pytest.raises(ValueError):
+        reference_count(items)
+    with pytest.raises(ValueError):
+        batched_count(items)
+
+def test_accumulate_star_adds_to_existing_result():
+    items = ["a*2", "b", "a"]
+    result = {"a": 5, "c": 1}
+    accumulate_star(result, items)
+    expected = reference_count(items)
+    assert result == {"a": 5 + expected["a"], "b": expected["b"], "c": 1}
+
+def test_accumulate_star_matches_reference_on_random_tokens():
+    rng = random.Random(20240601)
+    alphabet = ["a", "b", "x", "*", "*", "0", "1", "2", "9", "-", ".", " "]
+    for _ in range(200):
+        items = [
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 6)))
+            for _ in range(rng.randint(0, 50))
+        ]
+        assert batched_count(items) == reference_count(items), items
+
+@pytest.mark.parametrize("text", [
+    "",
+    "a b c",
+    "a*3 b * a*2 *3 c* a*x a*0 a*3",
+    "中*2 文 中 文*10 文*-1",
+    "  a*3\n\tb*2  a  ",
+])
+def test_count_frequencies_matches_reference(text):
+    options = AnalyzeOptions(enable_star=True)
+    expected = reference_count(text.split())
+    assert count_frequencies(text, options) == expected
+    # 流式路径按块分词，块边界不影响结果：文本流按 chunk_size 读取，预先分好的块原样使用，两种方式都让 "a*3" 等词跨越块边界
+    for chunk_size in (1, 2, 3, 5):
+        assert count_frequencies_stream(io.StringIO(text), options, chunk_size=chunk_size) == expected
+        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        assert count_frequencies_stream(chunks, options) == expected
@@ -0,0 +1,81 @@
+"""
+StatisticsService.commit 写入数据库的结果与内存中的模型一致
+"""
+import pytest
+
+from hnstatistics.core.services.project_service import ProjectService
+from hnstatistics.core.services.statistics_service import StatisticsService
+from hnstatistics.core.statistics.commit_mode import CommitMode
+from hnstatistics.core.statistics.model import StatisticsModel
+from hnstatistics.core.statistics.sketch import HeavyHitterModel
+
+TOP_K = 3
+
+
+def exact(freq: dict) -> StatisticsModel:
+    stats = StatisticsModel()
+    stats.overwrite(freq)
+    return stats
+
+def sketch(freq: dict) -> HeavyHitterModel:
+    stats = HeavyHitterModel(TOP_K)
+    stats.merge(freq)
+    return stats
+
+def assert_saved(project):
+    saved = ProjectService().load(project.id)
+    assert dict(saved.stats.frequency.items()) == dict(project.stats.frequency.items())
+    assert (saved.total_count, saved.distinct_count) == (project.stats.total, len(project.stats.frequency))
+    assert saved.version == project.version
+
+@pytest.fixture
+def service():
+    return StatisticsService()
+
+def test_exact_merges_write_deltas(database, service):
+    project = ProjectService().create("exact")
+    service.commit(project, exact({"a": 1, "b": 2}), CommitMode.MERGE)
+    service.commit(project, exact({"b": 1, "c": 5}), CommitMode.MERGE)
+    assert dict(project.stats.frequency.items()) == {"a": 1, "b": 3, "c": 5}
+    assert_saved(project)
+    assert service.commit_log(project.id)[-1].delta_size == 2
+
+def test_repeated_merges_into_sketch_project(database, service):
+    project = ProjectService().create("sketch")
+    batches = [{"a": 2, "b": 1, "c": 1}, {"e": 3, "f": 3}, {"g": 4, "w": 2, "v": 2}, {"g": 2, "w": 3, "v": 3}]
+    for freq in batches:
+        service.commit(project, sketch(freq), CommitMode.MERGE)
+        assert isinstance(project.stats, HeavyHitterModel)
+        # 淘汰的键不能留在数据库中，statistics 的行数不超过 sketch 的容量
+        assert len(project.stats.frequency) <= TOP_K
+        assert_saved(project)
+    # 近似模型的合并提交整体重写，每次都是检查点
+    assert all(record.checkpoint and record.delta_size == 0 for record in service.commit_log(project.id))
+
+def test_exact_merge_into_sketch_project(database, service):
+    project = ProjectService().create("mixed")
+    service.commit(project, sketch({"a": 5, "b": 4, "c": 3, "d": 1}), CommitMode.MERGE)
+    service.commit(project, exact({f"k{i}": 1 for i in range(8)}), CommitMode.MERGE)
+    assert len(project.stats.frequency) <= TOP_K
+    assert_saved(project)
+
+def test_sketch_merge_into_exact_project(database, service):
+    project = ProjectService().create("exact then sketch")
+    service.commit(project, exact({f"k{i}": i + 1 for i in range(8)}), CommitMode.MERGE)
+    service.commit(project, sketch({"a": 20}), CommitMode.MERGE)
+    assert isinstance(project.stats, HeavyHitterModel)
+    assert_saved(project)
+
+@pytest.mark.parametrize("mode", [CommitMode.MERGE, CommitMode.OVERWRITE])
+@pytest.mark.parametrize("make", [exact, sketch], ids=["exact", "sketch"])
+def test_write_commit_leaves_project_untouched(database, service, mode, make):
+    # 后台线程写入数据库时界面仍在显示 project.stats，应用结果由 apply_commit 在界面线程中完成
+    project = ProjectService().create("shown")
+    service.commit(project, make({"a": 1, "b": 2, "c": 3, "d": 4}), CommitMode.MERGE)
+    shown = project.stats
+    before = dict(shown.frequency.items()), shown.total, project.version
+    committed = service.write_commit(project, make({"b": 1, "e": 5}), mode)
+    assert project.stats is shown
+    assert (dict(shown.frequency.items()), shown.total, project.version) == before
+    service.apply_commit(project, committed)
+    assert_saved(project)
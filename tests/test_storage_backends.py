@@ -0,0 +1,184 @@
+"""
+列式存储的版本切换与数据库事务一致，两种存储方式之间的转换，以及分页结果与存储方式无关
+"""
+import random
+
+import pytest
+
+from hnstatistics.core.db import close_connections, configure_database
+from hnstatistics.core.repositories.columnar_statistics_repo import ColumnarStatisticsRepository
+from hnstatistics.core.services.project_service import ProjectService
+from hnstatistics.core.services.statistics_service import StatisticsService
+from hnstatistics.core.statistics.commit_mode import CommitMode
+from hnstatistics.core.statistics.model import StatisticsModel
+from hnstatistics.core.statistics.query_options import QueryOrder, StatisticsQuery
+from hnstatistics.core.statistics.storage_backend import StorageBackend
+from hnstatistics.core.uow import UnitOfWork
+
+
+def model(freq: dict) -> StatisticsModel:
+    stats = StatisticsModel()
+    stats.overwrite(freq)
+    return stats
+
+def reopen(database):
+    # 模拟重新启动：丢弃所有连接和内存中的状态
+    close_connections()
+    configure_database(database)
+
+def generation(project_id: int, uow: UnitOfWork | None = None) -> int | None:
+    if uow is None:
+        with UnitOfWork() as uow:
+            return generation(project_id, uow)
+    row = uow.conn.execute(
+        "SELECT generation FROM columnar_generations WHERE project_id = ?;", (project_id,)
+    ).fetchone()
+    return row["generation"] if row else None
+
+def generation_files(database, project_id: int) -> set[int]:
+    directory = database.parent / f"{database.name}-columnar" / str(project_id)
+    if not directory.exists():
+        return set()
+    return {int(path.name.split(".", 1)[0]) for path in directory.iterdir()}
+
+def assert_saved(project_id: int, expected: dict):
+    saved = ProjectService().load(project_id)
+    assert dict(saved.stats.frequency.items()) == expected
+    assert (saved.total_count, saved.distinct_count) == (sum(expected.values()), len(expected))
+
+def test_generation_is_committed_with_the_aggregates(database):
+    project = ProjectService().create("columnar", StorageBackend.COLUMNAR)
+    service = StatisticsService()
+    service.commit(project, model({"a": 1, "b": 2}), CommitMode.OVERWRITE)
+    first = generation(project.id)
+    assert generation_files(database, project.id) == {first}
+
+    # 事务回滚时版本号和汇总一起回滚，新写入的文件被删除
+    with pytest.raises(RuntimeError):
+        with UnitOfWork() as uow:
+            uow.columnar.overwrite(project.id, model({"x": 9}))
+            uow.projects.update_aggregates(project.id, 9, 1)
+            assert generation(project.id, uow) != first
+            raise RuntimeError("rollback")
+    assert generation(project.id) == first
+    assert generation_files(database, project.id) == {first}
+    assert_saved(project.id, {"a": 1, "b": 2})
+
+def test_crash_after_commit_keeps_new_generation(database, monkeypatch):
+    project = ProjectService().create("columnar", StorageBackend.COLUMNAR)
+    service = StatisticsService()
+    service.commit(project, model({"a": 1, "b": 2}), CommitMode.OVERWRITE)
+    old = generation(project.id)
+    # 数据库事务已提交，但还没有删除旧版本的文件就崩溃
+    monkeypatch.setattr(ColumnarStatisticsRepository, "commit", lambda self: None)
+    service.commit(project, model({"b": 1, "c": 3}), CommitMode.MERGE)
+    monkeypatch.undo()
+    new = generation(project.id)
+    assert generation_files(database, project.id) == {old, new}
+
+    reopen(database)
+    assert_saved(project.id, {"a": 1, "b": 3, "c": 3})
+    project = ProjectService().load(project.id)
+    service.commit(project, model({"d": 1}), CommitMode.MERGE)
+    assert generation_files(database, project.id) == {generation(project.id)}
+    assert_saved(project.id, {"a": 1, "b": 3, "c": 3, "d": 1})
+
+def test_crash_before_commit_keeps_old_generation(database):
+    project = ProjectService().create("columnar", StorageBackend.COLUMNAR)
+    StatisticsService().commit(project, model({"a": 1}), CommitMode.OVERWRITE)
+    old = generation(project.id)
+    # 新版本的文件已写入，但事务没有提交，也没有执行回滚
+    uow = UnitOfWork().__enter__()
+    uow.columnar.overwrite(project.id, model({"x": 5}))
+    reopen(database)
+
+    assert generation(project.id) == old
+    assert_saved(project.id, {"a": 1})
+    project = ProjectService().load(project.id)
+    StatisticsService().commit(project, model({"y": 2}), CommitMode.MERGE)
+    assert generation_files(database, project.id) == {generation(project.id)}
+    assert_saved(project.id, {"a": 1, "y": 2})
+
+def test_convert_storage_round_trip(database):
+    projects = ProjectService()
+    service = StatisticsService()
+    project = projects.create("convert")
+    service.commit(project, model({"a": 3, "b": 1}), CommitMode.OVERWRITE)
+    service.commit(project, model({"b": 2, "c": 5}), CommitMode.MERGE)
+    expected = {"a": 3, "b": 3, "c": 5}
+
+    projects.convert_storage(project.id, StorageBackend.COLUMNAR)
+    assert generation(project.id) is not None
+    reopen(database)
+    converted = projects.load(project.id)
+    assert converted.storage == StorageBackend.COLUMNAR.value
+    assert_saved(project.id, expected)
+    # 转换前的历史仍可重建
+    assert dict(service.load_as_of(project.id, 2).frequency.items()) == expected
+
+    service.commit(converted, model({"d": 1}), CommitMode.MERGE)
+    expected["d"] = 1
+    projects.convert_storage(project.id, StorageBackend.SQLITE)
+    assert generation(project.id) is None
+    assert generation_files(database, project.id) == set()
+    reopen(database)
+    restored = projects.load(project.id)
+    assert restored.storage == StorageBackend.SQLITE.value
+    assert_saved(project.id, expected)
+    # 转回 SQLite 时设一个检查点作为新的历史起点
+    last = service.commit_log(project.id)[-1]
+    assert last.checkpoint and last.seq == restored.version
+    assert dict(service.load_as_of(project.id, last.seq).frequency.items()) == expected
+
+def all_pages(service: StatisticsService, project_id: int, query: StatisticsQuery) -> list:
+    pages = []
+    while True:
+        page = service.query(project_id, query)
+        pages.append((page.rows, page.next_cursor))
+        if page.next_cursor is None:
+            return pages
+        query = StatisticsQuery(
+            order_by=query.order_by, descending=query.descending, limit=query.limit,
+            min_frequency=query.min_frequency, max_frequency=query.max_frequency,
+            after=page.next_cursor, offset=query.offset,
+        )
+
+@pytest.mark.parametrize("order_by", [QueryOrder.FREQUENCY, QueryOrder.KEY])
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("limit, offset, min_frequency, max_frequency", [
+    (7, 0, None, None),
+    (1, 0, None, None),
+    (50, 0, None, None),
+    (5, 3, None, None),
+    (4, 0, 2, 5),
+])
+def test_paging_does_not_depend_on_storage(database, order_by, descending, limit, offset, min_frequency, max_frequency):
+    rng = random.Random(7)
+    # 大量同频率的键，且键的顺序与词表中的 id 顺序不同
+    keys = [f"{rng.choice('xyzab')}{i:03d}中" for i in range(120)]
+    rng.shuffle(keys)
+    freq = {k: rng.choice([1, 1, 1, 2, 2, 3, 5, 8]) for k in keys}
+    service = StatisticsService()
+    sqlite_project = ProjectService().create("sqlite")
+    # 先写入一些其他键，使词表比项目大
+    service.commit(sqlite_project, model({f"other{i}": 1 for i in range(300)}), CommitMode.OVERWRITE)
+    service.commit(sqlite_project, model(freq), CommitMode.OVERWRITE)
+    columnar_project = ProjectService().create("columnar", StorageBackend.COLUMNAR)
+    service.commit(columnar_project, model(freq), CommitMode.OVERWRITE)
+
+    query = StatisticsQuery(
+        order_by=order_by, descending=descending, limit=limit,
+        min_frequency=min_frequency, max_frequency=max_frequency, offset=offset,
+    )
+    sqlite_pages = all_pages(service, sqlite_project.id, query)
+    assert sqlite_pages == all_pages(service, columnar_project.id, query)
+
+    # 同频率的键按 UTF-8 字节序升序
+    items = [(k, v) for k, v in freq.items()
+             if (min_frequency is None or v >= min_frequency) and (max_frequency is None or v <= max_frequency)]
+    if order_by == QueryOrder.FREQUENCY:
+        items.sort(key=lambda kv: (-kv[1] if descending else kv[1], kv[0].encode("utf-8")))
+    else:
+        items.sort(key=lambda kv: kv[0].encode("utf-8"), reverse=descending)
+    if offset == 0:
+        assert [row[:2] for rows, _ in sqlite_pages for row in rows] == items